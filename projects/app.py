@@ -5,37 +5,535 @@ Este módulo define as rotas da interface do usuário (UI) e da API,
 inicializa a aplicação Flask, configura o CORS e interage com os
 módulos de gerenciamento de dados (CourseManager, LessonManager, ExerciseManager)
 e o executor de código (code_executor).
+
+A aplicação é criada pela fábrica `create_app`, que aceita uma configuração
+e managers já construídos; os managers não fornecidos são criados no
+primeiro uso, e não na importação do módulo. `app` é a aplicação padrão, e
+`course_mgr`, `lesson_mgr`, `exercise_mgr` e os caches do módulo referem-se
+aos componentes da aplicação ativa.
 """
 # ... imports ...
 # ... inicialização do app Flask ...
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
 import logging
-from flask import Flask, jsonify, request, render_template, abort
+import os
+from pathlib import Path
+import queue
+import threading
+from flask import Flask, Response, current_app, url_for, has_app_context, jsonify, request, render_template, abort, make_response, stream_with_context
 from flask_cors import CORS
+from werkzeug.local import LocalProxy
 # Assume que estes módulos estão no mesmo diretório (projects/)
 # Corrigido para import relativo consistente
 from .course_manager import CourseManager
 from .lesson_manager import LessonManager
 from .exercise_manager import ExerciseManager
-from . import code_executor
-
-# Configuração básica de logging
-# Idealmente, esta configuração pode ser mais elaborada e centralizada
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+from . import execution_backend
+from .code_executor import ExecutionLimits
+from .execution_backend import ExecutorBusy
+from .bytecode_cache import compiled_code_cache
+from .page_cache import PageCache
+from .preflight import DEFAULT_RULES as PREFLIGHT_DEFAULT_RULES, PreflightChecker
+from .search_index import (DEFAULT_CHECK_INTERVAL as SEARCH_DEFAULT_CHECK_INTERVAL, DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT,
+                           MAX_LIMIT as SEARCH_MAX_LIMIT, SearchIndex, exercise_documents, lesson_documents)
+from . import jobs
+from .jobs import JobManager, TooManyJobs
+from .grading import run_test_cases
+from .result_cache import ResultCache, code_hash, is_cacheable
+from .instrumentation import Instrumentation
+from .content_cache import content_cache, file_signature
+from .concept_graph import ConceptGraph, ConceptGraphError, load_concept_map
+from . import metrics
+from .metrics import MetricFamily
+from .logging_config import configure_logging
+
+# Configuração de logging (veja `logging_config`): nível, formato ("text" ou
+# "json"), escrita assíncrona e fração dos eventos de DEBUG registrados.
+configure_logging(
+    level=os.environ.get("CURSO_LOG_LEVEL", "INFO"),
+    log_format=os.environ.get("CURSO_LOG_FORMAT", "text"),
+    async_handler=os.environ.get("CURSO_LOG_ASYNC", "1") != "0",
+    debug_sample_rate=float(os.environ.get("CURSO_LOG_DEBUG_SAMPLE_RATE", "1")),
+)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-CORS(app) # Habilita CORS para todas as rotas
+def default_config():
+    """Retorna a configuração padrão da aplicação, lida das variáveis de ambiente.
+
+    Returns:
+        dict: As chaves de configuração e seus valores padrão.
+    """
+    return dict(
+        # Diretório de dados (courses.json, lições e exercícios). None = projects/data.
+        DATA_DIR=os.environ.get("CURSO_DATA_DIR") or None,
+        # Configuração do backend de execução de código.
+        # "process" despacha as execuções para um pool de processos trabalhadores;
+        # "inline" executa no próprio processo do servidor (comportamento original).
+        EXECUTOR_BACKEND=os.environ.get("CURSO_EXECUTOR_BACKEND", "process"),
+        EXECUTOR_POOL_SIZE=int(os.environ.get("CURSO_EXECUTOR_POOL_SIZE", "0")) or None, # None = os.cpu_count()
+        EXECUTOR_MAX_JOBS_PER_WORKER=int(os.environ.get("CURSO_EXECUTOR_MAX_JOBS_PER_WORKER",
+                                                        str(execution_backend.DEFAULT_MAX_JOBS_PER_WORKER))),
+        # Controle de admissão do pool: chamadas que podem aguardar um trabalhador
+        # livre e tempo máximo de espera, em segundos. Acima disso, as rotas de
+        # execução respondem 429 com o cabeçalho Retry-After.
+        EXECUTOR_MAX_QUEUE=int(os.environ.get("CURSO_EXECUTOR_MAX_QUEUE", str(execution_backend.DEFAULT_MAX_QUEUE))),
+        EXECUTOR_MAX_WAIT_SECONDS=float(os.environ.get("CURSO_EXECUTOR_MAX_WAIT_SECONDS",
+                                                       str(execution_backend.DEFAULT_MAX_WAIT_SECONDS))),
+        # Limites padrão de cada execução (tempo de relógio, CPU, memória e saída).
+        # Um exercício pode sobrescrevê-los com uma seção "limits" de mesmas chaves
+        # no seu exercises.json, ex: "limits": {"wall_time_seconds": 10, "memory_mb": 512}.
+        EXECUTOR_LIMITS=ExecutionLimits().to_dict(),
+        # Tetos dos limites de execução: nenhum exercício (nem `EXECUTOR_LIMITS`)
+        # pode ultrapassá-los.
+        EXECUTOR_MAX_LIMITS=ExecutionLimits(wall_time=30.0, cpu_time=30, memory_bytes=1024 * 1024 * 1024,
+                                            max_output_bytes=8 * 1024 * 1024).to_dict(),
+        # Verificação em lote (/api/check-exercises/batch): número máximo de itens
+        # por requisição e de verificações simultâneas (None = tamanho do pool).
+        BATCH_MAX_ITEMS=int(os.environ.get("CURSO_BATCH_MAX_ITEMS", "500")),
+        BATCH_MAX_PARALLEL=int(os.environ.get("CURSO_BATCH_MAX_PARALLEL", "0")) or None,
+        # Execução com saída em streaming (/api/execute-code/stream): número máximo
+        # de trechos de saída aguardando envio ao navegador.
+        STREAM_QUEUE_SIZE=int(os.environ.get("CURSO_STREAM_QUEUE_SIZE", "256")),
+        # Trabalhos de execução assíncrona (/api/jobs, veja `jobs`): threads que
+        # executam os trabalhos, máximo de trabalhos em andamento e tempo, em
+        # segundos, que um trabalho concluído permanece disponível para consulta.
+        JOBS_MAX_THREADS=int(os.environ.get("CURSO_JOBS_MAX_THREADS", str(jobs.DEFAULT_MAX_THREADS))),
+        JOBS_MAX_PENDING=int(os.environ.get("CURSO_JOBS_MAX_PENDING", str(jobs.DEFAULT_MAX_PENDING))),
+        JOBS_TTL_SECONDS=float(os.environ.get("CURSO_JOBS_TTL_SECONDS", str(jobs.DEFAULT_TTL_SECONDS))),
+        # Verificação prévia do código (veja `preflight`): erros de sintaxe e
+        # importações/chamadas proibidas por nível de curso são recusados sem
+        # despachar a execução para o pool.
+        PREFLIGHT_ENABLED=os.environ.get("CURSO_PREFLIGHT", "1") != "0",
+        PREFLIGHT_RULES=PREFLIGHT_DEFAULT_RULES,
+        # Busca textual (/api/search, veja `search_index`): intervalo mínimo, em
+        # segundos, entre verificações de alteração dos arquivos de dados.
+        SEARCH_CHECK_INTERVAL_SECONDS=float(os.environ.get("CURSO_SEARCH_CHECK_INTERVAL_SECONDS",
+                                                           str(SEARCH_DEFAULT_CHECK_INTERVAL))),
+        # Cache do HTML das páginas de curso e de lição (veja `page_cache`).
+        PAGE_CACHE_ENABLED=os.environ.get("CURSO_PAGE_CACHE", "1") != "0",
+        # Cache de resultados de execução/verificação para exercícios marcados com
+        # "deterministic": true (veja `result_cache`).
+        RESULT_CACHE_ENABLED=os.environ.get("CURSO_RESULT_CACHE", "1") != "0",
+        RESULT_CACHE_MAX_ENTRIES=int(os.environ.get("CURSO_RESULT_CACHE_MAX_ENTRIES", "1024")),
+        RESULT_CACHE_TTL_SECONDS=float(os.environ.get("CURSO_RESULT_CACHE_TTL_SECONDS", "600")),
+        # Instrumentação das requisições (veja `instrumentation`): histogramas de
+        # tempo por rota e fase, cabeçalho Server-Timing e, para uma fração das
+        # requisições, perfilamento com cProfile (0 = desativado).
+        INSTRUMENTATION_ENABLED=os.environ.get("CURSO_INSTRUMENTATION", "1") != "0",
+        PROFILE_SAMPLE_RATE=float(os.environ.get("CURSO_PROFILE_SAMPLE_RATE", "0")),
+    )
+
+_executor_lock = threading.Lock()
+_concept_graph_lock = threading.Lock()
+
+class AppState:
+    """Componentes de uma instância da aplicação, em `app.extensions['curso']`.
+
+    Os managers são criados no primeiro acesso (a partir de `DATA_DIR`), e
+    não na importação do módulo, para que importar a aplicação não leia
+    nenhum arquivo de dados. Managers já construídos podem ser injetados
+    em `create_app`.
+
+    Attributes:
+        page_cache (PageCache): O cache do HTML das páginas.
+        result_cache (ResultCache): O cache de resultados de execução/verificação.
+        instrumentation (Instrumentation): A instrumentação das requisições.
+        job_manager (JobManager): Os trabalhos de execução assíncrona.
+        preflight (PreflightChecker): A verificação prévia do código submetido.
+        search_index (SearchIndex): O índice de busca sobre lições e exercícios.
+        concept_graph (tuple | None): A versão dos dados e o `ConceptGraph` montado
+            com ela (veja `get_concept_graph`).
+    """
+
+    def __init__(self, app, course_manager=None, lesson_manager=None, exercise_manager=None):
+        """
+        Args:
+            app (Flask): A aplicação.
+            course_manager (CourseManager, optional): O manager de cursos a usar.
+            lesson_manager (LessonManager, optional): O manager de lições a usar.
+            exercise_manager (ExerciseManager, optional): O manager de exercícios a usar.
+        """
+        self.app = app
+        self._managers = {"course": course_manager, "lesson": lesson_manager, "exercise": exercise_manager}
+        self._lock = threading.Lock()
+        self.page_cache = PageCache()
+        self.result_cache = ResultCache(app.config['RESULT_CACHE_MAX_ENTRIES'], app.config['RESULT_CACHE_TTL_SECONDS'])
+        self.instrumentation = Instrumentation(app)
+        self.preflight = PreflightChecker(app.config['PREFLIGHT_RULES'])
+        self.search_index = SearchIndex(app.config['SEARCH_CHECK_INTERVAL_SECONDS'])
+        self.concept_graph = None
+        self.job_manager = JobManager(app.config['JOBS_MAX_THREADS'], app.config['JOBS_MAX_PENDING'],
+                                      app.config['JOBS_TTL_SECONDS'])
+
+    def _manager(self, kind):
+        """Retorna o manager `kind`, criando-o no primeiro acesso."""
+        manager = self._managers[kind]
+        if manager is None:
+            with self._lock:
+                manager = self._managers[kind]
+                if manager is None:
+                    data_dir = self.app.config.get('DATA_DIR')
+                    if kind == "course":
+                        # Um caminho absoluto substitui o diretório padrão (veja `CourseManager`)
+                        manager = CourseManager(Path(data_dir).resolve()) if data_dir else CourseManager()
+                    elif kind == "lesson":
+                        manager = LessonManager(data_dir=data_dir)
+                    else:
+                        manager = ExerciseManager(data_dir=data_dir)
+                    self._managers[kind] = manager
+        return manager
+
+    @property
+    def course_mgr(self):
+        """CourseManager: O manager de cursos."""
+        return self._manager("course")
+
+    @property
+    def lesson_mgr(self):
+        """LessonManager: O manager de lições."""
+        return self._manager("lesson")
+
+    @property
+    def exercise_mgr(self):
+        """ExerciseManager: O manager de exercícios."""
+        return self._manager("exercise")
+
+# Rotas e tratadores de erro, registrados em cada aplicação criada por `create_app`.
+_routes = []
+_error_handlers = []
+
+def route(rule, **options):
+    """Decorador que registra uma rota para as aplicações criadas por `create_app`."""
+    def decorator(func):
+        _routes.append((rule, func, options))
+        return func
+    return decorator
+
+def errorhandler(code):
+    """Decorador que registra um tratador de erro para as aplicações criadas por `create_app`."""
+    def decorator(func):
+        _error_handlers.append((code, func))
+        return func
+    return decorator
+
+def create_app(config=None, course_manager=None, lesson_manager=None, exercise_manager=None):
+    """Cria e configura uma instância da aplicação Flask.
+
+    Cada instância tem seus próprios managers, caches e backend de execução,
+    o que permite, por exemplo, que cada teste use um diretório de dados
+    isolado:
+
+        test_app = create_app({"TESTING": True, "DATA_DIR": tmp_path})
+
+    Args:
+        config (dict, optional): Valores que sobrescrevem `default_config()`.
+        course_manager (CourseManager, optional): Manager de cursos já construído.
+        lesson_manager (LessonManager, optional): Manager de lições já construído.
+        exercise_manager (ExerciseManager, optional): Manager de exercícios já construído.
+            Os managers não fornecidos são criados no primeiro uso.
+
+    Returns:
+        Flask: A aplicação configurada.
+    """
+    new_app = Flask(__name__)
+    CORS(new_app) # Habilita CORS para todas as rotas
+    new_app.config.update(default_config())
+    if config:
+        new_app.config.update(config)
+    new_app.extensions['curso'] = AppState(new_app, course_manager, lesson_manager, exercise_manager)
+    for rule, func, options in _routes:
+        new_app.add_url_rule(rule, view_func=func, **options)
+    for code, func in _error_handlers:
+        new_app.register_error_handler(code, func)
+    return new_app
+
+def _active_app():
+    """Retorna a aplicação ativa (ou a aplicação padrão `app`, fora de um contexto de aplicação)."""
+    return current_app._get_current_object() if has_app_context() else app
+
+def _state():
+    """Retorna o `AppState` da aplicação ativa."""
+    return _active_app().extensions['curso']
+
+# Componentes da aplicação ativa. Dentro de uma requisição, referem-se à
+# aplicação que a atende; fora dela, à aplicação padrão `app`.
+course_mgr = LocalProxy(lambda: _state().course_mgr)
+lesson_mgr = LocalProxy(lambda: _state().lesson_mgr)
+exercise_mgr = LocalProxy(lambda: _state().exercise_mgr)
+page_cache = LocalProxy(lambda: _state().page_cache)
+result_cache = LocalProxy(lambda: _state().result_cache)
+instrumentation = LocalProxy(lambda: _state().instrumentation)
+job_manager = LocalProxy(lambda: _state().job_manager)
+preflight = LocalProxy(lambda: _state().preflight)
+search_index = LocalProxy(lambda: _state().search_index)
+
+def get_executor():
+    """Retorna o backend de execução de código da aplicação ativa, criando-o no primeiro uso.
+
+    O backend é construído a partir de `app.config` (`EXECUTOR_BACKEND`,
+    `EXECUTOR_POOL_SIZE`, `EXECUTOR_MAX_JOBS_PER_WORKER`, `EXECUTOR_MAX_QUEUE`,
+    `EXECUTOR_MAX_WAIT_SECONDS`) e armazenado em
+    `app.extensions['code_executor']`. Os processos do pool só são criados
+    na primeira execução.
+
+    Returns:
+        InlineBackend | ProcessPoolBackend: O backend de execução configurado.
+    """
+    active_app = _active_app()
+    backend = active_app.extensions.get('code_executor')
+    if backend is None:
+        with _executor_lock:
+            backend = active_app.extensions.get('code_executor')
+            if backend is None:
+                backend = execution_backend.create_backend(
+                    active_app.config['EXECUTOR_BACKEND'],
+                    size=active_app.config.get('EXECUTOR_POOL_SIZE'),
+                    max_jobs_per_worker=active_app.config.get('EXECUTOR_MAX_JOBS_PER_WORKER'),
+                    max_queue=active_app.config.get('EXECUTOR_MAX_QUEUE'),
+                    max_wait=active_app.config.get('EXECUTOR_MAX_WAIT_SECONDS'),
+                )
+                active_app.extensions['code_executor'] = backend
+                logger.info(f"Backend de execução '{backend.name}' configurado.")
+    return backend
+
+def get_concept_graph():
+    """Retorna o grafo de pré-requisitos dos conceitos (veja `concept_graph`).
+
+    O grafo é montado a partir de `concept_map.json` e do `learning_path` dos
+    cursos, e reutilizado enquanto o arquivo e a lista de cursos não mudarem.
+
+    Returns:
+        ConceptGraph: O grafo, com as consultas pré-calculadas.
+
+    Raises:
+        ConceptGraphError: Se os pré-requisitos declarados formarem um ciclo.
+    """
+    state = _state()
+    concept_map_path = Path(course_mgr.data_dir) / 'concept_map.json'
+    version = (course_mgr.revision, file_signature(concept_map_path))
+    cached = state.concept_graph
+    if cached is None or cached[0] != version:
+        with _concept_graph_lock:
+            cached = state.concept_graph
+            if cached is None or cached[0] != version:
+                graph = ConceptGraph(load_concept_map(concept_map_path), course_mgr.get_courses())
+                state.concept_graph = cached = (version, graph)
+                logger.info("Grafo de conceitos montado: %d nós.", len(graph.nodes))
+    return cached[1]
+
+@metrics.registry.register_collector
+def collect_app_metrics():
+    """Coletor de métricas (veja `metrics`) com os contadores dos componentes da aplicação.
+
+    Lê as estatísticas do backend de execução (se já criado), dos caches de
+    conteúdo, páginas, código compilado e resultados, e os histogramas de
+    tempo da instrumentação.
+
+    Returns:
+        list: Os `MetricFamily` coletados.
+    """
+    families = []
+    backend = _active_app().extensions.get('code_executor')
+    if backend is not None:
+        backend_stats = backend.stats()
+        gauges = MetricFamily("curso_executor_workers", "gauge", "Trabalhadores do pool de execução, por estado.")
+        for state in ("busy", "idle"):
+            if f"{state}_workers" in backend_stats:
+                gauges.add(backend_stats[f"{state}_workers"], backend=backend.name, state=state)
+        families.append(gauges)
+        families.append(MetricFamily("curso_executor_queue_depth", "gauge",
+                                     "Execuções aguardando um trabalhador livre.")
+                        .add(backend_stats.get("waiting_jobs", 0), backend=backend.name))
+        for key, help_text in (("timeouts", "Execuções interrompidas por tempo de relógio."),
+                               ("workers_crashed", "Trabalhadores encerrados inesperadamente."),
+                               ("workers_recycled", "Trabalhadores substituídos após o limite de execuções."),
+                               ("jobs_rejected", "Execuções recusadas pelo controle de admissão (fila cheia ou espera longa).")):
+            if key in backend_stats:
+                families.append(MetricFamily(f"curso_executor_{key}_total", "counter", help_text)
+                                .add(backend_stats[key], backend=backend.name))
+        if "queue_wait" in backend_stats:
+            wait = backend_stats["queue_wait"]
+            wait_family = MetricFamily("curso_executor_queue_wait_seconds", "histogram",
+                                       "Tempo de espera por um trabalhador livre.")
+            for bound, count in wait["buckets"].items():
+                le = bound if bound == "+Inf" else repr(float(bound) / 1000)
+                wait_family.add(count, "_bucket", backend=backend.name, le=le)
+            wait_family.add(wait["sum_ms"] / 1000, "_sum", backend=backend.name)
+            wait_family.add(wait["count"], "_count", backend=backend.name)
+            families.append(wait_family)
+
+    cache_lookups = MetricFamily("curso_content_cache_lookups_total", "counter",
+                                 "Leituras do cache de arquivos de dados, por arquivo e resultado.")
+    cache_reloads = MetricFamily("curso_content_cache_reloads_total", "counter",
+                                 "Arquivos de dados recarregados após alteração, por arquivo.")
+    for file_name, counts in content_cache.stats_by_file().items():
+        cache_lookups.add(counts["hits"], file=file_name, result="hit")
+        cache_lookups.add(counts["misses"], file=file_name, result="miss")
+        cache_reloads.add(counts["reloads"], file=file_name)
+    families.extend([cache_lookups, cache_reloads])
+
+    for cache_name, stats in (("page", page_cache.stats()), ("compiled_code", compiled_code_cache.stats()),
+                              ("result", result_cache.stats()), ("preflight", preflight.stats())):
+        families.append(MetricFamily(f"curso_{cache_name}_cache_lookups_total", "counter",
+                                     f"Buscas no cache '{cache_name}', por resultado.")
+                        .add(stats["hits"], result="hit").add(stats["misses"], result="miss"))
+        families.append(MetricFamily(f"curso_{cache_name}_cache_entries", "gauge",
+                                     f"Entradas no cache '{cache_name}'.").add(stats["entries"]))
+    families.append(MetricFamily("curso_compiled_code_compile_seconds_saved_total", "counter",
+                                 "Tempo de compilação economizado pelo cache de código compilado.")
+                    .add(compiled_code_cache.stats()["compile_time_saved_seconds"]))
+    families.append(MetricFamily("curso_result_cache_hit_ratio", "gauge",
+                                 "Fração das buscas no cache de resultados atendidas pelo cache.")
+                    .add(result_cache.stats()["hit_ratio"]))
+
+    search_stats = search_index.stats()
+    families.append(MetricFamily("curso_search_index_documents", "gauge",
+                                 "Documentos (lições e exercícios) no índice de busca.").add(search_stats["documents"]))
+    families.append(MetricFamily("curso_search_index_rebuilds_total", "counter",
+                                 "Segmentos do índice de busca (re)construídos.").add(search_stats["rebuilds"]))
+
+    durations = MetricFamily("curso_request_phase_duration_seconds", "histogram",
+                             "Duração das requisições por rota e fase.")
+    for endpoint, phases in instrumentation.histograms().items():
+        for phase_name, data in phases.items():
+            for bound, count in data["buckets"].items():
+                le = bound if bound == "+Inf" else repr(float(bound) / 1000)
+                durations.add(count, "_bucket", route=endpoint, phase=phase_name, le=le)
+            durations.add(data["sum_ms"] / 1000, "_sum", route=endpoint, phase=phase_name)
+            durations.add(data["count"], "_count", route=endpoint, phase=phase_name)
+    families.append(durations)
+    return families
+
+def execution_limits_for(exercise=None):
+    """Calcula os limites de execução para um exercício.
+
+    Os limites resultantes nunca ultrapassam `app.config['EXECUTOR_MAX_LIMITS']`.
+
+    Args:
+        exercise (dict, optional): O exercício, cuja seção opcional "limits"
+            sobrescreve os limites padrão de `app.config['EXECUTOR_LIMITS']`.
+            Deve ser informado apenas quando o exercício é determinado pelo
+            servidor (rotas de verificação), e não em execuções livres: caso
+            contrário, qualquer cliente poderia obter os limites ampliados de
+            um exercício apenas citando seu ID.
+
+    Returns:
+        ExecutionLimits: Os limites a aplicar na execução.
+    """
+    limits = ExecutionLimits().merged(current_app.config.get('EXECUTOR_LIMITS'))
+    if exercise and isinstance(exercise.get('limits'), dict):
+        limits = limits.merged(exercise['limits'])
+    return limits.clamped(ExecutionLimits().merged(current_app.config.get('EXECUTOR_MAX_LIMITS')))
+
+def result_cache_key(kind, course, exercise, user_code, *extra):
+    """Monta a chave do cache de resultados para uma submissão a um exercício.
+
+    Args:
+        kind (str): O tipo de resultado ("execute" ou "check").
+        course (dict): O curso do exercício.
+        exercise (dict | None): O exercício.
+        user_code (str): O código submetido (comparado após `normalize_code`).
+        *extra: Outros parâmetros que alteram o resultado (ex: a entrada).
+
+    Returns:
+        tuple | None: A chave, ou None se o cache estiver desativado ou o
+                      exercício não for marcado com `"deterministic": true`.
+    """
+    if not current_app.config.get('RESULT_CACHE_ENABLED', True) or not exercise or not exercise.get('deterministic'):
+        return None
+    version = exercise_mgr.get_file_version(course.get("exercises_file"))
+    return (kind, course.get("id"), str(exercise.get("id")), version, code_hash(user_code)) + extra
+
+def preflight_result(user_code, course=None):
+    """Verifica o código antes da execução (veja `preflight`).
+
+    Args:
+        user_code (str): O código submetido.
+        course (dict, optional): O curso, cujo nível ("level") seleciona as regras.
 
-# Instancia os managers
-# Os managers agora carregam dados sob demanda ou na inicialização, conforme suas implementações.
-course_mgr = CourseManager()
-lesson_mgr = LessonManager()
-exercise_mgr = ExerciseManager()
+    Returns:
+        dict | None: None se o código pode ser executado; caso contrário, o
+                     resultado no formato de `code_executor.execute_code`.
+    """
+    if not current_app.config.get('PREFLIGHT_ENABLED', True) or not isinstance(user_code, str):
+        return None
+    result = preflight.check(user_code, course.get('level') if course else None)
+    if result is not None:
+        metrics.record_execution("preflight", "execute_code", result)
+    return result
+
+def course_data_version(course):
+    """Calcula a versão dos dados de um curso, usada para invalidar as páginas em cache.
+
+    A versão combina a revisão da lista de cursos com as assinaturas dos
+    arquivos de lições e de exercícios do curso; obtê-la não carrega nenhum
+    arquivo.
+
+    Args:
+        course (dict): O curso.
+
+    Returns:
+        tuple: A versão dos dados.
+    """
+    return (course_mgr.revision,
+            lesson_mgr.get_file_version(course.get("lessons_file")),
+            exercise_mgr.get_file_version(course.get("exercises_file")))
+
+def search_sources():
+    """Lista os segmentos do índice de busca: as lições e os exercícios de cada curso.
+
+    A versão de cada segmento é a assinatura do arquivo correspondente, de modo
+    que `SearchIndex.sync` só recarrega os arquivos alterados.
+
+    Returns:
+        list: Tuplas (chave, versão, função que retorna os documentos), veja `SearchIndex.sync`.
+    """
+    sources = []
+    for course in course_mgr.get_courses():
+        course_id = course.get("id")
+        lessons_file, exercises_file = course.get("lessons_file"), course.get("exercises_file")
+        if lessons_file:
+            sources.append((("lesson", course_id), lesson_mgr.get_file_version(lessons_file),
+                            lambda course_id=course_id, path=lessons_file:
+                                lesson_documents(course_id, lesson_mgr.load_lessons_from_file(path))))
+        if exercises_file:
+            level = course.get("level")
+            sources.append((("exercise", course_id), exercise_mgr.get_file_version(exercises_file),
+                            lambda course_id=course_id, path=exercises_file, level=level.lower() if level else None:
+                                exercise_documents(course_id, exercise_mgr.get_exercise_index(path, level).items)))
+    return sources
+
+def cached_page(key, version, render):
+    """Retorna a página renderizada por `render`, reutilizando o HTML em cache.
+
+    Responde 304 (sem corpo) se o ETag enviado pelo navegador em
+    `If-None-Match` corresponder à página atual.
+
+    Args:
+        key (tuple): Identifica a página (nome da rota e argumentos).
+        version (hashable): A versão dos dados da página (veja `course_data_version`).
+        render (callable): Função sem argumentos que renderiza o HTML da página.
+
+    Returns:
+        Response: A página, ou uma resposta 304.
+    """
+    if not current_app.config.get('PAGE_CACHE_ENABLED', True):
+        return make_response(render())
+    html, etag = page_cache.get_or_render(key, version, render)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = make_response(html)
+    response.set_etag(etag)
+    # O navegador pode guardar a página, mas deve revalidá-la a cada acesso
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 # --- Rotas de Apresentação (HTML) ---
 
-@app.route('/')
+@route('/')
 def home():
     """Renderiza a página inicial da aplicação.
 
@@ -52,7 +550,7 @@ def home():
     courses_for_index = all_courses[:3] if all_courses else []
     return render_template('index.html', courses=courses_for_index, title="Bem-vindo")
 
-@app.route('/courses', methods=['GET'])
+@route('/courses', methods=['GET'])
 def list_courses_page(): # Renomeado para clareza (página vs API)
     """Renderiza a página de listagem de todos os cursos disponíveis.
 
@@ -63,7 +561,7 @@ def list_courses_page(): # Renomeado para clareza (página vs API)
     courses = course_mgr.get_courses()
     return render_template('course_list.html', courses=courses, title="Cursos Disponíveis")
 
-@app.route('/courses/<string:course_id>', methods=['GET'])
+@route('/courses/<string:course_id>', methods=['GET'])
 def course_detail_page(course_id): # Renomeado para clareza
     """Renderiza a página de detalhes de um curso específico.
 
@@ -73,16 +571,27 @@ def course_detail_page(course_id): # Renomeado para clareza
     Args:
         course_id (str): O ID do curso a ser exibido.
 
+    O HTML renderizado é reutilizado enquanto os dados do curso não mudarem
+    (veja `cached_page`).
+
     Returns:
-        str: O conteúdo HTML da página de detalhes do curso renderizada.
+        Response: O conteúdo HTML da página de detalhes do curso renderizada
+                  (ou 304, se o navegador já tiver a versão atual).
              Ou uma resposta de erro 404 se o curso não for encontrado.
     """
-    logger.info(f"GET /courses/{course_id} - Solicitando página de detalhes para o curso ID: {course_id}")
+    logger.info("GET /courses/%s - Solicitando página de detalhes do curso.", course_id)
     course = course_mgr.get_course_by_id(course_id)
     if not course:
         logger.warning(f"GET /courses/{course_id} - Curso não encontrado.")
         abort(404) # Usa abort para tratamento de erro padrão do Flask
 
+    return cached_page(("course_detail", course_id), course_data_version(course),
+                       lambda: _render_course_detail(course))
+
+def _render_course_detail(course):
+    """Renderiza o HTML da página de detalhes de um curso (sem cache)."""
+    course_id = course.get('id')
+
     # As lições são carregadas aqui para serem passadas ao template
     # O frontend não precisará fazer uma chamada API separada para as lições nesta página.
     lessons_file_relative_path = course.get("lessons_file")
@@ -94,7 +603,7 @@ def course_detail_page(course_id): # Renomeado para clareza
 
     return render_template('course_detail.html', course=course, lessons=lessons_for_course, title=course.get('name', 'Detalhes do Curso'))
 
-@app.route('/courses/<string:course_id>/lessons/<string:lesson_id_str>', methods=['GET'])
+@route('/courses/<string:course_id>/lessons/<string:lesson_id_str>', methods=['GET'])
 def lesson_detail_page(course_id, lesson_id_str): # Renomeado para clareza
     """Renderiza a página de detalhes de uma lição específica dentro de um curso.
 
@@ -107,29 +616,36 @@ def lesson_detail_page(course_id, lesson_id_str): # Renomeado para clareza
         course_id (str): O ID do curso ao qual a lição pertence.
         lesson_id_str (str): O ID da lição a ser exibida.
 
+    O HTML renderizado é reutilizado enquanto os dados do curso não mudarem
+    (veja `cached_page`).
+
     Returns:
-        str: O conteúdo HTML da página de detalhes da lição renderizada.
+        Response: O conteúdo HTML da página de detalhes da lição renderizada
+                  (ou 304, se o navegador já tiver a versão atual).
     """
-    logger.info(f"GET /courses/{course_id}/lessons/{lesson_id_str} - Solicitando página da lição.")
+    logger.info("GET /courses/%s/lessons/%s - Solicitando página da lição.", course_id, lesson_id_str)
     current_course = course_mgr.get_course_by_id(course_id)
     if not current_course:
         logger.warning(f"Curso '{course_id}' não encontrado ao tentar obter lição '{lesson_id_str}'.")
         abort(404)
 
+    return cached_page(("lesson_detail", course_id, lesson_id_str), course_data_version(current_course),
+                       lambda: _render_lesson_detail(current_course, lesson_id_str))
+
+def _render_lesson_detail(current_course, lesson_id_str):
+    """Renderiza o HTML da página de detalhes de uma lição (sem cache).
+
+    Aborta com 404 se a lição não existir, ou 500 se o curso não tiver 'lessons_file'.
+    """
+    course_id = current_course.get('id')
+
     lessons_file_relative_path = current_course.get("lessons_file")
     if not lessons_file_relative_path:
         logger.error(f"'lessons_file' não definido para o curso '{course_id}'.")
         abort(500, description="Configuração de lições ausente para este curso.")
 
-    all_lessons_for_course = lesson_mgr.load_lessons_from_file(lessons_file_relative_path)
-    
-    current_lesson = None
-    current_lesson_index = -1
-    for i, lesson_item_loop in enumerate(all_lessons_for_course):
-        if isinstance(lesson_item_loop, dict) and str(lesson_item_loop.get('id')) == lesson_id_str:
-            current_lesson = lesson_item_loop
-            current_lesson_index = i
-            break
+    lesson_index = lesson_mgr.get_lesson_index(lessons_file_relative_path)
+    current_lesson = lesson_index.get(lesson_id_str)
 
     if not current_lesson:
         logger.warning(f"Lição com ID '{lesson_id_str}' não encontrada no curso '{course_id}'.")
@@ -141,27 +657,16 @@ def lesson_detail_page(course_id, lesson_id_str): # Renomeado para clareza
     exercises_for_lesson = []
     exercises_file_relative_path = current_course.get("exercises_file")
     if exercises_file_relative_path:
-        all_exercises_for_course = exercise_mgr.load_exercises_from_file(exercises_file_relative_path)
+        # O índice já agrupa por lição apenas os exercícios do nível esperado do curso
+        exercise_index = exercise_mgr.get_exercise_index(exercises_file_relative_path, expected_exercise_level)
         lesson_actual_id = current_lesson.get('id') # ID da lição atual
-        if lesson_actual_id and all_exercises_for_course:
-            for ex_item in all_exercises_for_course:
-                # Log para depuração
-                logger.debug(f"Verificando exercício: ID='{ex_item.get('id')}', "
-                             f"LessonID_Ex='{ex_item.get('lesson_id')}', LessonID_Atual='{lesson_actual_id}', "
-                             f"Level_Ex='{ex_item.get('level', '').lower()}', Level_Esperado='{expected_exercise_level}'")
-                
-                # Verifica se o exercício pertence à lição atual E ao nível esperado do curso
-                if isinstance(ex_item, dict) and \
-                   str(ex_item.get('lesson_id')) == str(lesson_actual_id) and \
-                   (not expected_exercise_level or ex_item.get('level', '').lower() == expected_exercise_level):
-                    exercises_for_lesson.append(ex_item)
-        logger.debug(f"Encontrados {len(exercises_for_lesson)} exercícios para a lição '{lesson_actual_id}'.")
+        if lesson_actual_id:
+            exercises_for_lesson = exercise_index.for_lesson(lesson_actual_id)
+        logger.debug("Encontrados %d exercícios para a lição '%s'.", len(exercises_for_lesson), lesson_actual_id)
     else:
         logger.warning(f"Nenhum 'exercises_file' definido para o curso '{course_id}'.")
 
-    next_lesson_obj = None
-    if current_lesson_index != -1 and current_lesson_index < len(all_lessons_for_course) - 1:
-        next_lesson_obj = all_lessons_for_course[current_lesson_index + 1]
+    next_lesson_obj = lesson_index.next_lesson(lesson_id_str)
 
     return render_template('lesson_detail.html', # Assumindo que o template se chama lesson_detail.html
                            course=current_course,
@@ -170,7 +675,7 @@ def lesson_detail_page(course_id, lesson_id_str): # Renomeado para clareza
                            next_lesson=next_lesson_obj,
                            title=current_lesson.get('title', 'Lição'))
 
-@app.route('/courses/<string:course_id>/exercise/<string:exercise_id_str>/editor', methods=['GET'])
+@route('/courses/<string:course_id>/exercise/<string:exercise_id_str>/editor', methods=['GET'])
 def exercise_code_editor_page(course_id, exercise_id_str): # Renomeado para clareza
     """Renderiza a página do editor de código para um exercício específico.
 
@@ -186,7 +691,7 @@ def exercise_code_editor_page(course_id, exercise_id_str): # Renomeado para clar
     Returns:
         str: O conteúdo HTML da página do editor de código renderizada.
     """
-    logger.info(f"GET /courses/{course_id}/exercise/{exercise_id_str}/editor - Acessando editor de código.")
+    logger.info("GET /courses/%s/exercise/%s/editor - Acessando editor de código.", course_id, exercise_id_str)
     current_course = course_mgr.get_course_by_id(course_id)
     if not current_course:
         logger.warning(f"Editor: Curso '{course_id}' não encontrado.")
@@ -200,15 +705,11 @@ def exercise_code_editor_page(course_id, exercise_id_str): # Renomeado para clar
     course_level_from_course_json = current_course.get('level')
     expected_exercise_level = course_level_from_course_json.lower() if course_level_from_course_json else None
 
-    all_exercises_for_course = exercise_mgr.load_exercises_from_file(exercises_file_relative_path)
-    current_exercise = None
-    for ex_item in all_exercises_for_course:
-        if isinstance(ex_item, dict) and str(ex_item.get('id')) == exercise_id_str:
-            if not expected_exercise_level or ex_item.get('level', '').lower() == expected_exercise_level:
-                current_exercise = ex_item
-                break
-            else:
-                logger.warning(f"Editor: Exercício '{exercise_id_str}' encontrado, mas seu nível '{ex_item.get('level')}' não corresponde ao nível esperado do curso '{expected_exercise_level}'.")
+    current_exercise = exercise_mgr.get_exercise_index(exercises_file_relative_path, expected_exercise_level).get(exercise_id_str)
+    if not current_exercise and expected_exercise_level:
+        ex_item = exercise_mgr.get_exercise_index(exercises_file_relative_path).get(exercise_id_str)
+        if ex_item:
+            logger.warning(f"Editor: Exercício '{exercise_id_str}' encontrado, mas seu nível '{ex_item.get('level')}' não corresponde ao nível esperado do curso '{expected_exercise_level}'.")
 
     if not current_exercise:
         logger.warning(f"Editor: Exercício ID '{exercise_id_str}' não encontrado no curso '{course_id}' ou nível incompatível.")
@@ -219,7 +720,7 @@ def exercise_code_editor_page(course_id, exercise_id_str): # Renomeado para clar
                            exercise=current_exercise,
                            title=f"Editor: {current_exercise.get('title', 'Exercício')}")
 
-@app.route('/editor', methods=['GET'])
+@route('/editor', methods=['GET'])
 def generic_code_editor_page():
     """Renderiza uma página de editor de código genérico.
 
@@ -233,7 +734,7 @@ def generic_code_editor_page():
 
 # --- Rotas de API (JSON) ---
 
-@app.route('/api/courses/<string:course_id>/lessons', methods=['GET'])
+@route('/api/courses/<string:course_id>/lessons', methods=['GET'])
 def api_get_lessons_for_course(course_id):
     """API endpoint para obter as lições de um curso específico.
 
@@ -250,7 +751,7 @@ def api_get_lessons_for_course(course_id):
                 `{"error": "Arquivo de lições não definido para este curso"}`
 
     """
-    logger.info(f"API GET /courses/{course_id}/lessons - Solicitando lições para o curso ID: {course_id}")
+    logger.info("API GET /courses/%s/lessons - Solicitando lições do curso.", course_id)
     course = course_mgr.get_course_by_id(course_id)
     if not course:
         logger.warning(f"API GET /courses/{course_id}/lessons - Curso não encontrado.")
@@ -264,7 +765,7 @@ def api_get_lessons_for_course(course_id):
     lessons = lesson_mgr.load_lessons_from_file(lessons_file_relative_path)
     return jsonify(lessons)
 
-@app.route('/api/courses/<string:course_id>/exercises', methods=['GET'])
+@route('/api/courses/<string:course_id>/exercises', methods=['GET'])
 def api_get_exercises_for_course(course_id):
     """API endpoint para obter os exercícios de um curso específico.
 
@@ -281,7 +782,7 @@ def api_get_exercises_for_course(course_id):
                 `{"error": "Arquivo de exercícios não definido para este curso"}`
 
     """
-    logger.info(f"API GET /courses/{course_id}/exercises - Solicitando exercícios para o curso ID: {course_id}")
+    logger.info("API GET /courses/%s/exercises - Solicitando exercícios do curso.", course_id)
     course = course_mgr.get_course_by_id(course_id)
     if not course:
         logger.warning(f"API GET /courses/{course_id}/exercises - Curso não encontrado.")
@@ -295,7 +796,105 @@ def api_get_exercises_for_course(course_id):
     exercises = exercise_mgr.load_exercises_from_file(exercises_file_relative_path)
     return jsonify(exercises)
 
-@app.route('/api/execute-code', methods=['POST'])
+@route('/api/search', methods=['GET'])
+def api_search():
+    """API endpoint de busca textual nas lições e exercícios de todos os cursos (veja `search_index`).
+
+    Antes da busca, o índice é atualizado com os arquivos de dados alterados
+    (no máximo uma verificação a cada `SEARCH_CHECK_INTERVAL_SECONDS`).
+
+    Query Params:
+        q (str): A consulta. Acentos e maiúsculas são ignorados; o último termo vale como prefixo.
+        course_id (str, optional): Restringe a busca a um curso.
+        kind (str, optional): "lesson" ou "exercise".
+        limit (int, optional): Número máximo de resultados (padrão: 20, máximo: 100).
+
+    Returns:
+        Response: Um objeto JSON com os resultados, em ordem de relevância.
+            Em caso de sucesso (200 OK):
+                `{"query": "...", "results": [{"kind", "course_id", "id", "title", "summary", "score", "url"}, ...]}`
+            Em caso de parâmetros inválidos (400 Bad Request):
+                `{"error": "..."}`
+    """
+    query = request.args.get('q', '').strip()
+    kind = request.args.get('kind') or None
+    if kind not in (None, "lesson", "exercise"):
+        return jsonify({"error": "O parâmetro 'kind' deve ser 'lesson' ou 'exercise'"}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', SEARCH_DEFAULT_LIMIT)), 1), SEARCH_MAX_LIMIT)
+    except ValueError:
+        return jsonify({"error": "O parâmetro 'limit' deve ser um número inteiro"}), 400
+    if not query:
+        return jsonify({"query": query, "results": []})
+
+    search_index.sync(search_sources)
+    results = search_index.search(query, limit=limit, course_id=request.args.get('course_id') or None, kind=kind)
+    for result in results:
+        if result["kind"] == "lesson":
+            result["url"] = url_for('lesson_detail_page', course_id=result["course_id"], lesson_id_str=result["id"])
+        else:
+            result["url"] = url_for('exercise_code_editor_page', course_id=result["course_id"], exercise_id_str=result["id"])
+    logger.debug("API GET /api/search - %d resultados para '%s'.", len(results), query)
+    return jsonify({"query": query, "results": results})
+
+@route('/api/concepts', methods=['GET'])
+def api_get_concepts():
+    """API endpoint com os conceitos e módulos dos cursos em ordem de estudo.
+
+    Returns:
+        Response: Um objeto JSON com os nós do grafo em ordem topológica (cada
+            nó após seus pré-requisitos).
+            Em caso de sucesso (200 OK):
+                `{"order": ["introducao", ...], "nodes": [{"id", "kind", ...}, ...], "stats": {...}}`
+    """
+    graph = get_concept_graph()
+    return jsonify({"order": graph.order, "nodes": [graph.nodes[node_id] for node_id in graph.order],
+                    "stats": graph.stats()})
+
+@route('/api/concepts/<string:concept_id>/prerequisites', methods=['GET'])
+def api_get_concept_prerequisites(concept_id):
+    """API endpoint com tudo o que deve ser estudado antes de um conceito ou módulo.
+
+    Args:
+        concept_id (str): O conceito (ex: "funcoes") ou o módulo, como "curso.modulo"
+            (ex: "python-intermediario.poo-fundamentos").
+
+    Returns:
+        Response: Um objeto JSON com os pré-requisitos.
+            Em caso de sucesso (200 OK):
+                `{"id": "...", "direct": [...], "all": [...], "revisited_in": [...]}`
+            Em caso de conceito não encontrado (404 Not Found):
+                `{"error": "Conceito não encontrado"}`
+    """
+    prerequisites = get_concept_graph().prerequisites(concept_id)
+    if prerequisites is None:
+        logger.warning(f"API GET /concepts/{concept_id}/prerequisites - Conceito não encontrado.")
+        return jsonify({"error": "Conceito não encontrado"}), 404
+    return jsonify(prerequisites)
+
+@route('/api/concepts/path', methods=['GET'])
+def api_get_concept_path():
+    """API endpoint com o caminho mínimo de estudo entre dois conceitos ou módulos.
+
+    Query Params:
+        from (str): O nó de partida.
+        to (str): O nó de chegada.
+
+    Returns:
+        Response: Um objeto JSON com o caminho (`path` é null se não houver caminho).
+            Em caso de sucesso (200 OK):
+                `{"from": "...", "to": "...", "path": [{"from", "to", "relation"}, ...]}`
+            Em caso de conceito não encontrado (404 Not Found):
+                `{"error": "Conceito não encontrado: ..."}`
+    """
+    graph = get_concept_graph()
+    source, target = request.args.get('from', ''), request.args.get('to', '')
+    for node_id in (source, target):
+        if node_id not in graph:
+            return jsonify({"error": f"Conceito não encontrado: '{node_id}'"}), 404
+    return jsonify({"from": source, "to": target, "path": graph.shortest_path(source, target)})
+
+@route('/api/execute-code', methods=['POST'])
 def api_execute_code():
     """API endpoint para executar um trecho de código Python.
 
@@ -304,9 +903,16 @@ def api_execute_code():
 
     JSON de Requisição:
         {
-            "code": "str (código Python a ser executado)"
+            "code": "str (código Python a ser executado)",
+            "stdin": "str ou lista de linhas (opcional, entrada lida por input())",
+            "course_id": "str (opcional)",
+            "exercise_id": "str (opcional; com course_id, identifica o exercício em edição)"
         }
 
+    Se o exercício informado for marcado com `"deterministic": true`, o
+    resultado de uma execução anterior do mesmo código (e da mesma entrada)
+    é reutilizado do `result_cache`.
+
     JSON de Resposta:
         Sucesso na execução (200 OK):
             `{"success": true, "output": "str (stdout)", "details": "str (stderr, pode ser vazio)"}`
@@ -323,120 +929,426 @@ def api_execute_code():
         logger.warning("POST /api/execute-code - Payload inválido ou 'code' ausente.")
         return jsonify({"success": False, "output": "", "details": "Payload inválido ou campo 'code' ausente."}), 400
 
-    user_code = data['code']
     try:
-        exec_result = code_executor.execute_code(user_code)
-        success = exec_result["returncode"] == 0
-        output = exec_result["stdout"]
-        details = exec_result["stderr"]
-        if not success and not details and exec_result.get("error_type") == "SyntaxError":
-            details = "Erro de sintaxe no código."
-        elif not success and not details:
-            details = "Erro durante a execução do código."
-
-        logger.info(f"POST /api/execute-code - Execução: success={success}")
-        return jsonify({"success": success, "output": output, "details": details})
+        return jsonify(execute_code_request(data))
+    except ExecutorBusy:
+        raise
     except Exception as e:
         logger.error(f"POST /api/execute-code - Erro inesperado: {e}", exc_info=True)
         return jsonify({"success": False, "output": "", "details": f"Erro interno do servidor: {str(e)}"}), 500
 
-@app.route('/api/check-exercise', methods=['POST'])
-def api_check_exercise():
-    """API endpoint para verificar a solução de um exercício submetida pelo usuário.
+def execute_code_request(data, on_output=None, cancel=None):
+    """Executa o código de uma requisição no formato de `/api/execute-code`.
 
-    Recebe o código do usuário, o ID do curso e o ID do exercício.
-    Executa o código do usuário e, se houver um `test_code` associado ao
-    exercício, executa-o também. A saída do código do usuário é disponibilizada
-    para o `test_code` através de uma variável global `output` no escopo do teste.
+    Usada pela rota síncrona e pelos trabalhos assíncronos (`/api/jobs`).
+
+    Args:
+        data (dict): O payload, com "code" e, opcionalmente, "stdin", "course_id" e "exercise_id".
+        on_output (callable, optional): Recebe `(nome, texto)` a cada trecho de
+            saída. Um resultado reutilizado do cache é repassado como um único trecho.
+            Quando informado, o "output" do resultado não repete a saída já
+            repassada (exceto para exercícios cujo resultado vai para o cache).
+        cancel (threading.Event, optional): Interrompe a execução quando sinalizado.
+
+    Returns:
+        dict: `{"success", "output", "details"}`.
+
+    Raises:
+        ExecutorBusy: Se o pool de execução recusar a chamada.
+    """
+    user_code = data['code']
+    cache_key = exercise = None
+    course = course_mgr.get_course_by_id(data['course_id']) if data.get('course_id') else None
+    if course and data.get('exercise_id') is not None:
+        exercise = exercise_mgr.get_exercise_index(course.get("exercises_file")).get(str(data['exercise_id']))
+        cache_key = result_cache_key("execute", course, exercise, user_code, json.dumps(data.get('stdin')))
+    if cache_key is not None:
+        cached_result = result_cache.get(cache_key)
+        if cached_result is not None:
+            logger.info("Execução - Resultado reutilizado do cache.")
+            if on_output is not None and cached_result["output"]:
+                on_output("stdout", cached_result["output"])
+            return cached_result
+
+    # Execução livre: o exercício informado pelo cliente não amplia os limites
+    # (veja `execution_limits_for`); ele só identifica o resultado no cache
+    limits = execution_limits_for()
+    rejected = preflight_result(user_code, course)
+    if rejected is not None:
+        exec_result, output = rejected, ""
+    elif on_output is None:
+        exec_result = get_executor().execute_code(user_code, limits=limits, stdin=data.get('stdin'))
+        output = exec_result["stdout"]
+    elif cache_key is None:
+        # A saída já repassada a `on_output` não é acumulada novamente: o
+        # resultado traz apenas o que não foi repassado
+        exec_result = get_executor().execute_code_stream(user_code, on_output, limits=limits,
+                                                         stdin=data.get('stdin'), cancel=cancel)
+        output = exec_result["stdout"]
+    else:
+        # O resultado vai para o cache e precisa da saída completa (limitada
+        # por `limits.max_output_bytes`, aplicado pelo executor ao total repassado)
+        stdout_parts = []
+
+        def forward(name, text):
+            if name == "stdout":
+                stdout_parts.append(text)
+            on_output(name, text)
+
+        exec_result = get_executor().execute_code_stream(user_code, forward, limits=limits,
+                                                         stdin=data.get('stdin'), cancel=cancel)
+        output = "".join(stdout_parts) + exec_result["stdout"]
+    success = exec_result["returncode"] == 0
+    details = exec_result["stderr"]
+    if not success and not details and exec_result.get("error_type") == "SyntaxError":
+        details = "Erro de sintaxe no código."
+    elif not success and not details:
+        details = "Erro durante a execução do código."
+
+    logger.info("Execução - success=%s", success)
+    result = {"success": success, "output": output, "details": details}
+    if cache_key is not None and is_cacheable(result):
+        result_cache.put(cache_key, result)
+    return result
+
+def _sse_event(event, data):
+    """Formata um evento Server-Sent Events com `data` serializado em JSON."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@route('/api/execute-code/stream', methods=['POST'])
+def api_execute_code_stream():
+    """API endpoint para executar código Python enviando a saída à medida que é produzida.
+
+    Variante de `/api/execute-code` para programas longos ou com muita saída.
+    A resposta é um fluxo Server-Sent Events (`text/event-stream`):
+
+        event: stdout (ou stderr)
+        data: {"text": "str (trecho da saída)"}
+
+        event: result
+        data: {"success": bool, "details": "str (mensagem de erro, pode ser vazia)"}
+
+    O evento `result` é sempre o último. Os trechos aguardam envio em uma fila
+    limitada (`STREAM_QUEUE_SIZE`): se o navegador consumir mais devagar do que
+    o programa escreve, a execução é desacelerada em vez de acumular a saída
+    em memória. Trechos consecutivos do mesmo stream são agrupados em um evento.
 
     JSON de Requisição:
         {
-            "course_id": "str",
-            "exercise_id": "str_ou_int",
-            "code": "str (código do usuário)"
+            "code": "str (código Python a ser executado)",
+            "stdin": "str ou lista de linhas (opcional, entrada lida por input())",
+            "course_id": "str (opcional, seleciona as regras da verificação prévia pelo nível do curso)"
         }
 
-    JSON de Resposta (200 OK, mesmo em caso de falha na lógica do exercício):
-        Sucesso (código do usuário executou e testes passaram, ou não há testes):
-            `{"success": true, "output": "str (saída combinada)", "details": "str (mensagens do teste, ex: 'SUCCESS')"}`
-        Falha (código do usuário com erro, ou testes falharam):
-            `{"success": false, "output": "str (saída até o erro)", "details": "str (mensagem de erro)"}`
-        Payload inválido (400 Bad Request):
-            `{"success": false, "output": "", "details": "Payload inválido..."}`
-        Curso/Exercício não encontrado (404 Not Found):
-            `{"success": false, "output": "", "details": "Curso/Exercício não encontrado..."}`
-        Erro de configuração (500 Internal Server Error):
-            `{"success": false, "output": "", "details": "Arquivo de exercícios não definido..."}`
-        Erro interno do servidor (500 Internal Server Error):
-            `{"success": false, "output": "", "details": "Erro interno do servidor ao verificar: <mensagem>"}`
-
     Returns:
-        Response: Uma resposta JSON contendo o resultado da verificação.
+        Response: O fluxo de eventos, ou um JSON de erro (400) para payload inválido.
     """
-    logger.info("POST /api/check-exercise - Recebida requisição para verificar exercício.")
-    data = request.get_json()
-    if not data or not all(k in data for k in ['course_id', 'exercise_id', 'code']):
-        logger.warning("POST /api/check-exercise - Payload inválido ou campos ausentes.")
-        return jsonify({"success": False, "output": "", "details": "Payload inválido. 'course_id', 'exercise_id', e 'code' são obrigatórios."}), 400
+    logger.info("POST /api/execute-code/stream - Recebida requisição para executar código com streaming.")
+    data = request.get_json(silent=True)
+    if not data or 'code' not in data:
+        logger.warning("POST /api/execute-code/stream - Payload inválido ou 'code' ausente.")
+        return jsonify({"success": False, "output": "", "details": "Payload inválido ou campo 'code' ausente."}), 400
 
-    course_id = data['course_id']
-    exercise_id_str = str(data['exercise_id'])
     user_code = data['code']
+    stdin = data.get('stdin')
+    executor = get_executor()
+    limits = execution_limits_for()
+    course = course_mgr.get_course_by_id(data['course_id']) if data.get('course_id') else None
+    rejected = preflight_result(user_code, course)
+    chunks = queue.Queue(maxsize=current_app.config['STREAM_QUEUE_SIZE'])
+    cancelled = threading.Event()
+
+    def put(item):
+        # Bloqueia enquanto a fila estiver cheia; desiste se o cliente desconectar.
+        while not cancelled.is_set():
+            try:
+                chunks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def run():
+        if rejected is not None:
+            put(("result", rejected))
+            return
+        try:
+            # Se o cliente desconectar, o backend interrompe a execução (e substitui o trabalhador)
+            result = executor.execute_code_stream(user_code, lambda name, text: put(("output", name, text)),
+                                                  limits=limits, stdin=stdin, cancel=cancelled)
+        except ExecutorBusy as e:
+            result = {"returncode": 1, "stdout": "", "stderr": _busy_result(e)["details"], "error_type": "ExecutorBusy"}
+        except Exception as e:
+            logger.error(f"POST /api/execute-code/stream - Erro inesperado: {e}", exc_info=True)
+            result = {"returncode": 1, "stdout": "", "stderr": f"Erro interno do servidor: {str(e)}", "error_type": type(e).__name__}
+        put(("result", result))
+
+    threading.Thread(target=run, name="execute-code-stream", daemon=True).start()
+
+    def generate():
+        try:
+            while True:
+                items = [chunks.get()]
+                while len(items) < 64:
+                    try:
+                        items.append(chunks.get_nowait())
+                    except queue.Empty:
+                        break
+                # Agrupa trechos consecutivos do mesmo stream em um único evento
+                stream_name, text_parts = None, []
+                for item in items:
+                    if item[0] == "output" and item[1] == stream_name:
+                        text_parts.append(item[2])
+                        continue
+                    if text_parts:
+                        yield _sse_event(stream_name, {"text": "".join(text_parts)})
+                    stream_name, text_parts = None, []
+                    if item[0] == "output":
+                        stream_name, text_parts = item[1], [item[2]]
+                        continue
+                    result = item[1]
+                    success = result["returncode"] == 0
+                    details = result["stderr"]
+                    if not success and not details:
+                        details = "Erro de sintaxe no código." if result.get("error_type") == "SyntaxError" else "Erro durante a execução do código."
+                    logger.info("POST /api/execute-code/stream - Execução: success=%s", success)
+                    yield _sse_event("result", {"success": success, "details": details})
+                    return
+                if text_parts:
+                    yield _sse_event(stream_name, {"text": "".join(text_parts)})
+        finally:
+            cancelled.set()
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no' # Evita o buffering em proxies como o nginx
+    return response
+
+@route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """API endpoint para executar código de forma assíncrona.
+
+    Registra um trabalho e retorna seu ID imediatamente, sem ocupar a thread
+    da requisição durante a execução (veja `jobs`). O andamento é consultado
+    com `GET /api/jobs/<job_id>`, e o trabalho pode ser cancelado com
+    `DELETE /api/jobs/<job_id>`.
+
+    JSON de Requisição:
+        O mesmo de `/api/execute-code`.
+
+    JSON de Resposta:
+        Trabalho registrado (202 Accepted, com o cabeçalho `Location`):
+            `{"job_id": "str", "status": "queued", "chunks": [], "offset": 0}`
+        Payload inválido (400 Bad Request) ou trabalhos demais em andamento (429, com `Retry-After`):
+            `{"success": false, "output": "", "details": "..."}`
+
+    Returns:
+        Response: O estado do trabalho, ou um JSON de erro.
+    """
+    data = request.get_json(silent=True)
+    if not data or 'code' not in data:
+        logger.warning("POST /api/jobs - Payload inválido ou 'code' ausente.")
+        return jsonify({"success": False, "output": "", "details": "Payload inválido ou campo 'code' ausente."}), 400
+    active_app = current_app._get_current_object()
+
+    def run(job):
+        # O trabalho roda em outra thread, fora do contexto da requisição
+        with active_app.app_context():
+            try:
+                return execute_code_request(data, on_output=job.append_output, cancel=job.cancel_event)
+            except ExecutorBusy as e:
+                return _busy_result(e)
+
+    try:
+        job = job_manager.submit(run)
+    except TooManyJobs as e:
+        logger.warning("POST /api/jobs - Trabalho recusado: %s", e)
+        response = jsonify({"success": False, "output": "", "details": str(e)})
+        response.status_code = 429
+        response.headers['Retry-After'] = '1'
+        return response
+    logger.info("POST /api/jobs - Trabalho %s registrado.", job.id)
+    response = jsonify(job.to_dict())
+    response.status_code = 202
+    response.headers['Location'] = f"/api/jobs/{job.id}"
+    return response
+
+@route('/api/jobs/<string:job_id>', methods=['GET'])
+def api_get_job(job_id):
+    """API endpoint com o andamento de um trabalho assíncrono.
+
+    Query Params:
+        offset (int, optional): Número de trechos de saída já recebidos; apenas
+            os trechos seguintes são retornados.
+
+    JSON de Resposta (200 OK):
+        `{"job_id", "status": "queued|running|done|failed|cancelled",
+          "chunks": [["stdout"|"stderr", "texto"], ...], "offset": int,
+          "result": {"success", "output", "details"} (apenas quando concluído)}`
+        A saída é entregue pelos trechos; o "output" do resultado não a repete.
+        Trabalho inexistente ou expirado: 404.
+
+    Returns:
+        Response: O estado do trabalho.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Trabalho '{job_id}' não encontrado."}), 404
+    return jsonify(job.to_dict(request.args.get('offset', 0, type=int)))
+
+@route('/api/jobs/<string:job_id>', methods=['DELETE'])
+def api_cancel_job(job_id):
+    """API endpoint que cancela um trabalho assíncrono.
+
+    Um trabalho em execução tem seu processo trabalhador encerrado; a
+    resposta pode ainda indicar "running" até que o cancelamento seja
+    concluído.
+
+    Returns:
+        Response: O estado do trabalho (200 OK), ou 404 se ele não existir.
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"error": f"Trabalho '{job_id}' não encontrado."}), 404
+    logger.info("DELETE /api/jobs - Cancelamento do trabalho %s pedido.", job_id)
+    return jsonify(job.to_dict())
+
+def _grade_test_cases(course_id, exercise_id_str, exercise, exercises_file_relative_path, user_code, limits, run_all_cases):
+    """Corrige uma submissão pelos casos de teste estruturados do exercício ("test_cases").
+
+    Returns:
+        tuple: O dicionário de resultado no formato de `/api/check-exercise`,
+               acrescido de `cases` (resultado de cada caso), e o status HTTP 200.
+    """
+    version = exercise_mgr.get_file_version(exercises_file_relative_path)
+    graded = run_test_cases(
+        get_executor(), user_code, exercise["test_cases"], limits=limits, stop_on_failure=not run_all_cases,
+        compile_check=lambda index, source: compiled_code_cache.get(course_id, f"{exercise_id_str}#caso{index}", source, version=version))
 
+    if graded["success"]:
+        details = f"Todos os {graded['total']} casos de teste passaram."
+    else:
+        first_failure = next(case for case in graded["cases"] if case["status"] == "failed")
+        details = (f"Caso '{first_failure['name']}' falhou: {first_failure['details']} "
+                   f"({graded['passed']} de {graded['total']} casos passaram)")
+    logger.info("Verificação - Casos de teste: %d/%d passaram.", graded['passed'], graded['total'])
+    return {"success": graded["success"], "output": graded["output"], "details": details, "cases": graded["cases"]}, 200
+
+def check_submission(course_id, exercise_id_str, user_code, run_all_cases=False):
+    """Verifica a solução de um exercício e retorna o resultado no formato de `/api/check-exercise`.
+
+    Localiza o exercício (respeitando o nível do curso) e executa o código do
+    usuário seguido, se houver, do `test_code` do exercício, em uma única
+    execução e no mesmo escopo: o teste pode inspecionar as funções e variáveis
+    do usuário, e a saída dele fica disponível na variável global `output`.
+    Se o exercício declarar casos de teste estruturados ("test_cases", veja
+    `grading`), eles são usados no lugar do `test_code`. Não depende do contexto
+    da requisição, podendo ser chamada de outras threads (ex: verificação em lote).
+    Para exercícios marcados com `"deterministic": true`, o resultado de um
+    código já verificado é reutilizado do `result_cache`. Código com erro de
+    sintaxe ou construções proibidas para o nível do curso é recusado pela
+    verificação prévia (`preflight_result`), sem execução.
+
+    Args:
+        course_id (str): O ID do curso.
+        exercise_id_str (str): O ID do exercício.
+        user_code (str): O código submetido pelo usuário.
+        run_all_cases (bool): Com casos de teste, executa todos mesmo após uma
+                              falha (por padrão, para na primeira).
+
+    Returns:
+        tuple: O dicionário de resultado (`success`, `output`, `details` e, com
+               casos de teste, `cases`) e o código de status HTTP correspondente.
+    """
     course = course_mgr.get_course_by_id(course_id)
     if not course:
-        logger.warning(f"POST /api/check-exercise - Curso '{course_id}' não encontrado.")
-        return jsonify({"success": False, "output": "", "details": f"Curso '{course_id}' não encontrado."}), 404
+        logger.warning(f"Verificação - Curso '{course_id}' não encontrado.")
+        return {"success": False, "output": "", "details": f"Curso '{course_id}' não encontrado."}, 404
 
     exercises_file_relative_path = course.get("exercises_file")
     if not exercises_file_relative_path:
-        logger.error(f"POST /api/check-exercise - 'exercises_file' não definido para o curso '{course_id}'.")
-        return jsonify({"success": False, "output": "", "details": "Arquivo de exercícios não definido para este curso."}), 500
+        logger.error(f"Verificação - 'exercises_file' não definido para o curso '{course_id}'.")
+        return {"success": False, "output": "", "details": "Arquivo de exercícios não definido para este curso."}, 500
 
     course_level_from_course_json = course.get('level')
     expected_exercise_level = course_level_from_course_json.lower() if course_level_from_course_json else None
 
-    exercises = exercise_mgr.load_exercises_from_file(exercises_file_relative_path)
-    exercise_details_to_check = None
-    for ex_item in exercises:
-        if isinstance(ex_item, dict) and str(ex_item.get('id')) == exercise_id_str:
-            if not expected_exercise_level or ex_item.get('level', '').lower() == expected_exercise_level:
-                exercise_details_to_check = ex_item
-                break
+    exercise_details_to_check = exercise_mgr.get_exercise_index(exercises_file_relative_path, expected_exercise_level).get(exercise_id_str)
 
     if not exercise_details_to_check:
-        logger.warning(f"POST /api/check-exercise - Exercício '{exercise_id_str}' não encontrado no curso '{course_id}' ou nível incompatível.") # No Linter: Adicionar espaço antes do #
-        return jsonify({"success": False, "output": "", "details": f"Exercício '{exercise_id_str}' não encontrado no curso '{course_id}'."}), 404
+        logger.warning(f"Verificação - Exercício '{exercise_id_str}' não encontrado no curso '{course_id}' ou nível incompatível.") # No Linter: Adicionar espaço antes do #
+        return {"success": False, "output": "", "details": f"Exercício '{exercise_id_str}' não encontrado no curso '{course_id}'."}, 404
+
+    cache_key = result_cache_key("check", course, exercise_details_to_check, user_code, run_all_cases)
+    if cache_key is not None:
+        cached_result = result_cache.get(cache_key)
+        if cached_result is not None:
+            logger.info("Verificação - Resultado reutilizado do cache para '%s'.", exercise_id_str)
+            return cached_result, 200
+
+    rejected = preflight_result(user_code, course)
+    if rejected is not None:
+        logger.info("Verificação - Código recusado na verificação prévia: %s", rejected["error_type"])
+        result, status = {"success": False, "output": "", "details": rejected["stderr"]}, 200
+    else:
+        result, status = _evaluate_submission(course_id, exercise_id_str, exercise_details_to_check,
+                                              exercises_file_relative_path, user_code, run_all_cases)
+    if cache_key is not None and status == 200 and is_cacheable(result):
+        result_cache.put(cache_key, result)
+    return result, status
+
+def _evaluate_submission(course_id, exercise_id_str, exercise_details_to_check, exercises_file_relative_path, user_code, run_all_cases):
+    """Executa a verificação de uma submissão já localizada (veja `check_submission`).
 
+    Returns:
+        tuple: O dicionário de resultado e o código de status HTTP.
+    """
     test_code = exercise_details_to_check.get("test_code", "")
+    limits = execution_limits_for(exercise_details_to_check)
+    if exercise_details_to_check.get("test_cases"):
+        try:
+            return _grade_test_cases(course_id, exercise_id_str, exercise_details_to_check,
+                                     exercises_file_relative_path, user_code, limits, run_all_cases)
+        except ExecutorBusy:
+            raise
+        except Exception as e:
+            logger.error(f"Verificação - Erro inesperado nos casos de teste: {e}", exc_info=True)
+            return {"success": False, "output": "", "details": f"Erro interno do servidor ao verificar: {str(e)}"}, 500
     # full_code_to_execute = user_code.rstrip() + "\n\n" + test_code # Lógica antiga
 
     try:
-        # 1. Executar o código do usuário e capturar sua saída
-        user_exec_result = code_executor.execute_code(user_code)
-        user_stdout = user_exec_result["stdout"]
-        user_stderr = user_exec_result["stderr"]
-        user_success = user_exec_result["returncode"] == 0
-        
+        # O test_code é compilado uma vez por versão do arquivo de exercícios
+        compiled_test_code = compiled_code_cache.get(
+            course_id, exercise_id_str, test_code,
+            version=exercise_mgr.get_file_version(exercises_file_relative_path)) if test_code else None
+
+        # 1. Executar o código do usuário e, se ele terminar sem erros, o test_code,
+        # em uma única execução: o test_code compartilha o escopo do usuário (pode
+        # inspecionar funções e variáveis) e recebe a saída dele na variável `output`.
+        # A entrada declarada no exercício ("stdin") alimenta as chamadas a input()
+        exec_result = get_executor().execute_submission(user_code, compiled_test_code, limits=limits,
+                                                        stdin=exercise_details_to_check.get("stdin"))
+        user_stdout = exec_result["stdout"]
+        user_stderr = exec_result["stderr"]
+        user_success = exec_result["returncode"] == 0
+        test_exec_result = exec_result.get("test")
+
         # Inicializa 'output' com a saída do código do usuário.
-        # Será sobrescrito pela saída do test_code se este for executado.
+        # Será complementado pela saída do test_code se este for executado.
         api_output_response = user_stdout 
         details = user_stderr # Detalhes podem vir do erro do usuário ou do teste
         success = False # Assume que falha até que o test_code passe ou não haja test_code
 
         if not user_success:
-            # Se o código do usuário já falhou (ex: SyntaxError), não precisamos rodar o test_code
+            # Se o código do usuário já falhou (ex: SyntaxError), o test_code não foi executado
             details = user_stderr if user_stderr else "Erro de sintaxe ou execução no seu código."
-            logger.info(f"POST /api/check-exercise - Código do usuário falhou. Details: {details}")
+            logger.info("Verificação - Código do usuário falhou. Details: %s", details)
         elif not test_code:
             # Se não há test_code, o sucesso depende apenas da execução do user_code
             success = user_success
             # 'api_output_response' já é user_stdout
             details = "Código executado (sem testes automáticos)." if success else (details or "Erro na execução do código do usuário.")
         else:
-            # 2. Preparar e executar o test_code com a saída do user_code disponível
-            test_globals = {'output': user_stdout} # Disponibiliza a saída do user_code para o test_code
-            test_exec_result = code_executor.execute_code(test_code, execution_globals=test_globals)
+            # 2. Avaliar o resultado do test_code
             success = test_exec_result["returncode"] == 0
             
             # O 'output' da API deve combinar o stdout do user_code e do test_code
@@ -445,14 +1357,9 @@ def api_check_exercise():
             if test_exec_result["stdout"]:
                 api_output_response = (api_output_response or "") + test_exec_result["stdout"]
 
-            # Os 'details' devem incluir o tipo de erro se houver
+            # O stderr do test_code já começa com o tipo do erro (ex: "AssertionError: ...")
             details_from_test_code = test_exec_result["stderr"]
-            error_type_from_test = test_exec_result.get("error_type")
-
-            if error_type_from_test:
-                details = f"{error_type_from_test}: {details_from_test_code}"
-            else:
-                details = details_from_test_code if details_from_test_code else ("Teste falhou sem stderr específico." if not success else "Teste passou.")
+            details = details_from_test_code if details_from_test_code else ("Teste falhou sem stderr específico." if not success else "Teste passou.")
             # Se o user_code teve stderr, mas o test_code passou, podemos querer limpar os detalhes ou priorizar os do teste.
 
         if not test_code and success:
@@ -460,14 +1367,187 @@ def api_check_exercise():
         elif not test_code and not success:
             details = f"Erro ao executar o código: {details if details else 'Erro desconhecido'}"
         
-        logger.info(f"POST /api/check-exercise - Verificação: success={success}")
-        return jsonify({"success": success, "output": api_output_response, "details": details})
+        logger.info("Verificação - Resultado: success=%s", success)
+        return {"success": success, "output": api_output_response, "details": details}, 200
+    except ExecutorBusy:
+        raise
     except Exception as e:
-        logger.error(f"POST /api/check-exercise - Erro inesperado: {e}", exc_info=True)
-        return jsonify({"success": False, "output": "", "details": f"Erro interno do servidor ao verificar: {str(e)}"}), 500 # No Linter: Adicionar espaço antes do #
+        logger.error(f"Verificação - Erro inesperado: {e}", exc_info=True)
+        return {"success": False, "output": "", "details": f"Erro interno do servidor ao verificar: {str(e)}"}, 500 # No Linter: Adicionar espaço antes do #
+
+
+@route('/api/check-exercise', methods=['POST'])
+def api_check_exercise():
+    """API endpoint para verificar a solução de um exercício submetida pelo usuário.
+
+    Recebe o código do usuário, o ID do curso e o ID do exercício.
+    Executa o código do usuário e, se houver um `test_code` associado ao
+    exercício, executa-o também. A saída do código do usuário é disponibilizada
+    para o `test_code` através de uma variável global `output` no escopo do teste.
+
+    JSON de Requisição:
+        {
+            "course_id": "str",
+            "exercise_id": "str_ou_int",
+            "code": "str (código do usuário)",
+            "run_all_cases": "bool (opcional; com casos de teste, executa todos em vez de parar na primeira falha)"
+        }
+
+    Se o exercício tiver casos de teste ("test_cases"), a resposta inclui também
+    `"cases": [{"name", "status", "details", "output", "seconds"}, ...]`.
+
+    JSON de Resposta (200 OK, mesmo em caso de falha na lógica do exercício):
+        Sucesso (código do usuário executou e testes passaram, ou não há testes):
+            `{"success": true, "output": "str (saída combinada)", "details": "str (mensagens do teste, ex: 'SUCCESS')"}`
+        Falha (código do usuário com erro, ou testes falharam):
+            `{"success": false, "output": "str (saída até o erro)", "details": "str (mensagem de erro)"}`
+        Payload inválido (400 Bad Request):
+            `{"success": false, "output": "", "details": "Payload inválido..."}`
+        Curso/Exercício não encontrado (404 Not Found):
+            `{"success": false, "output": "", "details": "Curso/Exercício não encontrado..."}`
+        Erro de configuração (500 Internal Server Error):
+            `{"success": false, "output": "", "details": "Arquivo de exercícios não definido..."}`
+        Erro interno do servidor (500 Internal Server Error):
+            `{"success": false, "output": "", "details": "Erro interno do servidor ao verificar: <mensagem>"}`
+
+    Returns:
+        Response: Uma resposta JSON contendo o resultado da verificação.
+    """
+    logger.info("POST /api/check-exercise - Recebida requisição para verificar exercício.")
+    data = request.get_json()
+    if not data or not all(k in data for k in ['course_id', 'exercise_id', 'code']):
+        logger.warning("POST /api/check-exercise - Payload inválido ou campos ausentes.")
+        return jsonify({"success": False, "output": "", "details": "Payload inválido. 'course_id', 'exercise_id', e 'code' são obrigatórios."}), 400
+
+    course_id = data['course_id']
+    exercise_id_str = str(data['exercise_id'])
+    user_code = data['code']
+
+    result, status = check_submission(course_id, exercise_id_str, user_code,
+                                      run_all_cases=bool(data.get('run_all_cases', False)))
+    return jsonify(result), status
+
+def _parse_batch_items(data):
+    """Normaliza o payload da verificação em lote em uma lista de submissões.
+
+    Aceita `{"submissions": [{"course_id", "exercise_id", "code"}, ...]}` ou
+    `{"course_id", "exercise_id", "codes": [...]}` (um exercício, vários códigos).
+
+    Returns:
+        list | None: Lista de tuplas (course_id, exercise_id_str, code), ou None se o payload for inválido.
+    """
+    if not isinstance(data, dict):
+        return None
+    if 'submissions' in data:
+        submissions = data['submissions']
+        if not isinstance(submissions, list) or not all(
+                isinstance(item, dict) and all(k in item for k in ['course_id', 'exercise_id', 'code'])
+                for item in submissions):
+            return None
+        return [(item['course_id'], str(item['exercise_id']), item['code']) for item in submissions]
+    if all(k in data for k in ['course_id', 'exercise_id', 'codes']) and isinstance(data['codes'], list):
+        return [(data['course_id'], str(data['exercise_id']), code) for code in data['codes']]
+    return None
+
+@route('/api/check-exercises/batch', methods=['POST'])
+def api_check_exercises_batch():
+    """API endpoint para verificar várias submissões em uma única requisição.
+
+    Usado, por exemplo, para corrigir novamente uma turma inteira após a
+    correção de um exercício. As submissões são distribuídas entre threads
+    que despacham para os trabalhadores paralelos do backend de execução, e
+    os resultados são enviados à medida que ficam prontos (não necessariamente
+    na ordem de envio), no formato NDJSON: uma linha JSON por submissão.
+
+    JSON de Requisição (uma das formas):
+        `{"submissions": [{"course_id": "str", "exercise_id": "str_ou_int", "code": "str"}, ...]}`
+        `{"course_id": "str", "exercise_id": "str_ou_int", "codes": ["str", ...]}`
+
+    Resposta (200 OK, `application/x-ndjson`), uma linha por submissão:
+        `{"index": int, "status": int, "success": bool, "output": "str", "details": "str"}`
+        onde `index` é a posição da submissão na requisição e `status` é o código
+        HTTP que `/api/check-exercise` retornaria para ela. Os demais campos têm
+        o mesmo formato da resposta de `/api/check-exercise`.
+        Payload inválido ou lote grande demais (400 Bad Request):
+            `{"success": false, "output": "", "details": "..."}`
+
+    Returns:
+        Response: A resposta em streaming com os resultados.
+    """
+    logger.info("POST /api/check-exercises/batch - Recebida requisição de verificação em lote.")
+    items = _parse_batch_items(request.get_json(silent=True))
+    if items is None:
+        logger.warning("POST /api/check-exercises/batch - Payload inválido.")
+        return jsonify({"success": False, "output": "", "details": "Payload inválido. Envie 'submissions' (lista de objetos com 'course_id', 'exercise_id' e 'code') ou 'course_id', 'exercise_id' e 'codes'."}), 400
+
+    max_items = current_app.config['BATCH_MAX_ITEMS']
+    if len(items) > max_items:
+        logger.warning(f"POST /api/check-exercises/batch - Lote com {len(items)} itens excede o máximo de {max_items}.")
+        return jsonify({"success": False, "output": "", "details": f"O lote excede o máximo de {max_items} submissões."}), 400
+
+    executor = get_executor()
+    parallel = current_app.config.get('BATCH_MAX_PARALLEL') or getattr(executor, 'size', None) or os.cpu_count() or 1
+    logger.info("POST /api/check-exercises/batch - Verificando %d submissões com até %s em paralelo.", len(items), parallel)
+    active_app = current_app._get_current_object()
+
+    def check_in_context(*item):
+        # As verificações rodam em outras threads, fora do contexto da requisição
+        with active_app.app_context():
+            return check_submission(*item)
+
+    def generate():
+        thread_pool = ThreadPoolExecutor(max_workers=max(1, min(parallel, len(items))),
+                                         thread_name_prefix="batch-check")
+        try:
+            futures = {thread_pool.submit(check_in_context, *item): index for index, item in enumerate(items)}
+            for future in as_completed(futures):
+                try:
+                    result, status = future.result()
+                except ExecutorBusy as e:
+                    result, status = _busy_result(e), 429
+                except Exception as e:
+                    logger.error(f"POST /api/check-exercises/batch - Erro inesperado: {e}", exc_info=True)
+                    result, status = {"success": False, "output": "", "details": f"Erro interno do servidor ao verificar: {str(e)}"}, 500
+                yield json.dumps({"index": futures[future], "status": status, **result}, ensure_ascii=False) + "\n"
+        finally:
+            # Se o cliente desconectar, as submissões ainda não iniciadas são descartadas.
+            thread_pool.shutdown(wait=False, cancel_futures=True)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Endpoint de métricas no formato de texto do Prometheus (veja `metrics`).
+
+    Inclui as execuções de código por tipo de erro, o estado e a fila do pool
+    de execução, os acertos e recarregamentos dos caches e os histogramas de
+    tempo por rota e fase.
+
+    Returns:
+        Response: O texto de exposição das métricas.
+    """
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+@route('/api/instrumentation/report', methods=['GET'])
+def api_instrumentation_report():
+    """API endpoint com o relatório de instrumentação das requisições.
+
+    Query Params:
+        format (str, optional): "text" para o relatório em texto; por padrão, JSON.
+
+    JSON de Resposta (200 OK):
+        `{"routes": {rota: {fase: {"count", "sum_ms", "mean_ms", "max_ms", "p50_ms", "p95_ms", "p99_ms", "buckets"}}},
+          "profiles": [{"endpoint", "method", "path", "total_ms", "stats"}, ...]}`
+
+    Returns:
+        Response: O relatório em JSON ou em texto.
+    """
+    if request.args.get('format') == 'text':
+        return Response(instrumentation.format_report(), mimetype='text/plain')
+    return jsonify(instrumentation.report())
 
 # --- Rota Legada (Manter por compatibilidade ou remover se não for mais usada) ---
-@app.route('/submit_exercise/<string:course_id>/<string:exercise_id_str>', methods=['POST'])
+@route('/submit_exercise/<string:course_id>/<string:exercise_id_str>', methods=['POST'])
 def submit_exercise_solution_legacy(course_id, exercise_id_str):
     """Rota legada para submissão de solução de exercício.
 
@@ -486,7 +1566,7 @@ def submit_exercise_solution_legacy(course_id, exercise_id_str):
     Returns:
         Response: JSON com o resultado da execução, similar a `/api/check-exercise`.
     """
-    logger.info(f"POST /submit_exercise/{course_id}/{exercise_id_str} (legacy) - Submetendo solução.")
+    logger.info("POST /submit_exercise/%s/%s (legacy) - Submetendo solução.", course_id, exercise_id_str)
     # Esta rota agora redireciona sua lógica para a nova API /api/check-exercise
     # para evitar duplicação de código.
     
@@ -530,21 +1610,21 @@ def submit_exercise_solution_legacy(course_id, exercise_id_str):
     course_level_from_course_json = course.get('level')
     expected_exercise_level = course_level_from_course_json.lower() if course_level_from_course_json else None
 
-    exercises = exercise_mgr.load_exercises_from_file(exercises_file_relative_path)
-    exercise_details_to_check = None
-    for ex_item in exercises:
-        if isinstance(ex_item, dict) and str(ex_item.get('id')) == exercise_id_str:
-            if not expected_exercise_level or ex_item.get('level', '').lower() == expected_exercise_level:
-                exercise_details_to_check = ex_item
-                break
+    exercise_details_to_check = exercise_mgr.get_exercise_index(exercises_file_relative_path, expected_exercise_level).get(exercise_id_str)
     
     if not exercise_details_to_check:
         return jsonify({"success": False, "output": "", "details": f"Exercício '{exercise_id_str}' não encontrado."}), 404
 
+    rejected = preflight_result(user_code, course)
+    if rejected is not None:
+        logger.info("POST /submit_exercise (legacy) - Código recusado na verificação prévia: %s", rejected["error_type"])
+        return jsonify({"success": False, "output": "", "details": rejected["stderr"]})
+
     test_code = exercise_details_to_check.get("test_code", "")
     full_code_to_execute = user_code.rstrip() + "\n\n" + test_code
     try:
-        exec_result = code_executor.execute_code(full_code_to_execute)
+        exec_result = get_executor().execute_code(full_code_to_execute, limits=execution_limits_for(exercise_details_to_check),
+                                                  stdin=exercise_details_to_check.get("stdin"))
         success = exec_result["returncode"] == 0
         output = exec_result["stdout"]
         details = exec_result["stderr"]
@@ -561,13 +1641,52 @@ def submit_exercise_solution_legacy(course_id, exercise_id_str):
             details = f"Erro ao executar o código: {details if details else 'Erro desconhecido'}"
 
         return jsonify({"success": success, "output": output, "details": details})
+    except ExecutorBusy:
+        raise
     except Exception as e:
         logger.error(f"POST /submit_exercise (legacy) - Erro inesperado: {e}", exc_info=True)
         return jsonify({"success": False, "output": "", "details": f"Erro interno: {str(e)}"}), 500
     # --- Fim da lógica duplicada ---
 
 # --- Tratador de Erros Padrão ---
-@app.errorhandler(404)
+def _busy_result(e):
+    """Monta o resultado, no formato das rotas de execução, de uma chamada recusada pelo pool."""
+    return {"success": False, "output": "",
+            "details": f"O servidor está ocupado executando outros códigos. Tente novamente em {e.retry_after} s. ({e})"}
+
+@errorhandler(ExecutorBusy)
+def executor_busy(e):
+    """Tratador para chamadas recusadas pelo controle de admissão do pool de execução.
+
+    Responde 429 (Too Many Requests) com o cabeçalho `Retry-After`, em vez de
+    manter a requisição aguardando um trabalhador livre.
+
+    Args:
+        e (ExecutorBusy): A exceção levantada pelo backend de execução.
+
+    Returns:
+        Response: O JSON `{"success": false, "output": "", "details": "..."}` com status 429.
+    """
+    logger.warning("Execução recusada (%s): %s", request.path, e)
+    response = jsonify(_busy_result(e))
+    response.status_code = 429
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@errorhandler(ConceptGraphError)
+def concept_graph_error(e):
+    """Tratador para dados de pré-requisitos inválidos (ciclo em `concept_map.json` ou nos `learning_path`).
+
+    Args:
+        e (ConceptGraphError): A exceção levantada ao montar o grafo.
+
+    Returns:
+        Response: O JSON `{"error": "..."}` com status 500.
+    """
+    logger.error(f"Grafo de conceitos inválido: {e}")
+    return jsonify({"error": str(e)}), 500
+
+@errorhandler(404)
 def page_not_found(e):
     """Tratador de erro para o código de status HTTP 404 (Não Encontrado).
 
@@ -586,7 +1705,7 @@ def page_not_found(e):
         return jsonify(error=str(e.description or "Recurso não encontrado")), 404
     return render_template('404.html', title="Página Não Encontrada", error_message=e.description), 404
 
-@app.errorhandler(500)
+@errorhandler(500)
 def internal_server_error(e):
     """Tratador de erro para o código de status HTTP 500 (Erro Interno do Servidor).
 
@@ -605,6 +1724,9 @@ def internal_server_error(e):
     return render_template('500.html', title="Erro Interno", error_message=e.description or "Ocorreu um erro inesperado."), 500
 
 
+# Aplicação padrão, usada por `run.py`, `wsgi.py` e pelos testes.
+app = create_app()
+
 if __name__ == '__main__':
     # Para desenvolvimento, debug=True é útil. Para produção, defina como False.
     # host='0.0.0.0' torna o servidor acessível externamente na rede.
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o cache de código compilado dos testes dos exercícios.
+
+Cada verificação de exercício executa o `test_code` do exercício, que é
+sempre o mesmo texto. A classe `CompiledCodeCache` compila esse texto uma
+única vez e reutiliza o objeto de código resultante (aceito diretamente por
+`code_executor.execute_code`), evitando analisar e compilar a mesma fonte a
+cada requisição.
+
+As entradas são indexadas por (curso, ID do exercício, hash da fonte). Além
+disso, cada curso tem uma versão (a assinatura do arquivo de exercícios,
+veja `content_cache.file_signature`): quando a versão muda, todas as
+entradas do curso são descartadas.
+"""
+import hashlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def source_hash(source):
+    """Retorna o hash SHA-256 (hexadecimal) de um código-fonte."""
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+class CompiledCodeCache:
+    """
+    Cache de objetos de código compilados a partir do `test_code` dos exercícios.
+
+    Attributes:
+        hits (int): Compilações evitadas.
+        misses (int): Compilações realizadas.
+        compile_time_saved (float): Soma, em segundos, do tempo de compilação
+                                    das entradas reutilizadas (estimativa do
+                                    tempo economizado).
+    """
+
+    def __init__(self):
+        """Inicializa um cache vazio."""
+        self._entries = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.compile_time_saved = 0.0
+
+    def get(self, course_id, exercise_id, source, version=None):
+        """
+        Retorna o objeto de código de `source`, compilando-o se necessário.
+
+        Args:
+            course_id (str): O ID do curso do exercício.
+            exercise_id (str): O ID do exercício.
+            source (str): O código-fonte (normalmente o `test_code` do exercício).
+            version (hashable, optional): A versão atual do arquivo de exercícios
+                do curso. Se diferente da última versão vista, as entradas do
+                curso são descartadas antes da busca.
+
+        Returns:
+            code | str: O objeto de código compilado. Se a fonte tiver erro de
+                        sintaxe, a própria fonte é retornada, para que o erro seja
+                        reportado pelo executor como em qualquer outra execução.
+        """
+        course_id = str(course_id)
+        key = (course_id, str(exercise_id), source_hash(source))
+        with self._lock:
+            if version is not None and self._versions.get(course_id) != version:
+                self._drop_course(course_id)
+                self._versions[course_id] = version
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.compile_time_saved += entry[1]
+                return entry[0]
+            self.misses += 1
+
+        started = time.perf_counter()
+        try:
+            code = compile(source, f"<test_code:{course_id}/{exercise_id}>", 'exec')
+        except (SyntaxError, ValueError) as e:
+            logger.warning(f"test_code do exercício '{exercise_id}' (curso '{course_id}') não compila: {e}")
+            return source
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            if version is None or self._versions.get(course_id) == version:
+                self._entries[key] = (code, elapsed)
+        return code
+
+    def _drop_course(self, course_id):
+        """Remove as entradas de um curso. Deve ser chamado com o lock adquirido."""
+        for key in [key for key in self._entries if key[0] == course_id]:
+            del self._entries[key]
+
+    def invalidate(self, course_id=None):
+        """
+        Remove entradas do cache.
+
+        Args:
+            course_id (str, optional): O curso cujas entradas serão removidas.
+                                       Se None, todo o cache é limpo.
+        """
+        with self._lock:
+            if course_id is None:
+                self._entries.clear()
+                self._versions.clear()
+            else:
+                self._drop_course(str(course_id))
+                self._versions.pop(str(course_id), None)
+
+    def stats(self):
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: Número de entradas, acertos, faltas e tempo de compilação economizado.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "compile_time_saved_seconds": self.compile_time_saved,
+            }
+
+
+# Instância compartilhada pela aplicação.
+compiled_code_cache = CompiledCodeCache()
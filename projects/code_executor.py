@@ -9,29 +9,387 @@ bem como informações sobre exceções que possam ocorrer durante a execução.
 É projetado para ser usado em ambientes onde código fornecido pelo usuário
 precisa ser executado de forma segura, como em plataformas de aprendizado
 interativo de programação ou sistemas de avaliação automática de código.
+
+A captura de saída é isolada por thread: em vez de trocar o `sys.stdout`
+global durante a execução (o que misturaria as saídas de execuções
+simultâneas em um servidor com várias threads), `sys.stdout` e `sys.stderr`
+são substituídos uma única vez por proxies que direcionam a escrita ao buffer
+da execução ativa na thread atual. Além disso, cada execução recebe em seu
+escopo global uma função `print` própria, ligada ao seu buffer, de modo que
+funções do código do usuário executadas em outras threads também têm sua
+saída capturada.
+
+A entrada padrão segue o mesmo modelo: cada execução tem seu próprio stream
+de entrada (vazio, ou com as linhas fornecidas em `stdin`), acessível por
+`sys.stdin` na thread da execução e pela função `input` injetada no escopo.
+Assim, exercícios que usam `input()` nunca bloqueiam lendo a entrada real do
+servidor e podem ser executados simultaneamente.
+
+Para exibir a saída enquanto o código ainda executa, `execute_code` aceita
+uma função `on_output`: cada trecho escrito é repassado a ela assim que é
+produzido, em vez de acumulado em memória.
 """
+import builtins
 import sys
 import io
 import logging
-from contextlib import redirect_stdout, redirect_stderr
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
-def execute_code(code_string, execution_globals=None):
+
+class OutputLimitExceeded(BaseException):
+    """
+    Levantada quando o código executado excede o limite de saída capturada.
+
+    Herda de `BaseException` para que um `except Exception` no código do
+    usuário não consiga suprimir a interrupção.
+    """
+
+
+class CPUTimeLimitExceeded(BaseException):
+    """
+    Levantada (a partir do sinal SIGXCPU) quando o código executado excede
+    o limite de tempo de CPU. Herda de `BaseException` pelo mesmo motivo
+    de `OutputLimitExceeded`.
+    """
+
+
+class ExecutionLimits:
+    """
+    Limites de recursos aplicados a uma execução de código.
+
+    O limite de saída é aplicado por `execute_code`/`execute_test` em qualquer
+    backend. Os limites de tempo de relógio, tempo de CPU e memória dependem
+    de isolamento em processo e são aplicados pelo `ProcessPoolBackend`
+    (veja `execution_backend`). Um valor None desativa o limite correspondente.
+
+    Attributes:
+        wall_time (float | None): Tempo máximo de relógio, em segundos.
+        cpu_time (int | None): Tempo máximo de CPU, em segundos (RLIMIT_CPU).
+        memory_bytes (int | None): Memória adicional máxima, em bytes, que a
+            execução pode alocar (RLIMIT_AS).
+        max_output_bytes (int | None): Tamanho máximo, em bytes, de cada uma
+            das saídas capturadas (stdout e stderr).
+    """
+    # Chaves aceitas na seção "limits" de um exercício (exercises.json) ou na
+    # configuração da aplicação, mapeadas para os atributos desta classe.
+    JSON_FIELDS = {
+        "wall_time_seconds": "wall_time",
+        "cpu_time_seconds": "cpu_time",
+        "memory_mb": "memory_bytes",
+        "max_output_bytes": "max_output_bytes",
+    }
+
+    def __init__(self, wall_time=5.0, cpu_time=5, memory_bytes=256 * 1024 * 1024, max_output_bytes=1024 * 1024):
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.memory_bytes = memory_bytes
+        self.max_output_bytes = max_output_bytes
+
+    def merged(self, overrides):
+        """
+        Retorna uma cópia destes limites com os valores de `overrides` aplicados.
+
+        Args:
+            overrides (dict | None): Dicionário no formato JSON, ex:
+                `{"wall_time_seconds": 10, "memory_mb": 512}`. Chaves desconhecidas
+                são ignoradas (com aviso no log).
+
+        Returns:
+            ExecutionLimits: Os novos limites.
+        """
+        limits = ExecutionLimits(self.wall_time, self.cpu_time, self.memory_bytes, self.max_output_bytes)
+        for key, value in (overrides or {}).items():
+            attr = self.JSON_FIELDS.get(key)
+            if attr is None:
+                logger.warning(f"Limite de execução desconhecido ignorado: '{key}'.")
+                continue
+            if attr == "memory_bytes" and value is not None:
+                value = int(value * 1024 * 1024)
+            setattr(limits, attr, value)
+        return limits
+
+    def clamped(self, maximum):
+        """
+        Retorna uma cópia destes limites sem nenhum valor acima de `maximum`.
+
+        Args:
+            maximum (ExecutionLimits): Os tetos. Um teto None não restringe o
+                limite correspondente; um limite desativado (None) passa a valer o teto.
+
+        Returns:
+            ExecutionLimits: Os novos limites.
+        """
+        limits = ExecutionLimits(self.wall_time, self.cpu_time, self.memory_bytes, self.max_output_bytes)
+        for attr in self.JSON_FIELDS.values():
+            ceiling, value = getattr(maximum, attr), getattr(limits, attr)
+            if ceiling is not None and (value is None or value > ceiling):
+                setattr(limits, attr, ceiling)
+        return limits
+
+    def to_dict(self):
+        """Retorna os limites no formato JSON aceito por `merged`."""
+        return {
+            "wall_time_seconds": self.wall_time,
+            "cpu_time_seconds": self.cpu_time,
+            "memory_mb": self.memory_bytes / (1024 * 1024) if self.memory_bytes is not None else None,
+            "max_output_bytes": self.max_output_bytes,
+        }
+
+    def __repr__(self):
+        return f"ExecutionLimits({self.to_dict()})"
+
+
+DEFAULT_LIMITS = ExecutionLimits()
+
+
+class _BoundedBuffer(io.StringIO):
+    """`StringIO` que levanta `OutputLimitExceeded` ao exceder `max_bytes` (em UTF-8)."""
+
+    def __init__(self, max_bytes=None):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.bytes_written = 0
+
+    def _account(self, s):
+        """Contabiliza `s` no total escrito, levantando `OutputLimitExceeded` se exceder o limite."""
+        if self.max_bytes is not None:
+            size = len(s) if s.isascii() else len(s.encode('utf-8', 'surrogatepass'))
+            if self.bytes_written + size > self.max_bytes:
+                raise OutputLimitExceeded(f"Limite de saída excedido ({self.max_bytes} bytes).")
+            self.bytes_written += size
+
+    def write(self, s):
+        self._account(s)
+        return super().write(s)
+
+
+class _StreamingBuffer(_BoundedBuffer):
+    """
+    Buffer que repassa cada trecho escrito para `on_output(name, texto)`
+    em vez de acumulá-lo; `getvalue()` retorna sempre uma string vazia.
+    O limite de saída continua sendo aplicado ao total repassado.
+    """
+
+    def __init__(self, name, on_output, max_bytes=None):
+        super().__init__(max_bytes)
+        self.name = name
+        self.on_output = on_output
+
+    def write(self, s):
+        self._account(s)
+        if s:
+            self.on_output(self.name, s)
+        return len(s)
+
+
+# Buffers de captura ativos na thread atual (atributos "stdout", "stderr" e "stdin").
+_capture_state = threading.local()
+_install_lock = threading.Lock()
+
+
+class _ThreadLocalStream:
+    """
+    Substituto de `sys.stdout`/`sys.stderr`/`sys.stdin` que direciona a escrita
+    (ou leitura) para o stream de captura da thread atual ou, se não houver
+    captura ativa nela, para o stream original.
+    """
+
+    def __init__(self, name, wrapped):
+        self._name = name
+        self._wrapped = wrapped
+
+    def _target(self):
+        target = getattr(_capture_state, self._name, None)
+        return target if target is not None else self._wrapped
+
+    def write(self, s):
+        target = self._target()
+        if target is None: # Ex: pythonw, sem console
+            return len(s)
+        return target.write(s)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        target = self._target()
+        if target is not None:
+            target.flush()
+
+    def __getattr__(self, attr):
+        return getattr(self._target(), attr)
+
+
+def _install_thread_local_streams():
+    """
+    Instala os proxies de `_ThreadLocalStream` em `sys.stdout`, `sys.stderr` e `sys.stdin`.
+
+    A troca acontece apenas se os streams atuais ainda não forem proxies (por
+    exemplo, na primeira execução, ou se outro componente os substituiu).
+    """
+    stream_names = ("stdout", "stderr", "stdin")
+    if all(isinstance(getattr(sys, name), _ThreadLocalStream) for name in stream_names):
+        return
+    with _install_lock:
+        for name in stream_names:
+            if not isinstance(getattr(sys, name), _ThreadLocalStream):
+                setattr(sys, name, _ThreadLocalStream(name, getattr(sys, name)))
+
+
+@contextmanager
+def _captured_output(stdout_buffer, stderr_buffer, stdin_stream=None):
+    """
+    Direciona `sys.stdout`/`sys.stderr` (e `sys.stdin`, se fornecido) da thread
+    atual para os streams fornecidos.
+
+    Outras threads não são afetadas. Capturas aninhadas restauram os streams
+    anteriores ao sair.
+    """
+    _install_thread_local_streams()
+    previous = (getattr(_capture_state, "stdout", None), getattr(_capture_state, "stderr", None),
+                getattr(_capture_state, "stdin", None))
+    _capture_state.stdout, _capture_state.stderr = stdout_buffer, stderr_buffer
+    if stdin_stream is not None:
+        _capture_state.stdin = stdin_stream
+    try:
+        yield
+    finally:
+        _capture_state.stdout, _capture_state.stderr, _capture_state.stdin = previous
+
+
+
+@contextmanager
+def scratch_directory():
+    """
+    Executa o bloco em um diretório de trabalho temporário, removido ao final.
+
+    Exercícios que gravam arquivos com caminhos relativos (ex: "compras.txt")
+    não competem entre si pelo mesmo arquivo nem deixam arquivos no diretório
+    do servidor. O diretório de trabalho é do processo inteiro: o contexto só
+    deve ser usado em processos que executam uma chamada por vez (os
+    trabalhadores do pool e do validador), nunca nas threads do servidor.
+    """
+    previous = os.getcwd()
+    path = tempfile.mkdtemp(prefix="curso-exec-")
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(path, ignore_errors=True)
+
+def make_stdin(stdin=None):
+    """
+    Cria o stream de entrada de uma execução.
+
+    Args:
+        stdin (str | list | None): O conteúdo da entrada: um texto, ou uma lista
+            de linhas (uma por chamada a `input()`). None resulta em uma entrada vazia.
+
+    Returns:
+        io.StringIO: O stream, posicionado no início.
+    """
+    if stdin is None:
+        stdin = ""
+    elif isinstance(stdin, (list, tuple)):
+        stdin = "".join(f"{line}\n" for line in stdin)
+    return io.StringIO(str(stdin))
+
+
+def make_input(stdin_stream, stdout_buffer):
+    """
+    Cria a função `input` injetada no escopo global de uma execução.
+
+    Escreve o prompt no buffer de saída da execução (como o `input` embutido
+    faz quando a entrada não é um terminal) e lê uma linha de `stdin_stream`,
+    levantando `EOFError` se a entrada terminou.
+    """
+    def _input(prompt=''):
+        if prompt:
+            stdout_buffer.write(str(prompt))
+        line = stdin_stream.readline()
+        if not line:
+            raise EOFError("EOF when reading a line")
+        return line[:-1] if line.endswith('\n') else line
+    return _input
+
+
+def _make_print(stdout_buffer):
+    """
+    Cria a função `print` injetada no escopo global de uma execução.
+
+    Sem `file=`, escreve no buffer da execução, independentemente da thread
+    em que é chamada; com `file=`, comporta-se como o `print` embutido.
+    """
+    def _print(*args, sep=' ', end='\n', file=None, flush=False):
+        builtins.print(*args, sep=sep, end=end, file=stdout_buffer if file is None else file, flush=flush)
+    return _print
+
+
+def _limit_error_result(exc, stdout_buffer):
+    """
+    Converte uma violação de limite em um dicionário de resultado.
+
+    Returns:
+        dict | None: O resultado para `OutputLimitExceeded`, `CPUTimeLimitExceeded`
+                     e `MemoryError`, ou None para outras exceções.
+    """
+    if isinstance(exc, OutputLimitExceeded):
+        error_type, message = "OutputLimitExceeded", str(exc)
+    elif isinstance(exc, CPUTimeLimitExceeded):
+        error_type, message = "TimeoutError", "Limite de tempo de CPU excedido."
+    elif isinstance(exc, MemoryError):
+        error_type, message = "MemoryLimitExceeded", "Limite de memória excedido."
+    else:
+        return None
+    return {"returncode": 1, "stdout": stdout_buffer.getvalue(), "stderr": f"{error_type}: {message}", "error_type": error_type}
+
+
+def _make_buffers(limits, on_output=None):
+    """Cria os buffers de stdout e stderr de uma execução (de streaming, se `on_output` for fornecido)."""
+    if on_output is None:
+        return _BoundedBuffer(limits.max_output_bytes), _BoundedBuffer(limits.max_output_bytes)
+    return (_StreamingBuffer("stdout", on_output, limits.max_output_bytes),
+            _StreamingBuffer("stderr", on_output, limits.max_output_bytes))
+
+
+def execute_code(code_string, execution_globals=None, limits=None, on_output=None, stdin=None):
     """
     Executa uma string de código Python em um ambiente controlado e captura sua saída.
 
-    Redireciona stdout e stderr para capturar a saída do código executado.
-    Utiliza `exec()` para executar o código. Se `execution_globals` for fornecido,
+    Captura stdout e stderr do código executado de forma isolada por thread
+    (veja a documentação do módulo) e injeta uma função `print` ligada ao buffer
+    da execução em `execution_globals`. Utiliza `exec()` para executar o código. Se `execution_globals` for fornecido,
     o código será executado nesse escopo; caso contrário, um novo escopo é criado.
     Garante que `__name__` seja definido como `__executor__` no escopo de execução
     se não for fornecido de outra forma.
 
     Args:
-        code_string (str): O código Python a ser executado.
+        code_string (str | code): O código Python a ser executado, como texto ou
+                                  como objeto de código já compilado (ex: vindo
+                                  de `bytecode_cache`).
         execution_globals (dict, optional): Um dicionário para usar como o escopo global
                                             para a execução. Defaults to None, que cria
                                             um novo dicionário vazio.
+        limits (ExecutionLimits, optional): Limites da execução. Aqui é aplicado o
+                                            limite de saída (`max_output_bytes`).
+                                            Defaults to None, que usa `DEFAULT_LIMITS`.
+        on_output (callable, optional): Se fornecida, recebe `(nome, texto)` a cada
+                                        trecho escrito, com nome "stdout" ou "stderr",
+                                        e a saída não é acumulada: "stdout" e "stderr"
+                                        do resultado contêm apenas a mensagem de erro,
+                                        se houver. Defaults to None.
+        stdin (str | list, optional): A entrada padrão da execução, lida por `input()`
+                                      e `sys.stdin` (veja `make_stdin`). Defaults to
+                                      None, que fornece uma entrada vazia: `input()`
+                                      levanta `EOFError` em vez de aguardar.
 
     Returns:
         dict: Um dicionário contendo os resultados da execução:
@@ -41,25 +399,72 @@ def execute_code(code_string, execution_globals=None):
             - "stderr" (str): Saída capturada do stderr (mensagens de erro).
             - "error_type" (str | None): O nome da classe da exceção (ex: "SyntaxError",
                                          "ValueError"), ou None se não houve erro.
+                                         Violações de limites são reportadas como
+                                         "TimeoutError", "MemoryLimitExceeded" ou
+                                         "OutputLimitExceeded"; nesses casos "stdout"
+                                         contém a saída capturada até a interrupção.
     """
     if execution_globals is None:
         execution_globals = {}
+    if limits is None:
+        limits = DEFAULT_LIMITS
     # Garante que __name__ está presente, se não for passado
     execution_globals.setdefault('__name__', '__executor__')
 
+    stdout_buffer, stderr_buffer = _make_buffers(limits, on_output)
+    stdin_stream = make_stdin(stdin)
+    execution_globals['print'] = _make_print(stdout_buffer)
+    execution_globals['input'] = make_input(stdin_stream, stdout_buffer)
     try:
-        stdout_buffer = io.StringIO()
-        stderr_buffer = io.StringIO()
-        with redirect_stdout(stdout_buffer), redirect_stderr(stderr_buffer):
+        with _captured_output(stdout_buffer, stderr_buffer, stdin_stream):
             exec(code_string, execution_globals)
         stdout = stdout_buffer.getvalue()
         stderr = stderr_buffer.getvalue()
         return {"returncode": 0, "stdout": stdout, "stderr": stderr, "error_type": None}
+    except (OutputLimitExceeded, CPUTimeLimitExceeded, MemoryError) as e:
+        return _limit_error_result(e, stdout_buffer)
     except Exception as e:
         error_type_name = type(e).__name__
         return {"returncode": 1, "stdout": "", "stderr": f"{error_type_name}: {str(e)}", "error_type": error_type_name}
 
-def execute_test(test_code, namespace=None):
+def execute_submission(user_code, test_code=None, execution_globals=None, limits=None, stdin=None):
+    """
+    Executa o código do usuário e, em seguida, o código de teste no mesmo escopo.
+
+    Substitui duas chamadas a `execute_code` (uma para o código do usuário e
+    outra para o teste, com um escopo novo): as duas etapas acontecem em uma
+    única execução, e o teste enxerga as funções e variáveis definidas pelo
+    usuário, além da saída dele na variável `output`. Cada etapa tem seus
+    próprios buffers de saída. O teste só é executado se o código do usuário
+    terminar sem erros.
+
+    Args:
+        user_code (str | code): O código do usuário.
+        test_code (str | code, optional): O código de teste. Se None ou vazio,
+                                          apenas o código do usuário é executado.
+        execution_globals (dict, optional): O escopo global compartilhado pelas
+                                            duas etapas. Defaults to None, que cria
+                                            um novo dicionário vazio.
+        limits (ExecutionLimits, optional): Limites de cada etapa, como em `execute_code`.
+        stdin (str | list, optional): A entrada padrão do código do usuário. O
+                                      código de teste recebe uma entrada vazia.
+
+    Returns:
+        dict: O resultado de `execute_code` para o código do usuário, acrescido
+              da chave "test": o resultado de `execute_code` para o código de
+              teste, ou None se ele não foi executado.
+    """
+    if execution_globals is None:
+        execution_globals = {}
+    result = execute_code(user_code, execution_globals, limits, stdin=stdin)
+    result["test"] = None
+    if result["returncode"] == 0 and test_code:
+        execution_globals['output'] = result["stdout"]
+        result["test"] = execute_code(test_code, execution_globals, limits)
+    return result
+
+
+def execute_test(test_code, namespace=None, limits=None):
     """
     Executa um bloco de código de teste Python em um ambiente controlado.
 
@@ -67,14 +472,15 @@ def execute_test(test_code, namespace=None):
     código de teste. O `namespace` fornecido é atualizado com `__builtins__`,
     `__name__` (definido como `__main__`), `__doc__`, e `__package__` para
     simular um ambiente de execução de script mais comum.
-    Captura stdout e stderr. Trata `AssertionError` especificamente para
-    indicar falha no teste.
+    Captura stdout e stderr da mesma forma que `execute_code`. Trata
+    `AssertionError` especificamente para indicar falha no teste.
 
     Args:
         test_code (str): A string contendo o código de teste Python a ser executado.
         namespace (dict, optional): Um dicionário para ser usado como o escopo global
                                     durante a execução do código de teste.
                                     Defaults to None, que cria um novo dicionário vazio.
+        limits (ExecutionLimits, optional): Limites da execução, como em `execute_code`.
 
     Returns:
         dict: Um dicionário contendo os resultados da execução do teste:
@@ -83,8 +489,9 @@ def execute_test(test_code, namespace=None):
             - "stderr" (str): Saída capturada do stderr. Em caso de AssertionError,
                               contém uma mensagem formatada "Teste falhou: <mensagem da asserção>".
     """
-    stdout_buffer = io.StringIO()
-    stderr_buffer = io.StringIO()
+    if limits is None:
+        limits = DEFAULT_LIMITS
+    stdout_buffer, stderr_buffer = _make_buffers(limits)
     
     if namespace is None:
         namespace = {}
@@ -94,11 +501,12 @@ def execute_test(test_code, namespace=None):
         '__builtins__': __builtins__,
         '__name__': '__main__',
         '__doc__': None,
-        '__package__': None
+        '__package__': None,
+        'print': _make_print(stdout_buffer),
     })
     
     try:
-        with redirect_stdout(stdout_buffer), redirect_stderr(stderr_buffer):
+        with _captured_output(stdout_buffer, stderr_buffer):
             exec(test_code, namespace)
 
         return {
@@ -107,6 +515,9 @@ def execute_test(test_code, namespace=None):
             "stderr": ""
         }
 
+    except (OutputLimitExceeded, CPUTimeLimitExceeded, MemoryError) as e:
+        return _limit_error_result(e, stdout_buffer)
+
     except AssertionError as e:
         return {
             "returncode": 1, # Indica falha
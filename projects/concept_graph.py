@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o grafo de pré-requisitos entre os conceitos e módulos dos cursos.
+
+Os dados vêm de duas fontes:
+
+*   `data/concept_map.json`: cada conceito (ex: "variaveis") declara, por
+    nível, seus `prerequisites` e `next_concepts`, e o módulo do curso em que
+    é ensinado.
+*   O `learning_path` de cada curso em `courses.json`: os módulos de cada
+    etapa, na ordem em que são estudados, com `builds_on` (pré-requisitos em
+    outros cursos) e `revisited_in` (módulos de outros cursos que retomam o
+    assunto).
+
+Os nós do grafo são os conceitos (pelo nome) e os módulos (como
+"curso.modulo", a mesma notação de `builds_on` e `revisited_in`). As arestas
+de pré-requisito ligam o conceito/módulo anterior ao seguinte; as ligações
+`revisited_in` ficam à parte, pois indicam continuidade e não dependência.
+
+A classe `ConceptGraph` calcula tudo na construção: a ordem topológica, o
+fecho transitivo dos pré-requisitos de cada nó e, a partir de cada nó, a
+árvore de caminhos mínimos (busca em largura). Assim, as consultas
+("o que estudar antes de X", "caminho de A até B") não percorrem o grafo:
+apenas leem as tabelas prontas. Como o grafo tem algumas dezenas de nós,
+as tabelas quadráticas no número de nós são pequenas.
+"""
+from collections import deque
+import heapq
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tipos de ligação entre dois nós, usados nos passos de `ConceptGraph.shortest_path`.
+PREREQUISITE = "prerequisite"
+REVISITED = "revisited"
+
+
+class ConceptGraphError(ValueError):
+    """Levantada quando os pré-requisitos declarados formam um ciclo."""
+
+
+def load_concept_map(path):
+    """
+    Lê o arquivo `concept_map.json`.
+
+    Args:
+        path (str | Path): O caminho do arquivo.
+
+    Returns:
+        dict: Os conceitos (conteúdo da chave "concepts"). Vazio se o arquivo
+              não existir ou for inválido.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"Mapa de conceitos não encontrado: {path}")
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Erro ao ler o mapa de conceitos {path}: {e}")
+        return {}
+    concepts = data.get("concepts") if isinstance(data, dict) else None
+    if not isinstance(concepts, dict):
+        logger.error(f"Mapa de conceitos inválido em {path}: a chave 'concepts' deve ser um objeto.")
+        return {}
+    return concepts
+
+
+class ConceptGraph:
+    """
+    Grafo de pré-requisitos, com as consultas pré-calculadas.
+
+    Attributes:
+        nodes (dict): ID do nó -> informações do nó (`id`, `kind` ("concept" ou
+            "module") e, conforme o caso, `course`, `title`, `stage` e `modules`).
+        order (list): Os IDs dos nós em ordem topológica (cada nó após seus pré-requisitos).
+    """
+
+    def __init__(self, concepts=None, courses=()):
+        """
+        Monta o grafo e pré-calcula as consultas.
+
+        Args:
+            concepts (dict, optional): Os conceitos de `concept_map.json` (veja `load_concept_map`).
+            courses (iterable): Os cursos, com o `learning_path` opcional.
+
+        Raises:
+            ConceptGraphError: Se os pré-requisitos formarem um ciclo.
+        """
+        self.nodes = {}
+        self._requires = {} # nó -> pré-requisitos diretos
+        self._unlocks = {} # nó -> nós que o têm como pré-requisito direto
+        self._revisited_in = {} # nó -> nós que retomam o assunto
+        for concept_id, levels in (concepts or {}).items():
+            self._add_concept(concept_id, levels)
+        for course in courses:
+            self._add_learning_path(course)
+
+        self.order = self._topological_order()
+        self._position = {node_id: index for index, node_id in enumerate(self.order)}
+        self._closure = self._prerequisite_closure()
+        self._parents = {node_id: self._shortest_path_tree(node_id) for node_id in self.order}
+        logger.debug("Grafo de conceitos montado: %d nós.", len(self.nodes))
+
+    def _node(self, node_id, **info):
+        """Registra um nó (se ainda não existir) e completa suas informações."""
+        node = self.nodes.get(node_id)
+        if node is None:
+            node = self.nodes[node_id] = {"id": node_id, "kind": "module" if "." in node_id else "concept"}
+            self._requires[node_id] = []
+            self._unlocks[node_id] = []
+            self._revisited_in[node_id] = []
+        for key, value in info.items():
+            if value is not None:
+                node.setdefault(key, value)
+        return node
+
+    def _add_edge(self, before, after):
+        """Registra que `before` é pré-requisito de `after`."""
+        self._node(before)
+        self._node(after)
+        if before != after and before not in self._requires[after]:
+            self._requires[after].append(before)
+            self._unlocks[before].append(after)
+
+    def _add_revisit(self, node_id, later):
+        """Registra que o assunto de `node_id` é retomado em `later`."""
+        self._node(later)
+        if later not in self._revisited_in[node_id]:
+            self._revisited_in[node_id].append(later)
+
+    def _add_concept(self, concept_id, levels):
+        """Acrescenta um conceito de `concept_map.json`, com seus pré-requisitos em todos os níveis."""
+        node = self._node(concept_id)
+        if not isinstance(levels, dict):
+            return
+        for level in levels.values():
+            if not isinstance(level, dict):
+                continue
+            if level.get("course") and level.get("module"):
+                node.setdefault("modules", []).append(f"{level['course']}.{level['module']}")
+            for prerequisite in level.get("prerequisites", ()):
+                self._add_edge(prerequisite, concept_id)
+            for next_concept in level.get("next_concepts", ()):
+                self._add_edge(concept_id, next_concept)
+
+    def _add_learning_path(self, course):
+        """Acrescenta os módulos do `learning_path` de um curso, encadeados na ordem das etapas."""
+        learning_path = course.get("learning_path")
+        if not isinstance(learning_path, dict):
+            return
+        previous = None
+        for stage in learning_path.values():
+            for module in stage.get("modules", ()) if isinstance(stage, dict) else ():
+                if not isinstance(module, dict) or not module.get("id"):
+                    continue
+                module_id = f"{course.get('id')}.{module['id']}"
+                self._node(module_id, course=course.get("id"), title=module.get("title"), stage=stage.get("name"))
+                if previous is not None:
+                    self._add_edge(previous, module_id)
+                for prerequisite in module.get("builds_on", ()):
+                    self._add_edge(prerequisite, module_id)
+                for later in module.get("revisited_in", ()):
+                    self._add_revisit(module_id, later)
+                previous = module_id
+
+    def _topological_order(self):
+        """Ordena os nós (algoritmo de Kahn); entre nós livres, mantém a ordem de declaração."""
+        declared = {node_id: index for index, node_id in enumerate(self.nodes)}
+        pending = {node_id: len(requires) for node_id, requires in self._requires.items()}
+        ready = [(declared[node_id], node_id) for node_id, count in pending.items() if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, node_id = heapq.heappop(ready)
+            order.append(node_id)
+            for after in self._unlocks[node_id]:
+                pending[after] -= 1
+                if pending[after] == 0:
+                    heapq.heappush(ready, (declared[after], after))
+        if len(order) < len(self.nodes):
+            cycle = sorted(node_id for node_id, count in pending.items() if count > 0)
+            raise ConceptGraphError(f"Os pré-requisitos formam um ciclo envolvendo: {', '.join(cycle)}.")
+        return order
+
+    def _prerequisite_closure(self):
+        """Calcula, em ordem topológica, todos os pré-requisitos (diretos e indiretos) de cada nó."""
+        closure = {}
+        for node_id in self.order:
+            ancestors = set()
+            for before in self._requires[node_id]:
+                ancestors.add(before)
+                ancestors.update(closure[before])
+            closure[node_id] = tuple(sorted(ancestors, key=self._position.__getitem__))
+        return closure
+
+    def _shortest_path_tree(self, source):
+        """Busca em largura a partir de `source`, pelas arestas de pré-requisito e de `revisited_in`.
+
+        Returns:
+            dict: Nó alcançado -> (nó anterior no caminho mínimo, tipo da ligação).
+        """
+        parents = {source: None}
+        frontier = deque([source])
+        while frontier:
+            node_id = frontier.popleft()
+            for relation, neighbours in ((PREREQUISITE, self._unlocks[node_id]), (REVISITED, self._revisited_in[node_id])):
+                for neighbour in neighbours:
+                    if neighbour not in parents:
+                        parents[neighbour] = (node_id, relation)
+                        frontier.append(neighbour)
+        return parents
+
+    def __contains__(self, node_id):
+        return node_id in self.nodes
+
+    def prerequisites(self, node_id):
+        """
+        Retorna tudo o que deve ser estudado antes de um nó.
+
+        Args:
+            node_id (str): O conceito (ex: "funcoes") ou módulo (ex: "python-basico.funcoes-basicas").
+
+        Returns:
+            dict | None: `id`, `direct` (pré-requisitos diretos), `all` (todos os
+                pré-requisitos, em ordem topológica) e `revisited_in`; None se o nó não existir.
+        """
+        if node_id not in self.nodes:
+            return None
+        return {
+            "id": node_id,
+            "direct": sorted(self._requires[node_id], key=self._position.__getitem__),
+            "all": list(self._closure[node_id]),
+            "revisited_in": list(self._revisited_in[node_id]),
+        }
+
+    def shortest_path(self, source, target):
+        """
+        Retorna o caminho mínimo de `source` até `target`.
+
+        O caminho segue as arestas de pré-requisito (do conceito anterior ao
+        seguinte) e as ligações `revisited_in` entre cursos.
+
+        Args:
+            source (str): O nó de partida.
+            target (str): O nó de chegada.
+
+        Returns:
+            list | None: Os passos `{"from", "to", "relation"}` (vazio se `source`
+                for `target`), ou None se não houver caminho ou um dos nós não existir.
+        """
+        parents = self._parents.get(source)
+        if parents is None or target not in parents:
+            return None
+        steps = []
+        node_id = target
+        while parents[node_id] is not None:
+            previous, relation = parents[node_id]
+            steps.append({"from": previous, "to": node_id, "relation": relation})
+            node_id = previous
+        steps.reverse()
+        return steps
+
+    def stats(self):
+        """
+        Retorna o tamanho do grafo.
+
+        Returns:
+            dict: Número de nós, de arestas de pré-requisito e de ligações `revisited_in`.
+        """
+        return {
+            "nodes": len(self.nodes),
+            "prerequisite_edges": sum(len(requires) for requires in self._requires.values()),
+            "revisited_links": sum(len(later) for later in self._revisited_in.values()),
+        }
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o cache em memória do conteúdo dos arquivos de dados.
+
+Os managers de lições e exercícios carregam arquivos JSON sob demanda, e
+algumas rotas (ex: `/api/check-exercise`) fazem isso a cada requisição.
+A classe `ContentCache` evita decodificar o mesmo arquivo repetidamente:
+o conteúdo já carregado é reutilizado enquanto a assinatura do arquivo
+(data de modificação e tamanho, obtidos com um `stat`) não mudar. Quando o
+arquivo é editado, a próxima leitura o recarrega automaticamente.
+
+Além do conteúdo, o cache guarda estruturas derivadas dele (ex: índices por
+ID), que são descartadas junto com o conteúdo quando o arquivo muda.
+
+As listas retornadas são compartilhadas entre as requisições e devem ser
+tratadas como somente leitura.
+"""
+import logging
+import os
+import threading
+
+from .instrumentation import phase
+
+logger = logging.getLogger(__name__)
+
+
+def file_signature(path):
+    """
+    Retorna a assinatura de um arquivo, usada para detectar alterações.
+
+    Args:
+        path (str | Path): O caminho do arquivo.
+
+    Returns:
+        tuple | None: O par (mtime em nanossegundos, tamanho em bytes), ou None
+                      se o arquivo não puder ser acessado.
+    """
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return (stat_result.st_mtime_ns, stat_result.st_size)
+
+
+class ContentCache:
+    """
+    Cache de conteúdo de arquivos, indexado pelo caminho e invalidado pela assinatura.
+
+    Attributes:
+        hits (int): Leituras atendidas pelo cache.
+        misses (int): Leituras que precisaram carregar o arquivo.
+        reloads (int): Parte de `misses` causada pela alteração de um arquivo já em cache.
+    """
+
+    def __init__(self):
+        """Inicializa um cache vazio."""
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        # Contadores por nome de arquivo (ex: "lessons.json"): [acertos, faltas, recarregamentos]
+        self._file_counts = {}
+
+    def get(self, path, loader):
+        """
+        Retorna o conteúdo de `path`, carregando-o com `loader` se necessário.
+
+        Args:
+            path (str | Path): O caminho do arquivo.
+            loader (callable): Função que recebe `path` e retorna o conteúdo
+                               decodificado (ex: a lista de lições). É chamada
+                               apenas quando o arquivo não está em cache ou mudou.
+
+        Returns:
+            O conteúdo retornado por `loader` (atual ou em cache).
+        """
+        key = str(path)
+        signature = file_signature(path)
+        with self._lock:
+            counts = self._file_counts.setdefault(os.path.basename(key), [0, 0, 0])
+            entry = self._entries.get(key)
+            if entry is not None and signature is not None and entry[0] == signature:
+                self.hits += 1
+                counts[0] += 1
+                return entry[1]
+            self.misses += 1
+            counts[1] += 1
+            if entry is not None:
+                self.reloads += 1
+                counts[2] += 1
+
+        if entry is not None:
+            logger.info(f"Arquivo '{key}' alterado desde o último carregamento. Recarregando.")
+        with phase("data-load"):
+            content = loader(path)
+        if signature is not None:
+            with self._lock:
+                # Entrada: (assinatura, conteúdo, estruturas derivadas por nome)
+                self._entries[key] = (signature, content, {})
+        return content
+
+    def get_derived(self, path, name, loader, builder):
+        """
+        Retorna uma estrutura derivada do conteúdo de `path`, como um índice.
+
+        A estrutura é construída uma vez por versão do arquivo e descartada
+        quando o arquivo muda.
+
+        Args:
+            path (str | Path): O caminho do arquivo.
+            name (str): Nome que identifica a estrutura derivada (ex: "index:básico").
+            loader (callable): Carregador do conteúdo, como em `get`.
+            builder (callable): Função que recebe o conteúdo e retorna a estrutura.
+
+        Returns:
+            O valor retornado por `builder` (atual ou em cache).
+        """
+        content = self.get(path, loader)
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is content and name in entry[2]:
+                return entry[2][name]
+
+        value = builder(content)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is content:
+                entry[2][name] = value
+        return value
+
+    def invalidate(self, path=None):
+        """
+        Remove entradas do cache.
+
+        Args:
+            path (str | Path, optional): O arquivo a remover. Se None, todo o cache é limpo.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(path), None)
+
+    def stats(self):
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: Número de entradas, acertos, faltas e recarregamentos.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+            }
+
+    def stats_by_file(self):
+        """
+        Retorna os contadores do cache separados por nome de arquivo.
+
+        Como cada curso tem seus próprios `lessons.json` e `exercises.json`, os
+        contadores mostram separadamente o uso do cache para lições e exercícios.
+
+        Returns:
+            dict: `{nome do arquivo: {"hits", "misses", "reloads"}}`.
+        """
+        with self._lock:
+            return {name: {"hits": counts[0], "misses": counts[1], "reloads": counts[2]}
+                    for name, counts in sorted(self._file_counts.items())}
+
+
+# Instância compartilhada pelos managers da aplicação.
+content_cache = ContentCache()
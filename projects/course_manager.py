@@ -5,16 +5,46 @@ Módulo para gerenciamento de dados de cursos.
 Este módulo define a classe `CourseManager`, responsável por carregar,
 salvar, e manipular informações sobre os cursos disponíveis na aplicação.
 Os dados dos cursos são armazenados em formato JSON.
+
+As buscas por ID usam um índice (dicionário) mantido em sincronia com a lista
+de cursos. As alterações substituem a lista e o índice por novas versões
+(cópia na escrita), de modo que leitores concorrentes nunca observam um estado
+intermediário, e a gravação do `courses.json` é atômica (arquivo temporário
+seguido de renomeação). Várias alterações podem ser agrupadas com `batch()`,
+que adia a gravação para o fim do bloco.
 """
+from contextlib import contextmanager
 import json
 import logging
+import os
 from pathlib import Path
+import stat
+import tempfile
+import threading
 import uuid # Para gerar IDs únicos para novos cursos
 
 # Configuração de logging movida para app.py ou um módulo de configuração central.
 # Se este módulo for executado diretamente, o logging básico pode ser configurado no if __name__ == '__main__':
 logger = logging.getLogger(__name__)
 
+# Permissões do `courses.json` quando ele ainda não existe.
+DEFAULT_FILE_MODE = 0o644
+
+def _file_mode(path):
+    """
+    Retorna as permissões a aplicar ao gravar `path`.
+
+    Returns:
+        int: As permissões atuais do arquivo ou, se ele ainda não existir,
+             `DEFAULT_FILE_MODE`. (A máscara `umask` não é consultada: lê-la
+             exige alterá-la, o que afetaria as outras threads do processo.)
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return DEFAULT_FILE_MODE
+
+
 class CourseManager:
     """
     Gerencia o carregamento, salvamento e manipulação de dados de cursos.
@@ -28,6 +58,8 @@ class CourseManager:
         data_dir (Path): O caminho completo para o diretório 'data' dentro de 'projects'.
         courses_file (Path): O caminho completo para o arquivo 'courses.json'.
         courses (list): Uma lista de dicionários, onde cada dicionário representa um curso.
+                        Atribuir uma nova lista reconstrói o índice por ID.
+        revision (int): Contador incrementado a cada alteração da lista de cursos.
     """
     # data_dir_path_str é relativo ao diretório do script (projects/)
     def __init__(self, data_dir_path_str="data"):
@@ -43,11 +75,46 @@ class CourseManager:
         self.data_dir = self.base_dir / data_dir_path_str
         # courses_file é projects/data/courses.json
         self.courses_file = self.data_dir / 'courses.json'
-        
+        # Serializa as alterações e gravações; as leituras não precisam do lock.
+        self._lock = threading.RLock()
+        self._courses = []
+        self._courses_by_id = {}
+        self._batch_depth = 0
+        self._dirty = False
+        self.revision = 0
+
         self._ensure_data_files_exist()
         self.courses = self._load_courses()
         logger.info(f"CourseManager inicializado. Dados carregados de: {self.courses_file}")
 
+    @property
+    def courses(self):
+        """list: A lista atual de cursos. Deve ser tratada como somente leitura."""
+        return self._courses
+
+    @courses.setter
+    def courses(self, new_courses):
+        self._replace_courses(list(new_courses))
+
+    def _replace_courses(self, new_courses):
+        """
+        Substitui a lista de cursos e reconstrói o índice por ID.
+
+        A nova lista e o novo índice são publicados juntos; quem já obteve a
+        lista anterior continua com uma versão consistente dela.
+
+        Args:
+            new_courses (list): A nova lista de cursos.
+        """
+        courses_by_id = {}
+        for course in new_courses:
+            if isinstance(course, dict):
+                # Em IDs repetidos, prevalece a primeira ocorrência (como na busca linear anterior).
+                courses_by_id.setdefault(str(course.get('id')), course)
+        with self._lock:
+            self._courses, self._courses_by_id = new_courses, courses_by_id
+            self.revision += 1
+
     def _ensure_data_files_exist(self):
         """
         Garante que o diretório de dados e o arquivo JSON principal de cursos existam.
@@ -99,16 +166,76 @@ class CourseManager:
         """
         Salva a lista atual de cursos (atributo `self.courses`) no arquivo JSON principal.
 
-        Os dados são serializados para JSON com indentação para melhor legibilidade.
+        Dentro de um bloco `batch()`, a gravação é adiada para o fim do bloco.
         """
+        with self._lock:
+            if self._batch_depth:
+                self._dirty = True
+                return
+            self._write_courses_file()
+
+    def _write_courses_file(self):
+        """
+        Grava `self.courses` no `courses.json` de forma atômica.
+
+        Os dados são serializados para JSON com indentação para melhor legibilidade
+        em um arquivo temporário no mesmo diretório, que então substitui o original
+        com `os.replace`. Uma falha durante a gravação mantém o arquivo anterior intacto.
+        As permissões do arquivo original são preservadas.
+        """
+        temp_path = None
         try:
-            with open(self.courses_file, 'w', encoding='utf-8') as f:
-                json.dump(self.courses, f, indent=4, ensure_ascii=False)
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.courses_file.parent,
+                                             prefix='.courses-', suffix='.json.tmp', delete=False) as f:
+                temp_path = f.name
+                json.dump(self._courses, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            # O arquivo temporário é criado com permissão 0600; o arquivo gravado mantém a do original
+            os.chmod(temp_path, _file_mode(self.courses_file))
+            os.replace(temp_path, self.courses_file)
+            temp_path = None
+            self._dirty = False
             logger.info(f"Cursos salvos em {self.courses_file}")
         except IOError as e:
             logger.error(f"Erro de I/O ao salvar cursos em '{self.courses_file}': {e}", exc_info=True)
         except TypeError as e:
             logger.error(f"Erro de tipo ao serializar cursos para JSON: {e}. Verifique os dados.", exc_info=True)
+        finally:
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+
+    @contextmanager
+    def batch(self):
+        """
+        Agrupa várias alterações em uma única gravação do `courses.json`.
+
+        As alterações feitas dentro do bloco ficam visíveis imediatamente em
+        memória; o arquivo é gravado uma vez ao sair do bloco mais externo
+        (mesmo que ocorra uma exceção), se houver algo a salvar.
+
+        Exemplo:
+            with course_mgr.batch():
+                course_mgr.add_course({...})
+                course_mgr.update_course('python-basico', {...})
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._dirty:
+                    self._write_courses_file()
+
+    def flush(self):
+        """Grava imediatamente as alterações pendentes de um bloco `batch()` em andamento."""
+        with self._lock:
+            if self._dirty:
+                self._write_courses_file()
 
 
     def get_courses(self):
@@ -133,16 +260,10 @@ class CourseManager:
             logger.warning("get_course_by_id: Tentativa de buscar curso com ID nulo ou vazio.")
             return None
         
-        logger.debug(f"Buscando curso com ID '{course_id}'. Total de cursos: {len(self.courses)}")
-        if self.courses and isinstance(self.courses, list) and len(self.courses) > 0 and isinstance(self.courses[0], dict):
-            logger.debug(f"Primeiro curso na lista: {self.courses[0].get('id')}")
-        else:
-            logger.debug("Lista de cursos está vazia ou não é uma lista de dicionários.")
-            
-        for course in self.courses:
-            if str(course.get('id')) == str(course_id): # Garante comparação de strings
-                logger.debug(f"Curso encontrado: ID '{course.get('id')}'")
-                return course
+        course = self._courses_by_id.get(str(course_id)) # Garante comparação de strings
+        if course is not None:
+            logger.debug("Curso encontrado: ID '%s'", course_id)
+            return course
         logger.warning(f"Curso com ID '{course_id}' não encontrado.")
         return None
 
@@ -176,7 +297,7 @@ class CourseManager:
             course_id = str(course_id) 
             new_course_data['id'] = course_id
 
-        if self.get_course_by_id(course_id):
+        if course_id in self._courses_by_id:
             logger.error(f"Falha ao adicionar curso: ID '{course_id}' já existe.")
             return None
 
@@ -197,8 +318,9 @@ class CourseManager:
             logger.error(f"Erro ao criar diretório/arquivos para o novo curso '{course_id}': {e}", exc_info=True)
             return None
 
-        self.courses.append(new_course_data)
-        self._save_courses()
+        with self._lock:
+            self._replace_courses(self._courses + [new_course_data])
+            self._save_courses()
         logger.info(f"Curso '{new_course_data.get('name', 'Sem Nome')}' adicionado com ID '{course_id}'.")
         return new_course_data
 
@@ -221,36 +343,24 @@ class CourseManager:
             return None
 
         course_id_str = str(course_id)
-        course_to_update = None
-        course_index = -1
-
-        for i, course in enumerate(self.courses):
-            if str(course.get('id')) == course_id_str:
-                course_to_update = course
-                course_index = i
-                break
-        
-        if course_to_update:
-            if 'id' in updated_data and str(updated_data['id']) != course_id_str:
-                logger.warning(f"Tentativa de alterar ID do curso '{course_id_str}' para '{updated_data['id']}'. IDs não podem ser alterados. Chave 'id' ignorada.")
-                updated_data.pop('id', None) 
-            
-            original_lessons_file = course_to_update.get('lessons_file')
-            original_exercises_file = course_to_update.get('exercises_file')
-
-            course_to_update.update(updated_data)
-            self.courses[course_index] = course_to_update # Garante que a referência na lista seja atualizada
 
-            # Se os caminhos dos arquivos não foram fornecidos na atualização, mantenha os originais
-            if 'lessons_file' not in updated_data and original_lessons_file:
-                 self.courses[course_index]['lessons_file'] = original_lessons_file
-            if 'exercises_file' not in updated_data and original_exercises_file:
-                  self.courses[course_index]['exercises_file'] = original_exercises_file
+        with self._lock:
+            course_to_update = self._courses_by_id.get(course_id_str)
+            if course_to_update:
+                if 'id' in updated_data and str(updated_data['id']) != course_id_str:
+                    logger.warning(f"Tentativa de alterar ID do curso '{course_id_str}' para '{updated_data['id']}'. IDs não podem ser alterados. Chave 'id' ignorada.")
+                    updated_data.pop('id', None)
+
+                # Cópia na escrita: o curso atualizado é um novo dicionário, e a lista é
+                # substituída; leitores que já obtiveram o curso original não o veem mudar.
+                # Os caminhos de arquivos ausentes em `updated_data` são mantidos.
+                updated_course = {**course_to_update, **updated_data}
+                self._replace_courses([updated_course if course is course_to_update else course
+                                       for course in self._courses])
+                self._save_courses()
+                logger.info(f"Curso '{course_id_str}' atualizado com sucesso.")
+                return updated_course
 
-            self._save_courses()
-            logger.info(f"Curso '{course_id_str}' atualizado com sucesso.")
-            return self.courses[course_index]
-        
         logger.warning(f"Falha ao atualizar curso: ID '{course_id_str}' não encontrado.")
         return None
 
@@ -272,13 +382,14 @@ class CourseManager:
         
         course_id_str = str(course_id)
         
-        course_to_delete = self.get_course_by_id(course_id_str) 
-        if not course_to_delete:
-            logger.warning(f"Falha ao deletar curso: ID '{course_id_str}' não encontrado.")
-            return False
+        with self._lock:
+            course_to_delete = self._courses_by_id.get(course_id_str)
+            if not course_to_delete:
+                logger.warning(f"Falha ao deletar curso: ID '{course_id_str}' não encontrado.")
+                return False
 
-        self.courses = [c for c in self.courses if str(c.get('id')) != course_id_str]
-        self._save_courses()
+            self._replace_courses([c for c in self._courses if str(c.get('id')) != course_id_str])
+            self._save_courses()
         
         # Opcional: deletar o diretório de dados do curso
         # course_dir_to_delete = self.data_dir / course_id_str
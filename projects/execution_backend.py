@@ -0,0 +1,702 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com os backends de execução de código do usuário.
+
+Um backend recebe as mesmas chamadas expostas por `code_executor`
+(`execute_code`, `execute_submission` e `execute_test`) e decide *onde* elas são executadas:
+
+*   `InlineBackend`: executa no próprio processo do servidor (comportamento
+    original, útil para depuração e para ambientes sem suporte a processos).
+    Apenas o limite de saída de `ExecutionLimits` é aplicado.
+*   `ProcessPoolBackend`: despacha cada chamada para um pool de processos
+    trabalhadores pré-criados e pré-aquecidos (módulos comuns já importados).
+    Cada trabalhador é reciclado após um número configurável de execuções,
+    de modo que uma submissão lenta bloqueia apenas um trabalhador, e não a
+    thread que atende a requisição HTTP. Todos os limites de `ExecutionLimits`
+    são aplicados: tempo de relógio (o trabalhador é morto e substituído),
+    tempo de CPU e memória (via `resource.setrlimit`, em sistemas POSIX).
+
+Os backends são intercambiáveis: `create_backend` constrói o backend a partir
+de um nome ("inline" ou "process") e opções, normalmente vindas de `app.config`.
+
+Ambos aceitam, no lugar do código-fonte, objetos de código já compilados
+(veja `bytecode_cache`); para o pool, eles são serializados com `marshal`.
+
+`execute_code_stream` executa como `execute_code`, mas repassa a saída a uma
+função à medida que é produzida. No pool, o trabalhador envia cada trecho
+como uma mensagem `("output", nome, texto)` antes do dicionário de resultado.
+
+A fila de espera do pool é limitada (controle de admissão): se `max_queue`
+chamadas já aguardam um trabalhador, uma nova chamada é recusada
+imediatamente com `ExecutorBusy`, e uma chamada que aguarda mais de
+`max_wait` segundos também é recusada. Assim, um pico de submissões (ex:
+uma turma inteira clicando em "Executar" ao mesmo tempo) não acumula
+requisições presas indefinidamente; o servidor responde 429 com o
+cabeçalho `Retry-After` sugerido pela exceção.
+
+`execute_code_stream` aceita também um `cancel` (`threading.Event`): quando
+ele é sinalizado, o pool mata o trabalhador que executa a chamada (e o
+substitui), e o resultado reporta `error_type` "Cancelled". Na execução em
+processo (`InlineBackend`) não há como interromper um laço sem saída; a
+execução é interrompida na próxima escrita em stdout/stderr.
+"""
+import atexit
+import copyreg
+import importlib
+import io
+import logging
+import marshal
+import math
+import multiprocessing
+import os
+import pickle
+import signal
+import threading
+import time
+import types
+
+try:
+    import resource
+except ImportError: # Indisponível no Windows; limites de CPU e memória não são aplicados
+    resource = None
+
+from . import code_executor
+from .code_executor import DEFAULT_LIMITS, CPUTimeLimitExceeded, scratch_directory
+from .instrumentation import Histogram, timed
+from .metrics import record_execution
+
+logger = logging.getLogger(__name__)
+
+# Módulos importados por cada trabalhador ao iniciar, para que a primeira
+# submissão que os utilize não pague o custo de importação.
+# Módulos ausentes no ambiente são simplesmente ignorados.
+DEFAULT_PRELOAD_MODULES = (
+    "json",
+    "math",
+    "random",
+    "re",
+    "datetime",
+    "collections",
+    "functools",
+    "itertools",
+    "numpy",
+    "pandas",
+)
+
+# Número de execuções após o qual um trabalhador é substituído por um novo,
+# limitando o efeito de estado global acumulado (módulos alterados, memória).
+DEFAULT_MAX_JOBS_PER_WORKER = 200
+
+# Funções de `code_executor` que podem ser despachadas para os trabalhadores.
+DISPATCHABLE_FUNCTIONS = ("execute_code", "execute_submission", "execute_test")
+
+# Tipos de erro após os quais o trabalhador é substituído, pois seu estado
+# (memória fragmentada, limites de CPU consumidos) não é mais confiável.
+RECYCLE_ON_ERROR_TYPES = ("MemoryLimitExceeded", "TimeoutError")
+
+# Intervalo, em segundos, em que uma chamada cancelável verifica o pedido de cancelamento.
+CANCEL_POLL_SECONDS = 0.05
+
+# Número máximo padrão de chamadas aguardando um trabalhador livre.
+DEFAULT_MAX_QUEUE = 64
+
+# Tempo máximo padrão, em segundos, que uma chamada aguarda um trabalhador livre.
+DEFAULT_MAX_WAIT_SECONDS = 10.0
+
+
+class ExecutorBusy(RuntimeError):
+    """
+    Levantada quando o pool recusa uma chamada: a fila de espera está cheia
+    ou o tempo máximo de espera foi excedido.
+
+    Attributes:
+        retry_after (int): Segundos sugeridos antes de uma nova tentativa.
+    """
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _crashed_result(message):
+    """Monta o dicionário de resultado para um trabalhador encerrado inesperadamente."""
+    return {
+        "returncode": 1,
+        "stdout": "",
+        "stderr": f"WorkerCrashed: {message}",
+        "error_type": "WorkerCrashed",
+    }
+
+
+def _cancelled_result():
+    """Monta o dicionário de resultado para uma execução cancelada."""
+    return {
+        "returncode": 1,
+        "stdout": "",
+        "stderr": "Cancelled: A execução foi cancelada.",
+        "error_type": "Cancelled",
+    }
+
+
+class _Cancelled(BaseException):
+    """Interrompe uma execução em processo cancelada (herda de `BaseException`, como `OutputLimitExceeded`)."""
+
+
+def _timeout_result(wall_time):
+    """Monta o dicionário de resultado para uma execução que excedeu o tempo de relógio."""
+    return {
+        "returncode": 1,
+        "stdout": "",
+        "stderr": f"TimeoutError: Tempo limite de execução excedido ({wall_time:g} s).",
+        "error_type": "TimeoutError",
+    }
+
+
+class InlineBackend:
+    """
+    Backend que executa o código no próprio processo, delegando diretamente
+    para as funções de `code_executor`.
+    """
+    name = "inline"
+
+    def start(self):
+        """Não há recursos a preparar para a execução em processo."""
+
+    @timed("execute")
+    def execute_code(self, code_string, execution_globals=None, limits=None, stdin=None):
+        """Executa `code_string` via `code_executor.execute_code`."""
+        return self._record("execute_code", code_executor.execute_code(code_string, execution_globals, limits, stdin=stdin))
+
+    @timed("execute")
+    def execute_code_stream(self, code_string, on_output, execution_globals=None, limits=None, stdin=None, cancel=None):
+        """
+        Executa `code_string` repassando cada trecho de saída para `on_output(nome, texto)`.
+
+        Com `cancel` sinalizado, a execução é interrompida na próxima escrita
+        (ou nem começa, se ele já estiver sinalizado).
+        """
+        if cancel is None:
+            return self._record("execute_code", code_executor.execute_code(code_string, execution_globals, limits,
+                                                                            on_output=on_output, stdin=stdin))
+        if cancel.is_set():
+            return self._record("execute_code", _cancelled_result())
+
+        def forward(name, text):
+            if cancel.is_set():
+                raise _Cancelled()
+            on_output(name, text)
+
+        try:
+            result = code_executor.execute_code(code_string, execution_globals, limits, on_output=forward, stdin=stdin)
+        except _Cancelled:
+            result = _cancelled_result()
+        return self._record("execute_code", result)
+
+    @timed("execute")
+    def execute_submission(self, user_code, test_code=None, execution_globals=None, limits=None, stdin=None):
+        """Executa `user_code` e `test_code` no mesmo escopo via `code_executor.execute_submission`."""
+        return self._record("execute_submission",
+                            code_executor.execute_submission(user_code, test_code, execution_globals, limits, stdin=stdin))
+
+    @timed("execute")
+    def execute_test(self, test_code, namespace=None, limits=None):
+        """Executa `test_code` via `code_executor.execute_test`."""
+        return self._record("execute_test", code_executor.execute_test(test_code, namespace, limits))
+
+    def _record(self, func_name, result):
+        """Contabiliza a execução nas métricas (veja `metrics`) e retorna o resultado."""
+        record_execution(self.name, func_name, result)
+        return result
+
+    def stats(self):
+        """Retorna estatísticas do backend (nenhuma para execução em processo)."""
+        return {"backend": self.name}
+
+    def shutdown(self):
+        """Não há recursos a liberar para a execução em processo."""
+
+
+def _raise_cpu_limit(signum, frame):
+    """Tratador de SIGXCPU: interrompe o código em execução."""
+    raise CPUTimeLimitExceeded()
+
+
+def _current_address_space():
+    """Retorna o tamanho atual do espaço de endereçamento do processo, em bytes (0 se indisponível)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _apply_rlimits(limits):
+    """
+    Aplica os limites de CPU e memória ao processo trabalhador atual.
+
+    Como o trabalhador é reutilizado, os limites são relativos ao consumo atual:
+    o limite de CPU soma `cpu_time` ao tempo já consumido, e o de memória soma
+    `memory_bytes` ao espaço de endereçamento atual. Apenas os limites *soft*
+    são alterados, para que possam ser restaurados depois.
+
+    Returns:
+        list: Pares (recurso, limites_anteriores) para `_restore_rlimits`.
+    """
+    previous = []
+    if resource is None or limits is None:
+        return previous
+    if limits.cpu_time is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        new_soft = int(usage.ru_utime + usage.ru_stime + limits.cpu_time) + 1
+        if hard != resource.RLIM_INFINITY:
+            new_soft = min(new_soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (new_soft, hard))
+        previous.append((resource.RLIMIT_CPU, (soft, hard)))
+    if limits.memory_bytes is not None:
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        new_soft = _current_address_space() + limits.memory_bytes
+        if hard != resource.RLIM_INFINITY:
+            new_soft = min(new_soft, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (new_soft, hard))
+        previous.append((resource.RLIMIT_AS, (soft, hard)))
+    return previous
+
+
+# Tabela de serialização das mensagens enviadas aos trabalhadores: objetos de
+# código não são serializáveis com pickle, então são transportados via marshal
+# (o trabalhador roda o mesmo interpretador que o servidor).
+_MESSAGE_DISPATCH_TABLE = copyreg.dispatch_table.copy()
+_MESSAGE_DISPATCH_TABLE[types.CodeType] = lambda code: (marshal.loads, (marshal.dumps(code),))
+
+
+def _dumps_message(message):
+    """Serializa uma mensagem para um trabalhador, aceitando objetos de código."""
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = _MESSAGE_DISPATCH_TABLE
+    pickler.dump(message)
+    return buffer.getvalue()
+
+
+def _restore_rlimits(previous):
+    """Restaura os limites salvos por `_apply_rlimits`."""
+    for rlimit, values in previous:
+        resource.setrlimit(rlimit, values)
+
+
+def _worker_main(conn, preload_modules):
+    """
+    Laço principal de um processo trabalhador.
+
+    Importa os módulos de `preload_modules` uma única vez e então atende
+    mensagens `(nome_da_funcao, args, kwargs)` serializadas com pickle,
+    respondendo com o dicionário de resultado da função de `code_executor`.
+    Se `kwargs["stream"]` for verdadeiro, cada trecho de saída é enviado antes,
+    como uma mensagem `("output", nome, texto)`. Os limites de CPU e memória de `kwargs["limits"]` valem apenas durante
+    a chamada, que é executada em um diretório de trabalho temporário próprio
+    (veja `code_executor.scratch_directory`). Uma mensagem `None` (ou o fechamento da conexão) encerra o trabalhador.
+    """
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    for module_name in preload_modules:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
+        except Exception as e: # Um módulo quebrado não deve impedir o trabalhador de subir
+            logger.debug(f"Falha ao pré-carregar '{module_name}' no trabalhador: {e}")
+
+    while True:
+        try:
+            message = pickle.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        func_name, args, kwargs = message
+        previous_rlimits = []
+        try:
+            if func_name not in DISPATCHABLE_FUNCTIONS:
+                raise ValueError(f"Função '{func_name}' não pode ser despachada.")
+            if kwargs.pop("stream", False):
+                kwargs["on_output"] = lambda name, text: conn.send_bytes(pickle.dumps(("output", name, text)))
+            previous_rlimits = _apply_rlimits(kwargs.get("limits"))
+            # Cada execução tem seu próprio diretório de trabalho (arquivos relativos não colidem)
+            with scratch_directory():
+                result = getattr(code_executor, func_name)(*args, **kwargs)
+        except CPUTimeLimitExceeded:
+            result = {"returncode": 1, "stdout": "", "stderr": "TimeoutError: Limite de tempo de CPU excedido.", "error_type": "TimeoutError"}
+        except BaseException as e: # Inclui SystemExit (ex: exit() no código do usuário)
+            result = {"returncode": 1, "stdout": "", "stderr": f"{type(e).__name__}: {e}", "error_type": type(e).__name__}
+        finally:
+            _restore_rlimits(previous_rlimits)
+
+        try:
+            conn.send_bytes(pickle.dumps(result))
+        except (EOFError, OSError):
+            break
+    conn.close()
+
+
+class _Worker:
+    """Processo trabalhador e a extremidade da conexão usada pelo servidor."""
+
+    def __init__(self, ctx, preload_modules):
+        parent_conn, child_conn = ctx.Pipe()
+        # daemon=False: exercícios de multiprocessing criam processos filhos,
+        # o que não é permitido a processos daemon.
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, preload_modules),
+                                   name="code-executor-worker", daemon=False)
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.jobs_done = 0
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def stop(self, timeout=1.0):
+        """Solicita o encerramento do trabalhador e o mata se não sair a tempo."""
+        try:
+            self.conn.send_bytes(pickle.dumps(None))
+        except (EOFError, OSError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self):
+        """Encerra o processo imediatamente e libera a conexão."""
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1.0)
+        self.conn.close()
+
+
+class ProcessPoolBackend:
+    """
+    Backend que executa o código em um pool de processos trabalhadores.
+
+    Os trabalhadores são criados (pré-forkados) em `start()`, ou na primeira
+    execução, e importam `preload_modules` ao iniciar. Cada chamada ocupa um
+    trabalhador ocioso; se todos estiverem ocupados, a chamada aguarda até que
+    um seja liberado. Após `max_jobs_per_worker` execuções o trabalhador é
+    substituído. Se um trabalhador morrer durante a execução, o resultado
+    reporta `error_type` "WorkerCrashed" e um novo trabalhador assume seu lugar.
+    Se a execução exceder `limits.wall_time`, o trabalhador é morto, o resultado
+    reporta `error_type` "TimeoutError" e um novo trabalhador assume seu lugar.
+
+    As chamadas são thread-safe: várias threads do servidor podem despachar
+    execuções simultaneamente, até o limite de `size` execuções paralelas.
+    Até `max_queue` chamadas aguardam um trabalhador livre, por no máximo
+    `max_wait` segundos; as demais são recusadas com `ExecutorBusy`.
+
+    Attributes:
+        size (int): Número de processos trabalhadores.
+        max_jobs_per_worker (int): Execuções por trabalhador antes da reciclagem.
+        preload_modules (tuple): Módulos importados por cada trabalhador ao iniciar.
+        max_queue (int): Número máximo de chamadas aguardando um trabalhador.
+        max_wait (float | None): Tempo máximo de espera por um trabalhador, em segundos.
+        queue_wait (Histogram): Tempos de espera (em milissegundos) das chamadas admitidas.
+    """
+    name = "process"
+
+    def __init__(self, size=None, max_jobs_per_worker=DEFAULT_MAX_JOBS_PER_WORKER,
+                 preload_modules=DEFAULT_PRELOAD_MODULES, start_method=None,
+                 max_queue=DEFAULT_MAX_QUEUE, max_wait=DEFAULT_MAX_WAIT_SECONDS):
+        """
+        Inicializa o pool sem criar processos (veja `start`).
+
+        Args:
+            size (int, optional): Número de trabalhadores. Padrão: `os.cpu_count()`.
+            max_jobs_per_worker (int): Execuções antes de reciclar um trabalhador.
+            preload_modules (iterable): Nomes de módulos a importar em cada trabalhador.
+            start_method (str, optional): Método de início do multiprocessing
+                ("fork", "spawn", "forkserver"). Padrão: o da plataforma.
+            max_queue (int): Chamadas que podem aguardar um trabalhador livre.
+            max_wait (float | None): Segundos que uma chamada pode aguardar (None = sem limite).
+        """
+        self.size = size or os.cpu_count() or 1
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.preload_modules = tuple(preload_modules)
+        self._ctx = multiprocessing.get_context(start_method)
+        self._cond = threading.Condition()
+        self._idle = []
+        self._busy = set()
+        self._started = False
+        self._closed = False
+        self.jobs_completed = 0
+        self.workers_recycled = 0
+        self.workers_crashed = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.rejected = 0
+        self.cancelled = 0
+        self.queue_wait = Histogram()
+
+    def start(self):
+        """Cria os processos trabalhadores, caso ainda não tenham sido criados."""
+        with self._cond:
+            if self._started:
+                return
+            if self._closed:
+                raise RuntimeError("O pool de execução já foi encerrado.")
+            for _ in range(self.size):
+                self._idle.append(_Worker(self._ctx, self.preload_modules))
+            self._started = True
+            atexit.register(self.shutdown)
+        logger.info(f"Pool de execução iniciado com {self.size} trabalhadores.")
+
+    @timed("execute")
+    def execute_code(self, code_string, execution_globals=None, limits=None, stdin=None):
+        """Executa `code_string` em um trabalhador via `code_executor.execute_code`."""
+        return self._dispatch("execute_code", code_string, execution_globals,
+                              limits=limits or DEFAULT_LIMITS, stdin=stdin)
+
+    @timed("execute")
+    def execute_code_stream(self, code_string, on_output, execution_globals=None, limits=None, stdin=None, cancel=None):
+        """
+        Executa `code_string` em um trabalhador, repassando a saída à medida que é produzida.
+
+        Args:
+            code_string (str | code): O código a executar.
+            on_output (callable): Chamada na thread atual com `(nome, texto)` para
+                cada trecho de saída recebido do trabalhador. Enquanto ela não
+                retorna, o trabalhador pode ficar bloqueado ao escrever
+                (contrapressão), mas o tempo de relógio continua contando.
+            execution_globals (dict, optional): O escopo global da execução.
+            limits (ExecutionLimits, optional): Os limites da execução.
+            stdin (str | list, optional): A entrada padrão da execução.
+            cancel (threading.Event, optional): Quando sinalizado, o trabalhador é
+                morto (ou a espera por um trabalhador é abandonada) e o resultado
+                reporta `error_type` "Cancelled".
+
+        Returns:
+            dict: O dicionário de resultado de `code_executor.execute_code`, sem a
+                  saída já repassada.
+        """
+        return self._dispatch("execute_code", code_string, execution_globals,
+                              limits=limits or DEFAULT_LIMITS, stdin=stdin, stream=True, on_output=on_output,
+                              cancel=cancel)
+
+    @timed("execute")
+    def execute_submission(self, user_code, test_code=None, execution_globals=None, limits=None, stdin=None):
+        """
+        Executa `user_code` e `test_code` em um único trabalhador, no mesmo escopo,
+        via `code_executor.execute_submission`.
+
+        As duas etapas ocupam uma única ida e volta ao trabalhador, e o tempo de
+        relógio (`limits.wall_time`) vale para o conjunto. Se ele for excedido, o
+        resultado é o de tempo esgotado, sem a chave "test".
+        """
+        return self._dispatch("execute_submission", user_code, test_code, execution_globals,
+                              limits=limits or DEFAULT_LIMITS, stdin=stdin)
+
+    @timed("execute")
+    def execute_test(self, test_code, namespace=None, limits=None):
+        """Executa `test_code` em um trabalhador via `code_executor.execute_test`."""
+        return self._dispatch("execute_test", test_code, namespace, limits=limits or DEFAULT_LIMITS)
+
+    def _acquire(self, cancel=None):
+        """
+        Retorna um trabalhador ocioso, aguardando se todos estiverem ocupados.
+
+        Args:
+            cancel (threading.Event, optional): Se sinalizado durante a espera,
+                a espera é abandonada e None é retornado.
+
+        Raises:
+            ExecutorBusy: Se a fila de espera estiver cheia ou a espera exceder `max_wait`.
+        """
+        if not self._started:
+            self.start()
+        enqueued = time.monotonic()
+        deadline = None if self.max_wait is None else enqueued + self.max_wait
+        with self._cond:
+            if not self._idle and self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusy(f"Fila de execução cheia ({self.waiting} chamadas aguardando).",
+                                   self._retry_after())
+            self.waiting += 1
+            try:
+                while not self._idle:
+                    if self._closed:
+                        raise RuntimeError("O pool de execução foi encerrado.")
+                    if cancel is not None and cancel.is_set():
+                        return None
+                    timeout = None if deadline is None else deadline - time.monotonic()
+                    if timeout is not None and timeout <= 0:
+                        self.rejected += 1
+                        raise ExecutorBusy(f"Nenhum trabalhador livre após {self.max_wait:g} s de espera.",
+                                           self._retry_after())
+                    if cancel is not None:
+                        timeout = CANCEL_POLL_SECONDS if timeout is None else min(timeout, CANCEL_POLL_SECONDS)
+                    self._cond.wait(timeout)
+            finally:
+                self.waiting -= 1
+            worker = self._idle.pop()
+            self._busy.add(worker)
+            self.queue_wait.observe((time.monotonic() - enqueued) * 1000)
+            return worker
+
+    def _retry_after(self):
+        """Estima, em segundos, quando tentar novamente: o p95 das esperas recentes (no mínimo 1 s)."""
+        return max(1, math.ceil(self.queue_wait.percentile(0.95) / 1000))
+
+    def _release(self, worker, replace=False):
+        """Devolve o trabalhador ao pool, substituindo-o se necessário."""
+        recycle = replace or worker.jobs_done >= self.max_jobs_per_worker
+        if recycle:
+            if replace:
+                worker.kill()
+            else:
+                worker.stop()
+        with self._cond:
+            self._busy.discard(worker)
+            if self._closed:
+                if not recycle:
+                    worker.stop()
+                return
+            if recycle:
+                if not replace:
+                    self.workers_recycled += 1
+                worker = _Worker(self._ctx, self.preload_modules)
+            self._idle.append(worker)
+            self._cond.notify()
+
+    def _dispatch(self, func_name, *args, on_output=None, cancel=None, **kwargs):
+        """
+        Envia a chamada `func_name(*args, **kwargs)` para um trabalhador e aguarda o resultado.
+
+        Os argumentos são serializados antes de ocupar um trabalhador, de modo que
+        argumentos não serializáveis (ex: objetos em `execution_globals`) geram
+        a exceção de pickle para o chamador sem afetar o pool. O tempo de relógio
+        é limitado por `kwargs["limits"].wall_time`. As mensagens de saída de uma
+        chamada com `stream=True` são repassadas para `on_output`. Se `cancel` for
+        sinalizado, o trabalhador é morto e substituído.
+        """
+        wall_time = kwargs["limits"].wall_time
+        payload = _dumps_message((func_name, args, kwargs))
+        worker = self._acquire(cancel)
+        if worker is None:
+            return self._record(func_name, _cancelled_result())
+        deadline = None if wall_time is None else time.monotonic() + wall_time
+        try:
+            worker.conn.send_bytes(payload)
+            while True:
+                if cancel is not None and cancel.is_set():
+                    with self._cond:
+                        self.cancelled += 1
+                    logger.info("Execução cancelada; trabalhador (pid %s) será substituído.", worker.pid)
+                    self._release(worker, replace=True)
+                    return self._record(func_name, _cancelled_result())
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if cancel is not None:
+                    wait = CANCEL_POLL_SECONDS if timeout is None else min(timeout, CANCEL_POLL_SECONDS)
+                    if not worker.conn.poll(wait) and (timeout is None or timeout > wait):
+                        continue # Nenhuma mensagem ainda; verifica novamente o cancelamento
+                if timeout is not None and not worker.conn.poll(0 if cancel is not None else timeout):
+                    with self._cond:
+                        self.timeouts += 1
+                    logger.warning(f"Execução excedeu {wall_time:g} s; trabalhador (pid {worker.pid}) será substituído.")
+                    self._release(worker, replace=True)
+                    return self._record(func_name, _timeout_result(wall_time))
+                message = pickle.loads(worker.conn.recv_bytes())
+                if isinstance(message, tuple) and message[0] == "output":
+                    on_output(message[1], message[2])
+                    continue
+                result = message
+                break
+        except (EOFError, OSError) as e:
+            with self._cond:
+                self.workers_crashed += 1
+            logger.error(f"Trabalhador de execução (pid {worker.pid}) encerrado inesperadamente: {e}")
+            self._release(worker, replace=True)
+            return self._record(func_name, _crashed_result("O processo de execução foi encerrado inesperadamente."))
+        except BaseException:
+            # Ex: erro em `on_output`; a execução no trabalhador fica em estado desconhecido.
+            self._release(worker, replace=True)
+            raise
+        worker.jobs_done += 1
+        with self._cond:
+            self.jobs_completed += 1
+        self._release(worker, replace=result.get("error_type") in RECYCLE_ON_ERROR_TYPES)
+        return self._record(func_name, result)
+
+    def _record(self, func_name, result):
+        """Contabiliza a execução nas métricas (veja `metrics`) e retorna o resultado."""
+        record_execution(self.name, func_name, result)
+        return result
+
+    def stats(self):
+        """
+        Retorna estatísticas do pool.
+
+        Returns:
+            dict: Tamanho do pool, trabalhadores ocupados/ociosos, execuções
+                  aguardando um trabalhador livre (e o limite da fila), contadores
+                  de execuções, recusas, cancelamentos, reciclagens, falhas e timeouts, e os tempos
+                  de espera por um trabalhador (`queue_wait`, veja `Histogram.snapshot`).
+        """
+        with self._cond:
+            return {
+                "backend": self.name,
+                "size": self.size,
+                "busy_workers": len(self._busy),
+                "idle_workers": len(self._idle),
+                "waiting_jobs": self.waiting,
+                "max_queue": self.max_queue,
+                "jobs_completed": self.jobs_completed,
+                "jobs_rejected": self.rejected,
+                "jobs_cancelled": self.cancelled,
+                "workers_recycled": self.workers_recycled,
+                "workers_crashed": self.workers_crashed,
+                "timeouts": self.timeouts,
+                "queue_wait": self.queue_wait.snapshot(),
+            }
+
+    def shutdown(self):
+        """Encerra os trabalhadores ociosos; os ocupados encerram ao terminar a execução atual."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()
+        logger.info("Pool de execução encerrado.")
+
+
+BACKENDS = {
+    InlineBackend.name: InlineBackend,
+    ProcessPoolBackend.name: ProcessPoolBackend,
+}
+
+
+def create_backend(name="process", **options):
+    """
+    Cria um backend de execução pelo nome.
+
+    Args:
+        name (str): "process" para o pool de processos ou "inline" para execução
+                    no próprio processo.
+        **options: Argumentos repassados ao construtor do backend. Opções com
+                   valor None são ignoradas, mantendo os padrões do backend.
+
+    Returns:
+        InlineBackend | ProcessPoolBackend: O backend criado.
+
+    Raises:
+        ValueError: Se `name` não corresponder a um backend conhecido.
+    """
+    backend_cls = BACKENDS.get(name)
+    if backend_cls is None:
+        raise ValueError(f"Backend de execução desconhecido: '{name}'. Opções: {', '.join(BACKENDS)}.")
+    if backend_cls is InlineBackend:
+        return InlineBackend()
+    return backend_cls(**{key: value for key, value in options.items() if value is not None})
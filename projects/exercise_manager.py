@@ -10,6 +10,8 @@ import json
 import logging
 from pathlib import Path
 
+from .content_cache import content_cache, file_signature
+
 # Import CourseManager para obter o caminho do arquivo de exercícios
 # Isso cria uma dependência, mas alinha com a lógica de app.py
 # from .course_manager import CourseManager # Removido, pois get_exercise_by_id não usa mais CourseManager diretamente
@@ -19,28 +21,95 @@ logger = logging.getLogger(__name__)
 # DATA_DIR apontará para Curso-Interartivo-Python/projects/data/
 DATA_DIR = Path(__file__).resolve().parent / 'data'
 
+class ExerciseIndex:
+    """
+    Índices de acesso direto aos exercícios de um arquivo.
+
+    Construído uma vez por versão do arquivo (veja `ExerciseManager.get_exercise_index`),
+    substitui as buscas lineares por ID e por lição.
+
+    Attributes:
+        items (list): Os exercícios indexados, na ordem do arquivo.
+        by_id (dict): ID do exercício (str) -> exercício. Em IDs repetidos,
+                      prevalece a primeira ocorrência.
+        position (dict): ID do exercício (str) -> posição em `items`.
+        by_lesson (dict): ID da lição (str) -> lista de exercícios da lição, na ordem do arquivo.
+    """
+    def __init__(self, exercises, level=None):
+        """
+        Constrói os índices.
+
+        Args:
+            exercises (list): A lista de exercícios carregada do arquivo.
+            level (str, optional): Se fornecido, apenas exercícios cujo campo
+                'level' (sem diferenciar maiúsculas) seja igual a `level` são indexados.
+        """
+        self.items = []
+        self.by_id = {}
+        self.position = {}
+        self.by_lesson = {}
+        for exercise in exercises:
+            if not isinstance(exercise, dict):
+                continue
+            if level and exercise.get('level', '').lower() != level:
+                continue
+            exercise_id = str(exercise.get('id'))
+            if exercise_id not in self.by_id:
+                self.by_id[exercise_id] = exercise
+                self.position[exercise_id] = len(self.items)
+            self.items.append(exercise)
+            self.by_lesson.setdefault(str(exercise.get('lesson_id')), []).append(exercise)
+
+    def get(self, exercise_id):
+        """Retorna o exercício com o ID fornecido, ou None."""
+        return self.by_id.get(str(exercise_id))
+
+    def for_lesson(self, lesson_id):
+        """Retorna a lista (possivelmente vazia) de exercícios da lição fornecida."""
+        return self.by_lesson.get(str(lesson_id), [])
+
+
 class ExerciseManager:
     """
     Gerencia o carregamento de dados de exercícios a partir de arquivos JSON.
 
     Os exercícios são carregados sob demanda de arquivos especificados, geralmente
-    referenciados nos dados de um curso.
+    referenciados nos dados de um curso, e mantidos em um `ContentCache`
+    enquanto o arquivo não for alterado.
+
+    Attributes:
+        cache (ContentCache): O cache de conteúdo usado nos carregamentos.
+        data_dir (Path | None): O diretório de dados (None = o `DATA_DIR` do módulo).
     """
-    def __init__(self):
+    def __init__(self, cache=None, data_dir=None):
         """
         Inicializa o ExerciseManager.
 
         Nenhuma ação de carregamento de dados é realizada durante a inicialização.
         Os exercícios são carregados sob demanda.
+
+        Args:
+            cache (ContentCache, optional): O cache de conteúdo a utilizar.
+                Padrão: a instância compartilhada `content_cache`.
+            data_dir (str | Path, optional): O diretório de dados em que os caminhos
+                relativos são resolvidos. Padrão: o `DATA_DIR` do módulo.
         """
-        pass # Nenhuma ação de carregamento na inicialização
+        self.cache = cache if cache is not None else content_cache
+        self.data_dir = Path(data_dir) if data_dir is not None else None
+
+    def _resolve(self, relative_path):
+        """Retorna o caminho absoluto de um arquivo de dados a partir do caminho relativo."""
+        # O DATA_DIR do módulo é lido a cada chamada, para que possa ser substituído (ex: em testes)
+        return (self.data_dir if self.data_dir is not None else DATA_DIR) / relative_path
 
     def load_exercises_from_file(self, exercises_file_path_relative: str) -> list:
         """
         Carrega exercícios de um arquivo JSON específico, relativo à pasta 'data' do projeto.
 
         O caminho fornecido é combinado com o `DATA_DIR` do módulo para formar
-        o caminho absoluto para o arquivo de exercícios.
+        o caminho absoluto para o arquivo de exercícios. O conteúdo decodificado
+        é reutilizado do cache enquanto o arquivo não mudar; a lista retornada
+        é compartilhada e não deve ser modificada.
 
         Args:
             exercises_file_path_relative (str): O caminho relativo para o arquivo JSON
@@ -58,37 +127,96 @@ class ExerciseManager:
             return []
 
         # Constrói o caminho completo para o arquivo de exercícios
-        full_file_path = DATA_DIR / exercises_file_path_relative
+        full_file_path = self._resolve(exercises_file_path_relative)
         
-        logger.debug(f"Tentando carregar exercícios de: {full_file_path}")
+        logger.debug("Tentando carregar exercícios de: %s", full_file_path)
         
-        if full_file_path.exists() and full_file_path.is_file():
-            try:
-                with open(full_file_path, 'r', encoding='utf-8') as f:
-                    exercises_data = json.load(f)
-                    if not isinstance(exercises_data, list):
-                        logger.error(f"Formato inválido em {full_file_path}. Esperava uma lista, obteve {type(exercises_data)}. Retornando lista vazia.")
-                        return []
-                    logger.info(f"Sucesso ao carregar {len(exercises_data)} exercícios de {full_file_path}")
-                    return exercises_data
-            except json.JSONDecodeError as e:
-                logger.error(f"Erro de decodificação JSON ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
-            except IOError as e: # Captura erros de I/O mais genéricos
-                logger.error(f"Erro de I/O ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
-            except Exception as e: # Captura qualquer outra exceção inesperada
-                logger.error(f"Erro inesperado ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
-        else:
+        if full_file_path.is_file():
+            # O cache só relê o arquivo se sua data de modificação ou tamanho mudarem.
+            return self.cache.get(full_file_path, self._read_exercises_file)
+        logger.warning(f"Arquivo de exercícios não encontrado ou não é um arquivo: {full_file_path}")
+        return [] # Retorna lista vazia se o arquivo não existe
+
+    def get_file_version(self, exercises_file_path_relative: str):
+        """
+        Retorna a versão atual de um arquivo de exercícios.
+
+        Usada para invalidar estruturas mantidas fora do `ContentCache` (ex: o
+        código compilado dos testes) quando o arquivo é alterado.
+
+        Args:
+            exercises_file_path_relative (str): O caminho relativo para o arquivo JSON
+                de exercícios, a partir do diretório 'data'.
+
+        Returns:
+            tuple | None: A assinatura do arquivo (veja `file_signature`), ou None
+                          se o arquivo não puder ser acessado.
+        """
+        if not exercises_file_path_relative:
+            return None
+        return file_signature(self._resolve(exercises_file_path_relative))
+
+    def get_exercise_index(self, exercises_file_path_relative: str, level: str = None) -> ExerciseIndex:
+        """
+        Retorna os índices dos exercícios de um arquivo, opcionalmente filtrados por nível.
+
+        Os índices são construídos uma vez por versão do arquivo e mantidos no
+        cache de conteúdo junto com a lista de exercícios.
+
+        Args:
+            exercises_file_path_relative (str): O caminho relativo para o arquivo JSON
+                de exercícios, a partir do diretório 'data'.
+            level (str, optional): Nível (em minúsculas) dos exercícios a indexar,
+                ex: "básico". Se None, todos os exercícios são indexados.
+
+        Returns:
+            ExerciseIndex: Os índices. Vazios se o arquivo não existir ou for inválido.
+        """
+        if not exercises_file_path_relative:
+            logger.warning("get_exercise_index chamado com caminho relativo vazio.")
+            return ExerciseIndex([])
+
+        full_file_path = self._resolve(exercises_file_path_relative)
+        if not full_file_path.is_file():
             logger.warning(f"Arquivo de exercícios não encontrado ou não é um arquivo: {full_file_path}")
-            
-        return [] # Retorna lista vazia se o arquivo não existe ou em caso de erro
+            return ExerciseIndex([])
+        return self.cache.get_derived(full_file_path, f"index:{level or ''}", self._read_exercises_file,
+                                      lambda exercises: ExerciseIndex(exercises, level))
+
+    def _read_exercises_file(self, full_file_path: Path) -> list:
+        """
+        Lê e decodifica um arquivo JSON de exercícios, sem passar pelo cache.
+
+        Args:
+            full_file_path (Path): O caminho absoluto do arquivo.
+
+        Returns:
+            list: A lista de exercícios, ou uma lista vazia em caso de erro de
+                  formato, decodificação JSON ou I/O.
+        """
+        try:
+            with open(full_file_path, 'r', encoding='utf-8') as f:
+                exercises_data = json.load(f)
+                if not isinstance(exercises_data, list):
+                    logger.error(f"Formato inválido em {full_file_path}. Esperava uma lista, obteve {type(exercises_data)}. Retornando lista vazia.")
+                    return []
+                logger.info(f"Sucesso ao carregar {len(exercises_data)} exercícios de {full_file_path}")
+                return exercises_data
+        except json.JSONDecodeError as e:
+            logger.error(f"Erro de decodificação JSON ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
+        except IOError as e: # Captura erros de I/O mais genéricos
+            logger.error(f"Erro de I/O ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
+        except Exception as e: # Captura qualquer outra exceção inesperada
+            logger.error(f"Erro inesperado ao carregar exercícios de {full_file_path}: {e}", exc_info=True)
+        return [] # Retorna lista vazia em caso de erro
 
 # Função para ser importada pelos testes e outras partes da aplicação
 def get_exercise_by_id(exercise_id: str, course_id: str) -> dict | None:
     """
     Busca um exercício específico pelo seu ID dentro de um curso.
 
-    Esta função carrega os exercícios do arquivo JSON associado ao `course_id`
-    e procura pelo `exercise_id` fornecido.
+    Esta função obtém os índices dos exercícios do arquivo JSON associado ao
+    `course_id` e consulta o `exercise_id` fornecido diretamente.
 
     Args:
         exercise_id (str): O ID do exercício a ser encontrado.
@@ -111,17 +239,17 @@ def get_exercise_by_id(exercise_id: str, course_id: str) -> dict | None:
     exercises_file_relative_path = f"{course_id}/exercises.json"
 
     mgr = ExerciseManager() # Cria uma instância para usar o método de carregamento
-    all_exercises_for_course = mgr.load_exercises_from_file(exercises_file_relative_path)
+    exercise_index = mgr.get_exercise_index(exercises_file_relative_path)
 
-    if not all_exercises_for_course: # Se a lista estiver vazia (arquivo não encontrado, erro de parse, etc.)
+    if not exercise_index.items: # Se não houver exercícios (arquivo não encontrado, erro de parse, etc.)
         logger.warning(f"Nenhum exercício carregado para o curso '{course_id}' a partir de '{exercises_file_relative_path}'.")
         return None
 
-    for exercise in all_exercises_for_course:
-        if isinstance(exercise, dict) and str(exercise.get("id")) == str(exercise_id):
-            logger.debug(f"Exercício ID '{exercise_id}' encontrado no curso '{course_id}'.")
-            return exercise
-            
+    exercise = exercise_index.get(exercise_id)
+    if exercise is not None:
+        logger.debug("Exercício ID '%s' encontrado no curso '%s'.", exercise_id, course_id)
+        return exercise
+
     logger.warning(f"Exercício com ID '{exercise_id}' não encontrado no arquivo '{exercises_file_relative_path}' para o curso '{course_id}'.")
     return None
 
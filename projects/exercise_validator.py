@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para validação em lote dos exercícios dos cursos.
+
+Para cada exercício de cada curso, executa o `solution_code` e, em seguida,
+o `test_code` com a saída da solução disponível na variável `output`,
+verificando que a solução de referência passa no próprio teste. É usado por
+`testes/test_meta_exercise.py` e pode ser executado diretamente:
+
+    python -m projects.exercise_validator [--workers N] [--course ID]
+
+Os exercícios são distribuídos entre processos trabalhadores isolados. Cada
+trabalhador importa uma única vez os módulos pesados disponibilizados aos
+exercícios (`COMMON_MODULES_TO_IMPORT`: numpy, pandas, sklearn, ...) e
+reutiliza esses objetos em todas as execuções que atende; cada exercício
+recebe uma cópia rasa desse escopo, de modo que as definições de um
+exercício não vazam para o próximo.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+
+from .code_executor import make_input, make_stdin, scratch_directory
+from .grading import run_test_cases
+
+logger = logging.getLogger(__name__)
+
+# Caminho para o diretório de dados e o arquivo principal de cursos
+PROJECT_ROOT_DIR = os.path.dirname(os.path.abspath(__file__)) # Pasta 'projects'
+DATA_DIR = os.path.join(PROJECT_ROOT_DIR, 'data')
+
+# Módulos/Objetos comuns a serem disponibilizados no escopo de execução.
+# O formato é "caminho.do.modulo_ou_objeto_a_importar": "nome_no_escopo_de_execucao".
+# Módulos ausentes no ambiente são ignorados.
+COMMON_MODULES_TO_IMPORT = {
+    "numpy": "np",
+    "pandas": "pd",
+    "matplotlib.pyplot": "plt",
+    "flask.Flask": "Flask", # Importa a classe Flask
+    "flask.request": "request",
+    "flask.render_template": "render_template",
+    "flask.jsonify": "jsonify",
+    "flask.abort": "abort",
+    "sqlalchemy": "sqlalchemy", # O módulo em si
+    "sqlalchemy.orm": "orm",
+    "sqlalchemy.ext.declarative.declarative_base": "declarative_base_sa", # Evitar conflito com Base do abc
+    "sqlalchemy.Column": "Column",
+    "sqlalchemy.Integer": "Integer",
+    "sqlalchemy.String": "String",
+    "sqlalchemy.Text": "Text",
+    "sqlalchemy.Float": "Float",
+    "sqlalchemy.Boolean": "Boolean",
+    "sklearn.linear_model.LinearRegression": "LinearRegression",
+    "sklearn.neighbors.KNeighborsClassifier": "KNeighborsClassifier",
+    "django.db.models": "models_django", # Renomeado para evitar conflito se 'models' for usado genericamente
+    "django.http.HttpResponse": "HttpResponse",
+    "django.urls.path": "path_django",
+    "django.contrib.admin": "admin_django",
+    "requests": "requests",
+    "json": "json",
+    "math": "math",
+    "random": "random",
+    "re": "re",
+    "datetime": "datetime",
+    "collections": "collections",
+    "collections.deque": "deque", # Importar deque especificamente
+    "os": "os",
+    "sys": "sys",
+    "abc.ABC": "ABC",
+    "abc.abstractmethod": "abstractmethod",
+    "functools": "functools",
+    "threading": "threading",
+    "multiprocessing": "multiprocessing",
+    "asyncio": "asyncio",
+    "tkinter": "tk",
+    "io": "io",
+    "ast": "ast",
+}
+
+# Escopo com os módulos comuns, carregado uma vez por processo trabalhador.
+_common_globals = None
+
+
+def load_common_globals():
+    """
+    Importa os módulos de `COMMON_MODULES_TO_IMPORT` e retorna o escopo com eles.
+
+    O resultado é calculado uma única vez por processo.
+
+    Returns:
+        dict: Nome no escopo -> módulo ou objeto importado.
+    """
+    global _common_globals
+    if _common_globals is not None:
+        return _common_globals
+
+    common_globals = {}
+    for import_path, name_in_scope in COMMON_MODULES_TO_IMPORT.items():
+        try:
+            module_parts = import_path.split('.')
+            if len(module_parts) == 1: # Ex: "numpy"
+                common_globals[name_in_scope] = __import__(import_path)
+            else: # Ex: "flask.Flask"
+                module = __import__('.'.join(module_parts[:-1]), fromlist=[module_parts[-1]])
+                common_globals[name_in_scope] = getattr(module, module_parts[-1])
+        except ImportError as e:
+            logger.debug(f"Módulo/Objeto '{import_path}' como '{name_in_scope}' não encontrado para importação: {e}")
+        except Exception as e:
+            logger.error(f"Erro inesperado ao tentar importar '{import_path}' como '{name_in_scope}': {e}")
+    _common_globals = common_globals
+    return common_globals
+
+
+def run_code(code_string, execution_globals, stdin=None):
+    """
+    Executa um código no escopo fornecido, capturando o stdout.
+
+    Args:
+        code_string (str): O código a executar.
+        execution_globals (dict): O escopo global da execução (modificado no lugar).
+        stdin (str | list, optional): A entrada lida pelas chamadas a input(), como
+                                      o campo "stdin" dos exercícios. A função
+                                      `input` é injetada no escopo, sem alterar
+                                      `builtins`.
+
+    Returns:
+        tuple: A saída capturada (str) e o traceback formatado (str) da exceção
+               levantada, ou None se não houve exceção.
+    """
+    stdout_capture = io.StringIO()
+    execution_globals['input'] = make_input(make_stdin(stdin), stdout_capture)
+    exception_info = None
+    try:
+        with contextlib.redirect_stdout(stdout_capture):
+            exec(code_string, execution_globals)
+    except Exception:
+        exception_info = traceback.format_exc()
+    return stdout_capture.getvalue(), exception_info
+
+
+class _ValidationExecutor:
+    """
+    Adaptador com a interface de execução dos backends (`execute_submission`) sobre
+    `run_code`, usado para validar os casos de teste estruturados com
+    `grading.run_test_cases`. Cada execução recebe uma cópia do escopo comum.
+    """
+
+    def execute_submission(self, user_code, test_code=None, execution_globals=None, limits=None, stdin=None):
+        scope = dict(load_common_globals())
+        scope['__name__'] = 'solution_module'
+        scope.update(execution_globals or {})
+        output, exception_info = run_code(user_code, scope, stdin)
+        result = {"returncode": 1 if exception_info else 0, "stdout": output,
+                  "stderr": exception_info or "", "error_type": None, "test": None}
+        if not exception_info and test_code:
+            scope['output'] = output
+            test_output, test_exception = run_code(test_code, scope)
+            result["test"] = {"returncode": 1 if test_exception else 0, "stdout": test_output,
+                              "stderr": test_exception or "", "error_type": None}
+        return result
+
+
+def _result(exercise, passed, message, started):
+    """Monta o dicionário de resultado da validação de um exercício."""
+    return {
+        "course_id": exercise.get("_course_id"),
+        "exercise_id": exercise.get("id"),
+        "passed": passed,
+        "message": message,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def validate_exercise(exercise):
+    """
+    Valida um exercício: a solução de referência deve passar no próprio teste.
+
+    A entrada declarada no campo "stdin" do exercício alimenta as chamadas
+    a input() da solução. Se o exercício define `expected_exception`, a solução deve levantar essa
+    exceção (e conter `expected_exception_message_contains`, se definido), e
+    o `test_code` não é executado.
+
+    Args:
+        exercise (dict): O exercício, com a chave adicional `_course_id`.
+
+    Se o exercício tiver casos de teste estruturados ("test_cases"), a solução
+    também deve passar em todos eles; nesse caso o `test_code` é opcional.
+
+    A validação roda em um diretório de trabalho temporário próprio (veja
+    `code_executor.scratch_directory`), para que exercícios validados em
+    paralelo não gravem os mesmos arquivos relativos.
+
+    Returns:
+        dict: `course_id`, `exercise_id`, `passed` (bool), `message` (str, vazia
+              se passou) e `seconds` (duração da validação).
+    """
+    with scratch_directory():
+        return _validate_exercise(exercise)
+
+
+def _validate_exercise(exercise):
+    """Valida um exercício no diretório de trabalho atual (veja `validate_exercise`)."""
+    started = time.perf_counter()
+    exercise_id = exercise.get("id", "ID Desconhecido")
+    course_id = exercise.get("_course_id", "Curso Desconhecido")
+    test_identifier = f"Curso '{course_id}', Exercício '{exercise_id}'"
+
+    solution_code = exercise.get("solution_code", "")
+    test_code = exercise.get("test_code", "")
+    if not solution_code:
+        return _result(exercise, False, f"{test_identifier}: Sem solution_code para testar.", started)
+    test_cases = exercise.get("test_cases")
+    if not test_code and not test_cases:
+        return _result(exercise, False, f"{test_identifier}: Sem test_code para validar a solução.", started)
+    if test_cases:
+        graded = run_test_cases(_ValidationExecutor(), solution_code, test_cases, stop_on_failure=False)
+        failures = [case for case in graded["cases"] if case["status"] == "failed"]
+        if failures:
+            messages = "\n".join(f"- Caso '{case['name']}': {case['details']}" for case in failures)
+            return _result(exercise, False, f"{test_identifier}: a solution_code falhou em casos de teste:\n{messages}", started)
+        if not test_code:
+            return _result(exercise, True, "", started)
+
+    # 1. Executar solution_code
+    solution_globals = dict(load_common_globals())
+    solution_globals['__name__'] = 'solution_module' # Um __name__ razoável para exercícios com Flask
+    solution_output, solution_exception = run_code(solution_code, solution_globals, exercise.get("stdin"))
+
+    expected_exception_type_str = exercise.get("expected_exception")
+    expected_exception_message_contains = exercise.get("expected_exception_message_contains")
+    if expected_exception_type_str:
+        if solution_exception is None:
+            return _result(exercise, False, f"{test_identifier}: ERRO na solution_code: Esperava uma exceção do tipo '{expected_exception_type_str}', mas nenhuma foi levantada.", started)
+        # solution_exception é o traceback em texto; basta o nome do tipo aparecer nele.
+        if expected_exception_type_str not in solution_exception:
+            return _result(exercise, False, f"{test_identifier}: ERRO na solution_code: Esperava uma exceção do tipo '{expected_exception_type_str}', mas obteve uma exceção diferente ou o traceback não a menciona claramente.\nTraceback: {solution_exception}", started)
+        if expected_exception_message_contains and expected_exception_message_contains not in solution_exception:
+            return _result(exercise, False, f"{test_identifier}: ERRO na solution_code: A mensagem da exceção esperada ('{expected_exception_message_contains}') não foi encontrada no traceback.\nTraceback: {solution_exception}", started)
+        # A exceção esperada ocorreu; o test_code não é executado.
+        return _result(exercise, True, "", started)
+    if solution_exception:
+        return _result(exercise, False, f"{test_identifier}: ERRO na solution_code:\n{solution_exception}", started)
+
+    # 2. Executar test_code com os globais da solução e a saída capturada
+    # (os módulos comuns prevalecem sobre nomes homônimos definidos pela solução)
+    test_globals = solution_globals.copy()
+    test_globals.update(load_common_globals())
+    test_globals['__name__'] = 'solution_module'
+    test_globals['output'] = solution_output
+    test_output, test_exception = run_code(test_code, test_globals)
+    if test_exception:
+        return _result(exercise, False, f"{test_identifier}: Exceção durante a execução do test_code:\n{test_exception}", started)
+
+    is_detailed_feedback_test = "print(f\"SUCESSO:" in test_code or "print(f'SUCESSO:" in test_code
+    if is_detailed_feedback_test and "SUCESSO" not in test_output:
+        return _result(exercise, False, f"{test_identifier}: test_code (detalhado) executado, mas 'SUCESSO' não encontrado na saída.\nSaída do test_code: {test_output.strip()}", started)
+    return _result(exercise, True, "", started)
+
+
+def load_json_file(file_path):
+    """
+    Carrega um arquivo JSON.
+
+    Returns:
+        list: O conteúdo do arquivo, ou uma lista vazia se ele não existir.
+
+    Raises:
+        json.JSONDecodeError: Se o arquivo existir mas não for um JSON válido.
+    """
+    if not os.path.exists(file_path):
+        logger.warning(f"Arquivo não encontrado em {file_path}.")
+        return []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def collect_exercises(data_dir=DATA_DIR, course_ids=None):
+    """
+    Reúne os exercícios de todos os cursos de `courses.json`.
+
+    Args:
+        data_dir (str): O diretório de dados.
+        course_ids (Iterable[str], optional): Se fornecido, apenas esses cursos.
+
+    Returns:
+        list: Os exercícios, cada um com as chaves adicionais `_course_id` e `_course_name`.
+    """
+    all_exercises = []
+    for course_data in load_json_file(os.path.join(data_dir, 'courses.json')):
+        course_id = course_data.get("id")
+        course_name = course_data.get("name", "Curso Desconhecido")
+        exercises_file_relative = course_data.get("exercises_file")
+        if not course_id or not exercises_file_relative:
+            logger.warning(f"Curso '{course_name}' (ID: {course_id}) não possui 'id' ou 'exercises_file' definido. Pulando.")
+            continue
+        if course_ids is not None and course_id not in course_ids:
+            continue
+        for exercise in load_json_file(os.path.join(data_dir, exercises_file_relative)):
+            exercise["_course_id"] = course_id
+            exercise["_course_name"] = course_name
+            all_exercises.append(exercise)
+    return all_exercises
+
+
+def _crashed(exercise, error):
+    """Resultado para um exercício cujo processo de validação morreu ou falhou."""
+    return {
+        "course_id": exercise.get("_course_id"),
+        "exercise_id": exercise.get("id"),
+        "passed": False,
+        "message": f"Curso '{exercise.get('_course_id')}', Exercício '{exercise.get('id')}': "
+                   f"o processo de validação falhou: {type(error).__name__}: {error}",
+        "seconds": 0.0,
+    }
+
+
+def validate_exercises(exercises, workers=None, on_result=None):
+    """
+    Valida os exercícios em paralelo, em processos trabalhadores.
+
+    Cada trabalhador carrega os módulos comuns uma única vez (ao iniciar).
+    Se um exercício derrubar seu trabalhador, os exercícios afetados são
+    revalidados um a um, isolando o responsável.
+
+    Args:
+        exercises (list): Os exercícios (veja `collect_exercises`).
+        workers (int, optional): Número de processos. Padrão: `os.cpu_count()`.
+        on_result (callable, optional): Chamada com cada resultado assim que
+                                        ele fica pronto (ex: para exibir o progresso).
+
+    Returns:
+        list: Os resultados de `validate_exercise`, na ordem de `exercises`.
+    """
+    results = [None] * len(exercises)
+    if not exercises:
+        return results
+
+    def record(index, result):
+        results[index] = result
+        if on_result is not None:
+            on_result(result)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(exercises)))
+    broken = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_common_globals) as executor:
+        futures = {executor.submit(validate_exercise, exercise): index for index, exercise in enumerate(exercises)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                record(index, future.result())
+            except BrokenProcessPool:
+                broken.append(index)
+            except BaseException as e:
+                record(index, _crashed(exercises[index], e))
+
+    # Revalida isoladamente os exercícios afetados pela morte de um trabalhador
+    for index in sorted(broken):
+        with ProcessPoolExecutor(max_workers=1, initializer=load_common_globals) as executor:
+            try:
+                record(index, executor.submit(validate_exercise, exercises[index]).result())
+            except BaseException as e:
+                record(index, _crashed(exercises[index], e))
+    return results
+
+
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando: valida os exercícios e exibe o tempo de cada um.
+
+    Returns:
+        int: 0 se todos os exercícios passaram, 1 caso contrário.
+    """
+    parser = argparse.ArgumentParser(description="Valida as soluções de referência dos exercícios contra seus testes.")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos (padrão: número de CPUs).")
+    parser.add_argument("--course", action="append", dest="courses", help="Valida apenas este curso (pode ser repetido).")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Diretório de dados (padrão: projects/data).")
+    args = parser.parse_args(argv)
+
+    exercises = collect_exercises(args.data_dir, args.courses)
+    started = time.perf_counter()
+
+    def report(result):
+        status = "OK  " if result["passed"] else "FALHA"
+        print(f"{status} {result['seconds']:7.3f}s  {result['course_id']}/{result['exercise_id']}", flush=True)
+
+    results = validate_exercises(exercises, workers=args.workers, on_result=report)
+    failures = [result for result in results if not result["passed"]]
+    for result in failures:
+        print(f"\n{result['message']}")
+    print(f"\n{len(results) - len(failures)} de {len(results)} exercícios passaram em {time.perf_counter() - started:.2f}s.")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
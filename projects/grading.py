@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para correção de exercícios por casos de teste estruturados.
+
+Além do `test_code` (um bloco de código que recebe apenas a variável
+`output`), um exercício pode declarar no seu `exercises.json` uma lista
+`"test_cases"`. Cada caso executa o código do usuário com uma entrada
+própria e verifica a saída:
+
+    "test_cases": [
+        {
+            "name": "acerto",                 (opcional; padrão: "caso N")
+            "stdin": ["7"],                   (opcional; entrada lida por input())
+            "expected_output": "Acertou!",    (opcional)
+            "match": "contains",              (opcional: "strip" (padrão), "exact" ou "contains")
+            "check": "assert 'Acertou' in output"   (opcional; asserções sobre `output` e o escopo do usuário)
+        }
+    ]
+
+Os casos são executados em ordem. Por padrão a correção para no primeiro
+caso que falhar (os demais são reportados como não executados); com
+`stop_on_failure=False`, todos são executados. O resultado traz, para cada
+caso, se passou, a mensagem de falha e a duração.
+"""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Modos de comparação entre a saída obtida e "expected_output".
+MATCH_MODES = ("strip", "exact", "contains")
+
+
+def _normalize(text):
+    """Remove espaços no fim de cada linha e linhas em branco no fim do texto."""
+    return "\n".join(line.rstrip() for line in text.rstrip().splitlines())
+
+
+def output_matches(output, expected, match="strip"):
+    """
+    Compara a saída obtida com a esperada.
+
+    Args:
+        output (str): A saída do código do usuário.
+        expected (str): A saída esperada.
+        match (str): "exact" (igualdade), "contains" (`expected` aparece em
+                     `output`) ou "strip" (igualdade ignorando espaços no fim
+                     das linhas e linhas em branco no fim).
+
+    Returns:
+        bool: True se a saída corresponde à esperada.
+
+    Raises:
+        ValueError: Se `match` não for um modo conhecido.
+    """
+    if match == "exact":
+        return output == expected
+    if match == "contains":
+        return expected in output
+    if match == "strip":
+        return _normalize(output) == _normalize(expected)
+    raise ValueError(f"Modo de comparação desconhecido: '{match}'. Use um de {MATCH_MODES}.")
+
+
+def case_name(case, index):
+    """Retorna o nome de exibição de um caso de teste."""
+    return str(case.get("name") or f"caso {index + 1}")
+
+
+def run_test_cases(executor, code, test_cases, limits=None, stop_on_failure=True, compile_check=None):
+    """
+    Executa o código do usuário contra cada caso de teste.
+
+    Args:
+        executor: O backend de execução (veja `execution_backend`). Cada caso é
+                  uma única chamada a `execute_submission`: a verificação
+                  "check" enxerga o escopo do código do usuário e `output`.
+        code (str): O código do usuário.
+        test_cases (list): Os casos de teste do exercício.
+        limits (ExecutionLimits, optional): Os limites de cada execução.
+        stop_on_failure (bool): Se True, para no primeiro caso que falhar.
+        compile_check (callable, optional): Recebe `(índice, fonte)` e retorna o
+            código a executar para a verificação "check" do caso (ex: um objeto
+            de código em cache). Padrão: a própria fonte.
+
+    Returns:
+        dict: `success` (todos os casos executados passaram e nenhum foi pulado),
+              `passed` e `total` (contagens), `cases` (lista com `name`, `status`
+              ("passed", "failed" ou "skipped"), `details`, `output` e `seconds`
+              de cada caso) e `output` (saída do último caso executado).
+    """
+    cases = []
+    last_output = ""
+    failed = False
+    for index, case in enumerate(test_cases):
+        name = case_name(case, index)
+        if failed and stop_on_failure:
+            cases.append({"name": name, "status": "skipped", "details": "", "output": "", "seconds": 0.0})
+            continue
+
+        started = time.perf_counter()
+        details = ""
+        check_code = None
+        if case.get("check"):
+            check_code = compile_check(index, case["check"]) if compile_check else case["check"]
+        # O código do usuário e a verificação "check" são executados juntos, no mesmo escopo
+        result = executor.execute_submission(code, check_code, limits=limits, stdin=case.get("stdin"))
+        output = result["stdout"]
+        passed = result["returncode"] == 0
+        if not passed:
+            details = result["stderr"] or "Erro durante a execução do código."
+        elif "expected_output" in case:
+            try:
+                passed = output_matches(output, str(case["expected_output"]), case.get("match", "strip"))
+            except ValueError as e:
+                passed, details = False, str(e)
+            else:
+                if not passed:
+                    details = f"Saída esperada: {case['expected_output']!r}; obtida: {output!r}."
+        check_result = result.get("test")
+        if passed and check_result is not None:
+            passed = check_result["returncode"] == 0
+            if not passed:
+                # "stderr" já começa com o tipo do erro (ex: "AssertionError: ...")
+                details = check_result["stderr"] or "Erro durante a verificação do caso."
+
+        cases.append({
+            "name": name,
+            "status": "passed" if passed else "failed",
+            "details": details,
+            "output": output,
+            "seconds": time.perf_counter() - started,
+        })
+        last_output = output
+        failed = failed or not passed
+
+    passed_count = sum(1 for case in cases if case["status"] == "passed")
+    return {
+        "success": passed_count == len(cases),
+        "passed": passed_count,
+        "total": len(cases),
+        "cases": cases,
+        "output": last_output,
+    }
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de instrumentação das requisições: tempos por rota e por fase.
+
+Para descobrir de onde vem a latência de uma rota, cada requisição tem seu
+tempo total dividido em fases:
+
+*   `data-load`: carregamento dos arquivos de dados (JSON) pelos managers;
+*   `execute`: execução de código pelo backend de execução;
+*   `render`: renderização de templates;
+*   `other`: o restante (roteamento, serialização, lógica das rotas).
+
+Os componentes marcam suas fases com `phase(nome)` (ou com o decorador
+`timed(nome)`), que não tem efeito fora de uma requisição instrumentada. Os
+tempos de cada rota e fase são acumulados em histogramas (`Histogram`), e
+cada resposta recebe o cabeçalho `Server-Timing`, exibido pelas ferramentas
+de desenvolvedor do navegador.
+
+Opcionalmente, uma fração das requisições (`PROFILE_SAMPLE_RATE`) é
+executada sob o `cProfile`; os perfis mais recentes ficam disponíveis no
+relatório (`Instrumentation.report` / `format_report`), sem depender de
+serviços externos.
+
+As fases são registradas na thread que atende a requisição: trabalho feito
+em outras threads (ex: a execução da rota de streaming ou da verificação em
+lote) não é atribuído à requisição.
+"""
+import bisect
+import cProfile
+from collections import deque
+from contextlib import contextmanager
+import functools
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Fases em que o tempo de uma requisição é dividido.
+PHASES = ("data-load", "execute", "render")
+
+# Limites superiores (em milissegundos) dos intervalos dos histogramas.
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Número de perfis (cProfile) mantidos para o relatório.
+DEFAULT_MAX_PROFILES = 20
+
+# Número de funções listadas em cada perfil.
+PROFILE_TOP_FUNCTIONS = 25
+
+# Tempos da requisição ativa na thread atual (atributo "timings").
+_current = threading.local()
+
+
+class Histogram:
+    """
+    Histograma de durações com intervalos fixos.
+
+    Attributes:
+        buckets (tuple): Limites superiores dos intervalos, em milissegundos.
+        count (int): Número de observações.
+        total (float): Soma das observações, em milissegundos.
+        max (float): Maior observação, em milissegundos.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1) # O último intervalo não tem limite superior
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms):
+        """Registra uma duração, em milissegundos."""
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, fraction):
+        """
+        Estima um percentil a partir dos intervalos.
+
+        Args:
+            fraction (float): O percentil, entre 0 e 1 (ex: 0.95).
+
+        Returns:
+            float: O limite superior do intervalo que contém o percentil (ou a
+                   maior observação, se ele estiver no último intervalo).
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        """
+        Retorna o estado do histograma.
+
+        Returns:
+            dict: `count`, `sum_ms`, `mean_ms`, `max_ms`, `p50_ms`, `p95_ms`,
+                  `p99_ms` e `buckets` (contagem acumulada por limite, com "+Inf").
+        """
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum_ms": self.total,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+
+class RequestTimings:
+    """Tempos das fases de uma requisição."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self._depth = 0
+
+    def add(self, name, seconds):
+        """Soma `seconds` à fase `name`."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self):
+        """Retorna o tempo total decorrido desde o início da requisição, em segundos."""
+        return time.perf_counter() - self.started
+
+
+@contextmanager
+def phase(name):
+    """
+    Atribui o tempo do bloco à fase `name` da requisição ativa na thread atual.
+
+    Fases aninhadas (ex: um template que carrega dados) são contadas apenas
+    na mais externa, para que a soma das fases não exceda o tempo total. Sem
+    requisição ativa, o bloco é executado sem medição.
+    """
+    timings = getattr(_current, "timings", None)
+    if timings is None or timings._depth:
+        yield
+        return
+    timings._depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings._depth -= 1
+        timings.add(name, time.perf_counter() - started)
+
+
+def timed(name):
+    """Decorador que atribui o tempo de cada chamada da função à fase `name` (veja `phase`)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Instrumentation:
+    """
+    Coleta os tempos das requisições de uma aplicação Flask.
+
+    Configuração (em `app.config`):
+        INSTRUMENTATION_ENABLED (bool): Ativa a coleta e o cabeçalho `Server-Timing`.
+        PROFILE_SAMPLE_RATE (float): Fração das requisições (entre 0 e 1)
+            executadas sob o `cProfile`. 0 desativa o perfilamento.
+    """
+
+    def __init__(self, app=None, max_profiles=DEFAULT_MAX_PROFILES):
+        """
+        Inicializa a coleta, registrando-a em `app` se fornecida.
+
+        Args:
+            app (Flask, optional): A aplicação a instrumentar.
+            max_profiles (int): Número de perfis mantidos para o relatório.
+        """
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.profiles = deque(maxlen=max_profiles)
+        self._profile_lock = threading.Lock()
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Registra os ganchos de requisição e de renderização em `app`."""
+        from flask import before_render_template, template_rendered
+
+        self.app = app
+        app.config.setdefault("INSTRUMENTATION_ENABLED", True)
+        app.config.setdefault("PROFILE_SAMPLE_RATE", 0.0)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.extensions["instrumentation"] = self
+
+    # --- Ganchos ---
+
+    def _before_request(self):
+        _current.timings = None
+        _current.render_started = None
+        _current.profiler = None
+        if not self.app.config.get("INSTRUMENTATION_ENABLED", True):
+            return
+        _current.timings = RequestTimings()
+        sample_rate = self.app.config.get("PROFILE_SAMPLE_RATE") or 0.0
+        if sample_rate > 0 and random.random() < sample_rate and self._profile_lock.acquire(blocking=False):
+            # Apenas um perfil por vez: o cProfile não permite perfis simultâneos
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError: # Outra ferramenta de perfilamento já está ativa
+                self._profile_lock.release()
+            else:
+                _current.profiler = profiler
+
+    def _after_request(self, response):
+        from flask import request
+
+        timings = getattr(_current, "timings", None)
+        if timings is None:
+            return response
+        total = timings.elapsed()
+        profiler = getattr(_current, "profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            _current.profiler = None
+            self._profile_lock.release()
+            self._store_profile(profiler, request, total)
+
+        endpoint = request.endpoint or "<não encontrado>"
+        measured = sum(timings.phases.values())
+        durations = dict(timings.phases, other=max(0.0, total - measured), total=total)
+        with self._lock:
+            for name, seconds in durations.items():
+                histogram = self._histograms.get((endpoint, name))
+                if histogram is None:
+                    histogram = self._histograms[(endpoint, name)] = Histogram()
+                histogram.observe(seconds * 1000)
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items())
+        return response
+
+    def _teardown_request(self, exc):
+        profiler = getattr(_current, "profiler", None)
+        if profiler is not None: # A resposta não chegou a ser montada
+            profiler.disable()
+            self._profile_lock.release()
+        _current.timings = None
+        _current.profiler = None
+
+    def _before_render(self, sender, template, context, **extra):
+        timings = getattr(_current, "timings", None)
+        if timings is not None and not timings._depth:
+            timings._depth += 1
+            _current.render_started = time.perf_counter()
+
+    def _after_render(self, sender, template, context, **extra):
+        started = getattr(_current, "render_started", None)
+        timings = getattr(_current, "timings", None)
+        if started is not None and timings is not None:
+            timings._depth -= 1
+            timings.add("render", time.perf_counter() - started)
+            _current.render_started = None
+
+    def _store_profile(self, profiler, request, total):
+        """Guarda o resumo de um perfil (funções com maior tempo acumulado)."""
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        self.profiles.append({
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "path": request.path,
+            "total_ms": total * 1000,
+            "stats": stream.getvalue(),
+        })
+
+    # --- Relatório ---
+
+    def histograms(self):
+        """
+        Retorna os histogramas por rota e fase.
+
+        Returns:
+            dict: `{rota: {fase: Histogram.snapshot()}}`.
+        """
+        with self._lock:
+            routes = {}
+            for (endpoint, name), histogram in sorted(self._histograms.items()):
+                routes.setdefault(endpoint, {})[name] = histogram.snapshot()
+            return routes
+
+    def report(self):
+        """
+        Retorna o relatório completo.
+
+        Returns:
+            dict: `routes` (veja `histograms`) e `profiles` (perfis mais recentes).
+        """
+        return {"routes": self.histograms(), "profiles": list(self.profiles)}
+
+    def format_report(self):
+        """
+        Retorna o relatório como texto, com uma tabela de tempos por rota e fase
+        seguida dos perfis mais recentes.
+
+        Returns:
+            str: O relatório.
+        """
+        lines = [f"{'rota':<40} {'fase':<10} {'n':>7} {'média':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'máx':>9}"]
+        for endpoint, phases in self.histograms().items():
+            for name, data in phases.items():
+                lines.append(f"{endpoint:<40} {name:<10} {data['count']:>7} {data['mean_ms']:>9.2f} "
+                             f"{data['p50_ms']:>9.2f} {data['p95_ms']:>9.2f} {data['p99_ms']:>9.2f} {data['max_ms']:>9.2f}")
+        for profile in self.profiles:
+            lines.append("")
+            lines.append(f"--- Perfil: {profile['method']} {profile['path']} ({profile['total_ms']:.2f} ms) ---")
+            lines.append(profile["stats"])
+        return "\n".join(lines)
+
+    def reset(self):
+        """Descarta os histogramas e perfis coletados."""
+        with self._lock:
+            self._histograms.clear()
+            self.profiles.clear()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o gerenciador de trabalhos (jobs) de execução assíncrona.
+
+Uma execução síncrona ocupa a thread que atende a requisição HTTP durante
+toda a sua duração. Com `JobManager`, a requisição apenas registra o
+trabalho e retorna seu ID; a execução acontece em um pool de threads
+próprio, e o navegador consulta o andamento (a saída produzida até o
+momento e, ao final, o resultado) ou cancela o trabalho.
+
+Cada trabalho (`Job`) recebe um `threading.Event` de cancelamento, repassado
+ao backend de execução (veja `execution_backend`), que mata o trabalhador
+correspondente. Trabalhos concluídos são descartados após `ttl` segundos.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Número padrão de threads que executam os trabalhos.
+DEFAULT_MAX_THREADS = 32
+
+# Número máximo padrão de trabalhos aguardando ou em execução.
+DEFAULT_MAX_PENDING = 256
+
+# Tempo, em segundos, que um trabalho concluído permanece disponível para consulta.
+DEFAULT_TTL_SECONDS = 300.0
+
+# Estados de um trabalho.
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Estados finais: o trabalho não muda mais.
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class TooManyJobs(RuntimeError):
+    """Levantada quando já existem `max_pending` trabalhos aguardando ou em execução."""
+
+
+class Job:
+    """
+    Um trabalho de execução.
+
+    Attributes:
+        id (str): O identificador do trabalho.
+        status (str): "queued", "running", "done", "failed" ou "cancelled".
+        result (dict | None): O resultado, quando concluído.
+        cancel_event (threading.Event): Sinalizado quando o cancelamento é pedido.
+        created (float): Momento da criação (`time.monotonic()`).
+        finished (float | None): Momento da conclusão.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.result = None
+        self.cancel_event = threading.Event()
+        self.created = time.monotonic()
+        self.finished = None
+        self._output = []
+        self._lock = threading.Lock()
+
+    def append_output(self, name, text):
+        """Acrescenta um trecho de saída (`name` é "stdout" ou "stderr"); compatível com `on_output`."""
+        with self._lock:
+            self._output.append((name, text))
+
+    def output_since(self, offset=0):
+        """
+        Retorna os trechos de saída produzidos a partir de `offset`.
+
+        Args:
+            offset (int): O número de trechos já recebidos pelo cliente.
+
+        Returns:
+            tuple: A lista de trechos `[nome, texto]` e o novo deslocamento.
+        """
+        with self._lock:
+            chunks = self._output[offset:]
+            return [list(chunk) for chunk in chunks], offset + len(chunks)
+
+    def to_dict(self, offset=0):
+        """
+        Retorna o estado do trabalho, no formato das respostas da API.
+
+        Args:
+            offset (int): Veja `output_since`.
+
+        Returns:
+            dict: `job_id`, `status`, `chunks` (saída a partir de `offset`),
+                  `offset` e, se concluído, `result`.
+        """
+        chunks, next_offset = self.output_since(offset)
+        data = {"job_id": self.id, "status": self.status, "chunks": chunks, "offset": next_offset}
+        if self.status in FINISHED_STATES:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """
+    Executa trabalhos em um pool de threads e os mantém disponíveis para consulta.
+
+    Attributes:
+        max_pending (int): Número máximo de trabalhos aguardando ou em execução.
+        ttl (float): Segundos que um trabalho concluído permanece disponível.
+    """
+
+    def __init__(self, max_threads=DEFAULT_MAX_THREADS, max_pending=DEFAULT_MAX_PENDING, ttl=DEFAULT_TTL_SECONDS):
+        """
+        Inicializa o gerenciador; as threads são criadas sob demanda.
+
+        Args:
+            max_threads (int): Número de threads que executam os trabalhos.
+            max_pending (int): Número máximo de trabalhos aguardando ou em execução.
+            ttl (float): Segundos que um trabalho concluído permanece disponível.
+        """
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.cancelled = 0
+
+    def submit(self, func):
+        """
+        Registra um trabalho e agenda sua execução.
+
+        Args:
+            func (callable): Chamada com o `Job` (para repassar `job.append_output`
+                e `job.cancel_event` ao backend); retorna o dicionário de resultado.
+
+        Returns:
+            Job: O trabalho criado.
+
+        Raises:
+            TooManyJobs: Se já houver `max_pending` trabalhos não concluídos.
+        """
+        job = Job()
+        with self._lock:
+            self._prune()
+            pending = sum(1 for other in self._jobs.values() if other.status not in FINISHED_STATES)
+            if pending >= self.max_pending:
+                raise TooManyJobs(f"Há {pending} trabalhos em andamento; tente novamente em instantes.")
+            self._jobs[job.id] = job
+            self.submitted += 1
+        self._pool.submit(self._run, job, func)
+        logger.debug("Trabalho %s registrado.", job.id)
+        return job
+
+    def _run(self, job, func):
+        """Executa o trabalho na thread do pool, registrando o estado final."""
+        with self._lock:
+            if job.status == CANCELLED: # Cancelado antes de começar
+                return
+            job.status = RUNNING
+        try:
+            result = func(job)
+            status = CANCELLED if job.cancel_event.is_set() else DONE
+        except Exception as e:
+            logger.error(f"Erro inesperado no trabalho {job.id}: {e}", exc_info=True)
+            result, status = {"success": False, "output": "", "details": f"Erro interno do servidor: {str(e)}"}, FAILED
+        with self._lock:
+            job.result = result
+            job.status = status
+            job.finished = time.monotonic()
+
+    def get(self, job_id):
+        """Retorna o trabalho `job_id`, ou None se ele não existir (ou já tiver sido descartado)."""
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Pede o cancelamento de um trabalho.
+
+        Um trabalho ainda na fila é cancelado imediatamente; um trabalho em
+        execução passa a "cancelled" assim que o backend interromper a execução.
+
+        Returns:
+            Job | None: O trabalho, ou None se ele não existir.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return job
+            job.cancel_event.set()
+            self.cancelled += 1
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished = time.monotonic()
+        logger.debug("Cancelamento do trabalho %s pedido.", job_id)
+        return job
+
+    def _prune(self):
+        """Descarta os trabalhos concluídos há mais de `ttl` segundos (chamado com o lock adquirido)."""
+        limit = time.monotonic() - self.ttl
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished is not None and job.finished < limit]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        """
+        Retorna os contadores do gerenciador.
+
+        Returns:
+            dict: Trabalhos por estado (entre os mantidos), registrados e cancelados.
+        """
+        with self._lock:
+            by_status = dict.fromkeys((QUEUED, RUNNING) + FINISHED_STATES, 0)
+            for job in self._jobs.values():
+                by_status[job.status] += 1
+            return {"jobs": by_status, "submitted": self.submitted, "cancelled": self.cancelled}
+
+    def shutdown(self):
+        """Cancela os trabalhos não concluídos e encerra o pool de threads."""
+        with self._lock:
+            pending = [job.id for job in self._jobs.values() if job.status not in FINISHED_STATES]
+        for job_id in pending:
+            self.cancel(job_id)
+        self._pool.shutdown(wait=False, cancel_futures=True)
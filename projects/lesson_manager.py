@@ -9,33 +9,99 @@ import json
 import logging
 from pathlib import Path
 
+from .content_cache import content_cache, file_signature
+
 logger = logging.getLogger(__name__)
 # Assume que este manager está em Curso-Interartivo-Python/projects/
 # DATA_DIR apontará para Curso-Interartivo-Python/projects/data/
 DATA_DIR = Path(__file__).resolve().parent / 'data'
 
+class LessonIndex:
+    """
+    Índices de acesso direto às lições de um arquivo.
+
+    Attributes:
+        items (list): As lições indexadas, na ordem do arquivo.
+        by_id (dict): ID da lição (str) -> lição. Em IDs repetidos, prevalece a primeira ocorrência.
+        position (dict): ID da lição (str) -> posição em `items`.
+    """
+    def __init__(self, lessons):
+        """
+        Constrói os índices.
+
+        Args:
+            lessons (list): A lista de lições carregada do arquivo.
+        """
+        self.items = [lesson for lesson in lessons if isinstance(lesson, dict)]
+        self.by_id = {}
+        self.position = {}
+        for position, lesson in enumerate(self.items):
+            lesson_id = str(lesson.get('id'))
+            if lesson_id not in self.by_id:
+                self.by_id[lesson_id] = lesson
+                self.position[lesson_id] = position
+
+    def get(self, lesson_id):
+        """Retorna a lição com o ID fornecido, ou None."""
+        return self.by_id.get(str(lesson_id))
+
+    def next_lesson(self, lesson_id):
+        """
+        Retorna a lição seguinte à lição fornecida, na ordem do arquivo.
+
+        Args:
+            lesson_id (str): O ID da lição atual.
+
+        Returns:
+            dict | None: A próxima lição, ou None se a lição for a última ou não existir.
+        """
+        position = self.position.get(str(lesson_id))
+        if position is None or position + 1 >= len(self.items):
+            return None
+        return self.items[position + 1]
+
+
 class LessonManager:
     """
     Gerencia o carregamento de dados de lições a partir de arquivos JSON.
 
     As lições são carregadas sob demanda de arquivos especificados, geralmente
-    referenciados nos dados de um curso.
+    referenciados nos dados de um curso, e mantidas em um `ContentCache`
+    enquanto o arquivo não for alterado.
+
+    Attributes:
+        cache (ContentCache): O cache de conteúdo usado nos carregamentos.
+        data_dir (Path | None): O diretório de dados (None = o `DATA_DIR` do módulo).
     """
-    def __init__(self):
+    def __init__(self, cache=None, data_dir=None):
         """
         Inicializa o LessonManager.
 
         Atualmente, nenhuma ação de carregamento de dados é realizada
         durante a inicialização. As lições são carregadas sob demanda.
+
+        Args:
+            cache (ContentCache, optional): O cache de conteúdo a utilizar.
+                Padrão: a instância compartilhada `content_cache`.
+            data_dir (str | Path, optional): O diretório de dados em que os caminhos
+                relativos são resolvidos. Padrão: o `DATA_DIR` do módulo.
         """
-        pass # Nenhuma ação de carregamento na inicialização
+        self.cache = cache if cache is not None else content_cache
+        self.data_dir = Path(data_dir) if data_dir is not None else None
+
+    def _resolve(self, relative_path):
+        """Retorna o caminho absoluto de um arquivo de dados a partir do caminho relativo."""
+        # O DATA_DIR do módulo é lido a cada chamada, para que possa ser substituído (ex: em testes)
+        return (self.data_dir if self.data_dir is not None else DATA_DIR) / relative_path
 
     def load_lessons_from_file(self, lessons_file_path_relative: str) -> list:
         """
         Carrega lições de um arquivo JSON específico, relativo à pasta 'data' do projeto.
 
         O caminho fornecido é combinado com o `DATA_DIR` do módulo para formar
-        o caminho absoluto para o arquivo de lições.
+        o caminho absoluto para o arquivo de lições. O conteúdo decodificado
+        é reutilizado do cache enquanto o arquivo não mudar; a lista retornada
+        é compartilhada e não deve ser modificada.
 
         Args:
             lessons_file_path_relative (str): O caminho relativo para o arquivo JSON
@@ -54,28 +120,81 @@ class LessonManager:
 
         # Constrói o caminho completo para o arquivo de lições
         # lessons_file_path_relative é algo como "basic/lessons.json"
-        full_file_path = DATA_DIR / lessons_file_path_relative
+        full_file_path = self._resolve(lessons_file_path_relative)
         
-        logger.debug(f"Tentando carregar lições de: {full_file_path}")
+        logger.debug("Tentando carregar lições de: %s", full_file_path)
         
-        if full_file_path.exists() and full_file_path.is_file():
-            try:
-                with open(full_file_path, 'r', encoding='utf-8') as f:
-                    lessons_data = json.load(f)
-                    if not isinstance(lessons_data, list):
-                        logger.error(f"Formato inválido em {full_file_path}. Esperava uma lista, obteve {type(lessons_data)}. Retornando lista vazia.")
-                        return []
-                    logger.info(f"Sucesso ao carregar {len(lessons_data)} lições de {full_file_path}")
-                    return lessons_data
-            except json.JSONDecodeError as e:
-                logger.error(f"Erro de decodificação JSON ao carregar lições de {full_file_path}: {e}", exc_info=True)
-            except IOError as e: # Captura erros de I/O mais genéricos
-                logger.error(f"Erro de I/O ao carregar lições de {full_file_path}: {e}", exc_info=True)
-            except Exception as e: # Captura qualquer outra exceção inesperada
-                logger.error(f"Erro inesperado ao carregar lições de {full_file_path}: {e}", exc_info=True)
-        else:
+        if full_file_path.is_file():
+            # O cache só relê o arquivo se sua data de modificação ou tamanho mudarem.
+            return self.cache.get(full_file_path, self._read_lessons_file)
+        logger.warning(f"Arquivo de lições não encontrado ou não é um arquivo: {full_file_path}")
+        return [] # Retorna lista vazia se o arquivo não existe
+
+    def get_file_version(self, lessons_file_path_relative: str):
+        """
+        Retorna a versão atual de um arquivo de lições.
+
+        Args:
+            lessons_file_path_relative (str): O caminho relativo para o arquivo JSON
+                de lições, a partir do diretório 'data'.
+
+        Returns:
+            tuple | None: A assinatura do arquivo (veja `file_signature`), ou None
+                          se o arquivo não puder ser acessado.
+        """
+        if not lessons_file_path_relative:
+            return None
+        return file_signature(self._resolve(lessons_file_path_relative))
+
+    def get_lesson_index(self, lessons_file_path_relative: str) -> LessonIndex:
+        """
+        Retorna os índices das lições de um arquivo.
+
+        Os índices são construídos uma vez por versão do arquivo e mantidos no
+        cache de conteúdo junto com a lista de lições.
+
+        Args:
+            lessons_file_path_relative (str): O caminho relativo para o arquivo JSON
+                de lições, a partir do diretório 'data'.
+
+        Returns:
+            LessonIndex: Os índices. Vazios se o arquivo não existir ou for inválido.
+        """
+        if not lessons_file_path_relative:
+            logger.warning("get_lesson_index chamado com caminho relativo vazio.")
+            return LessonIndex([])
+
+        full_file_path = self._resolve(lessons_file_path_relative)
+        if not full_file_path.is_file():
             logger.warning(f"Arquivo de lições não encontrado ou não é um arquivo: {full_file_path}")
-            
-        return [] # Retorna lista vazia se o arquivo não existe ou em caso de erro
+            return LessonIndex([])
+        return self.cache.get_derived(full_file_path, "index", self._read_lessons_file, LessonIndex)
+
+    def _read_lessons_file(self, full_file_path: Path) -> list:
+        """
+        Lê e decodifica um arquivo JSON de lições, sem passar pelo cache.
+
+        Args:
+            full_file_path (Path): O caminho absoluto do arquivo.
+
+        Returns:
+            list: A lista de lições, ou uma lista vazia em caso de erro de
+                  formato, decodificação JSON ou I/O.
+        """
+        try:
+            with open(full_file_path, 'r', encoding='utf-8') as f:
+                lessons_data = json.load(f)
+                if not isinstance(lessons_data, list):
+                    logger.error(f"Formato inválido em {full_file_path}. Esperava uma lista, obteve {type(lessons_data)}. Retornando lista vazia.")
+                    return []
+                logger.info(f"Sucesso ao carregar {len(lessons_data)} lições de {full_file_path}")
+                return lessons_data
+        except json.JSONDecodeError as e:
+            logger.error(f"Erro de decodificação JSON ao carregar lições de {full_file_path}: {e}", exc_info=True)
+        except IOError as e: # Captura erros de I/O mais genéricos
+            logger.error(f"Erro de I/O ao carregar lições de {full_file_path}: {e}", exc_info=True)
+        except Exception as e: # Captura qualquer outra exceção inesperada
+            logger.error(f"Erro inesperado ao carregar lições de {full_file_path}: {e}", exc_info=True)
+        return [] # Retorna lista vazia em caso de erro
 
     
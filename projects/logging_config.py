@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com a configuração de logging da aplicação.
+
+`configure_logging` substitui o `logging.basicConfig` usado originalmente e
+reduz o custo do logging no caminho das requisições:
+
+*   **Formatação assíncrona:** a thread que registra o evento apenas o coloca
+    em uma fila (`DeferredQueueHandler`); a formatação (data, JSON) e a
+    escrita no stream acontecem em uma thread separada (`QueueListener`).
+*   **Amostragem de eventos DEBUG:** com `debug_sample_rate` menor que 1, só
+    essa fração dos eventos de DEBUG é registrada (`SamplingFilter`), o que
+    permite manter o nível DEBUG em produção sem registrar cada evento.
+*   **Formato estruturado:** com `log_format="json"`, cada evento é uma linha
+    JSON (`JsonFormatter`), com os campos extras passados em `extra=`.
+
+Os módulos devem usar formatação preguiçosa nas mensagens dos caminhos
+frequentes (`logger.debug("... %s", valor)` em vez de f-strings), para que
+a mensagem só seja montada se o evento for de fato registrado.
+"""
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+# Formato do modo texto (o mesmo usado originalmente pela aplicação).
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Atributos padrão de `logging.LogRecord`, que não são repetidos como campos extras no JSON.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+# Listener da fila de logging ativo (veja `configure_logging`).
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formata cada evento como uma linha JSON.
+
+    Campos: `time` (ISO 8601, UTC), `level`, `logger`, `message`, `thread`,
+    os campos extras do evento e, se houver, `exception` (traceback formatado).
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Registra apenas uma fração dos eventos de nível DEBUG (ou inferior).
+
+    Eventos de nível INFO ou superior passam sempre.
+    """
+
+    def __init__(self, rate=1.0):
+        """
+        Args:
+            rate (float): Fração dos eventos de DEBUG registrados, entre 0 e 1.
+        """
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    `QueueHandler` que adia a formatação para a thread do listener.
+
+    O `QueueHandler` padrão formata o evento (inclusive a data) antes de
+    enfileirá-lo, na thread que o registrou. Aqui apenas a mensagem é montada
+    (para que argumentos mutáveis sejam capturados no momento do evento), e o
+    restante da formatação fica a cargo dos handlers do listener.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(level="INFO", log_format="text", async_handler=True, debug_sample_rate=1.0,
+                      stream=None, force=False):
+    """
+    Configura o logger raiz da aplicação.
+
+    Como `logging.basicConfig`, não faz nada se o logger raiz já tiver handlers
+    configurados por outro componente (ex: o pytest), a menos que `force` seja True.
+
+    Args:
+        level (str | int): O nível mínimo dos eventos (ex: "INFO", "DEBUG").
+        log_format (str): "text" (formato original) ou "json" (uma linha JSON por evento).
+        async_handler (bool): Se True, os eventos são formatados e escritos em uma
+                              thread separada (veja `DeferredQueueHandler`).
+        debug_sample_rate (float): Fração dos eventos de DEBUG registrados.
+        stream (file, optional): O destino dos eventos. Padrão: `sys.stderr`.
+        force (bool): Remove os handlers existentes do logger raiz antes de configurar.
+
+    Returns:
+        logging.handlers.QueueListener | None: O listener da fila, se `async_handler`
+            for True e a configuração tiver sido aplicada.
+
+    Raises:
+        ValueError: Se `log_format` não for "text" nem "json".
+    """
+    global _listener
+    if log_format not in ("text", "json"):
+        raise ValueError(f"Formato de log desconhecido: '{log_format}'. Use 'text' ou 'json'.")
+    root = logging.getLogger()
+    if root.handlers and not force:
+        return None
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+    output_handler = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output_handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+    if async_handler:
+        log_queue = queue.SimpleQueue()
+        root_handler = DeferredQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, output_handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        root_handler = output_handler
+    if debug_sample_rate < 1:
+        root_handler.addFilter(SamplingFilter(debug_sample_rate))
+    root.addHandler(root_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    return _listener
+
+
+def stop_logging():
+    """Encerra o listener da fila, escrevendo os eventos pendentes."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_in_child():
+    """Recria a thread do listener em um processo filho (threads não sobrevivem ao `fork`)."""
+    if _listener is not None:
+        _listener._thread = None
+        _listener.start()
+
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"): # Indisponível no Windows, que não usa fork
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o registro de métricas da aplicação, no formato de texto do Prometheus.
+
+As métricas ficam em memória, no próprio processo, e são expostas pela rota
+`/metrics` de `app.py` no formato de exposição em texto do Prometheus
+(versão 0.0.4), que pode ser coletado por um agente local sem nenhuma
+dependência de rede ou biblioteca externa.
+
+Há dois tipos de fonte:
+
+*   Contadores (`Counter`), incrementados pelo código no momento do evento
+    (ex: cada execução de código, rotulada pelo tipo de erro).
+*   Coletores, funções chamadas a cada coleta que leem os contadores já
+    mantidos pelos componentes (ex: `content_cache.stats()`, `stats()` do
+    backend de execução) e os convertem em amostras (`MetricFamily`).
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Tipo de conteúdo do formato de exposição em texto.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label_value(value):
+    """Escapa um valor de rótulo conforme o formato de texto."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    """Formata o valor de uma amostra (inteiros sem casa decimal; infinitos como +Inf/-Inf)."""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value))
+
+
+class MetricFamily:
+    """
+    Um conjunto de amostras de uma métrica, pronto para exposição.
+
+    Attributes:
+        name (str): O nome da métrica (ex: "curso_executions_total").
+        type (str): "counter", "gauge" ou "histogram".
+        help (str): A descrição da métrica.
+        samples (list): Tuplas (sufixo do nome, rótulos (dict), valor).
+    """
+
+    def __init__(self, name, metric_type, help_text):
+        self.name = name
+        self.type = metric_type
+        self.help = help_text
+        self.samples = []
+
+    def add(self, value, suffix="", **labels):
+        """Acrescenta uma amostra com os rótulos fornecidos."""
+        self.samples.append((suffix, labels, value))
+        return self
+
+    def render(self):
+        """Retorna as linhas da métrica no formato de texto."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples:
+            label_text = ",".join(f'{key}="{_escape_label_value(val)}"' for key, val in labels.items())
+            name = self.name + suffix
+            lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text else f"{name} {_format_value(value)}")
+        return lines
+
+
+class Counter:
+    """
+    Contador monotônico com rótulos.
+
+    Attributes:
+        name (str): O nome da métrica.
+        help (str): A descrição da métrica.
+        labelnames (tuple): Os nomes dos rótulos, na ordem em que aparecem.
+    """
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """
+        Incrementa o contador.
+
+        Args:
+            amount (int | float): O incremento (não negativo).
+            **labels: Os valores de todos os rótulos de `labelnames`.
+
+        Raises:
+            ValueError: Se o incremento for negativo ou os rótulos não corresponderem a `labelnames`.
+        """
+        if amount < 0:
+            raise ValueError("Contadores só podem ser incrementados.")
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Rótulos esperados para '{self.name}': {self.labelnames}.")
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Retorna o valor atual para os rótulos fornecidos (0 se nunca incrementado)."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def collect(self):
+        """Retorna o `MetricFamily` com os valores atuais."""
+        family = MetricFamily(self.name, "counter", self.help)
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            family.add(value, **dict(zip(self.labelnames, key)))
+        return family
+
+
+class MetricsRegistry:
+    """Registro de contadores e coletores, exposto com `render`."""
+
+    def __init__(self):
+        self._counters = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text, labelnames=()):
+        """
+        Retorna o contador `name`, criando-o se necessário.
+
+        Returns:
+            Counter: O contador registrado.
+        """
+        with self._lock:
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = Counter(name, help_text, labelnames)
+            return counter
+
+    def register_collector(self, collector):
+        """
+        Registra uma função chamada a cada coleta.
+
+        Args:
+            collector (callable): Função sem argumentos que retorna uma lista
+                                  (ou iterável) de `MetricFamily`.
+
+        Returns:
+            callable: O próprio coletor (permite o uso como decorador).
+        """
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+
+    def unregister_collector(self, collector):
+        """Remove um coletor registrado (nada acontece se ele não estiver registrado)."""
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def collect(self):
+        """
+        Coleta todas as métricas.
+
+        Um coletor que falha é registrado no log e ignorado, para que uma fonte
+        com problema não impeça a exposição das demais.
+
+        Returns:
+            list: Os `MetricFamily` coletados.
+        """
+        with self._lock:
+            counters = list(self._counters.values())
+            collectors = list(self._collectors)
+        families = [counter.collect() for counter in counters]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.error(f"Erro no coletor de métricas {collector!r}: {e}", exc_info=True)
+        return families
+
+    def render(self):
+        """
+        Retorna todas as métricas no formato de texto do Prometheus.
+
+        Returns:
+            str: O texto de exposição (terminado por uma quebra de linha).
+        """
+        lines = []
+        for family in self.collect():
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registro compartilhado pela aplicação.
+registry = MetricsRegistry()
+
+# Execuções de código, por backend, função e tipo de erro ("none" se não houve erro).
+EXECUTIONS = registry.counter(
+    "curso_executions_total",
+    "Execuções de código, por backend, função e tipo de erro.",
+    ("backend", "function", "error_type"),
+)
+
+
+def record_execution(backend, function, result):
+    """
+    Contabiliza uma execução em `EXECUTIONS`.
+
+    Args:
+        backend (str): O nome do backend ("inline" ou "process").
+        function (str): A função executada (ex: "execute_code").
+        result (dict): O dicionário de resultado da execução.
+    """
+    EXECUTIONS.inc(backend=backend, function=function, error_type=result.get("error_type") or "none")
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o cache de páginas HTML renderizadas.
+
+As páginas de curso e de lição só mudam quando os arquivos de dados são
+editados, mas cada acesso carregaria os dados e renderizaria o template
+novamente. A classe `PageCache` guarda o HTML já renderizado, indexado pelos
+argumentos da rota, junto com a versão dos dados usada na renderização
+(normalmente as assinaturas dos arquivos envolvidos). Enquanto a versão não
+mudar, o HTML é reutilizado; cada página tem também um ETag, que permite ao
+navegador revalidar sua cópia e receber um 304 sem corpo.
+"""
+from collections import OrderedDict
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Número padrão de páginas mantidas; as menos usadas recentemente são descartadas.
+DEFAULT_MAX_ENTRIES = 512
+
+
+class PageCache:
+    """
+    Cache LRU de páginas renderizadas, invalidado pela versão dos dados.
+
+    Attributes:
+        max_entries (int): Número máximo de páginas mantidas.
+        hits (int): Acessos atendidos pelo cache.
+        misses (int): Acessos que precisaram renderizar a página.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Inicializa um cache vazio.
+
+        Args:
+            max_entries (int): Número máximo de páginas mantidas.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, version, render):
+        """
+        Retorna o HTML e o ETag da página, renderizando-a se necessário.
+
+        Args:
+            key (hashable): Identifica a página (ex: ("lesson", course_id, lesson_id)).
+            version (hashable): A versão atual dos dados da página. Uma versão
+                diferente da armazenada descarta a página em cache.
+            render (callable): Função sem argumentos que renderiza a página e
+                retorna o HTML. Exceções (ex: `abort(404)`) são propagadas e
+                nada é armazenado.
+
+        Returns:
+            tuple: O par (html, etag).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+
+        html = render()
+        etag = hashlib.sha1(html.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._entries[key] = (version, html, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html, etag
+
+    def invalidate(self, key=None):
+        """
+        Remove páginas do cache.
+
+        Args:
+            key (hashable, optional): A página a remover. Se None, todo o cache é limpo.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: Número de páginas, acertos e faltas.
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com a verificação prévia (preflight) do código submetido.
+
+Boa parte das submissões de iniciantes falha com `SyntaxError`, e cada uma
+delas passaria por todo o caminho de execução (despacho para um trabalhador,
+preparação da captura de saída) apenas para reportar o erro. A classe
+`PreflightChecker` compila o código no próprio processo do servidor e
+percorre a árvore sintática (AST) procurando importações e chamadas
+proibidas para o nível do curso. Se o código for recusado, o resultado é
+retornado no mesmo formato de `code_executor.execute_code`, sem executar
+nada.
+
+As regras são definidas por nível de curso (`DEFAULT_RULES`, configurável
+em `app.config['PREFLIGHT_RULES']`): as regras de "default" valem para
+todos os níveis, e as de cada nível são acrescentadas a elas. Os vereditos
+são guardados por hash do código e nível, de modo que uma submissão repetida
+não é analisada novamente.
+
+A verificação não substitui os limites do executor: ela recusa cedo o que
+certamente falharia (ou não deveria ser executado), mas o código aceito
+continua sendo executado isolado, com todos os limites.
+"""
+import ast
+from collections import OrderedDict
+import logging
+import threading
+
+from .bytecode_cache import source_hash
+
+logger = logging.getLogger(__name__)
+
+# Número padrão de vereditos mantidos.
+DEFAULT_MAX_ENTRIES = 4096
+
+# Importações e chamadas proibidas, por nível de curso (em minúsculas).
+# "modules" proíbe o módulo e seus submódulos; "calls" compara o nome
+# completo da função chamada (ex: "eval", "os.system").
+DEFAULT_RULES = {
+    "default": {
+        "modules": ["subprocess", "socket", "ctypes", "shutil", "signal", "resource"],
+        "calls": ["__import__", "eval", "exec", "compile", "breakpoint", "os.system", "os.popen"],
+    },
+    "básico": {
+        "modules": ["os", "multiprocessing", "threading", "asyncio"],
+        "calls": [],
+    },
+}
+
+# Nome do "tipo de erro" de um código recusado pelas regras.
+FORBIDDEN_ERROR_TYPE = "ForbiddenConstruct"
+
+
+def _dotted_name(node):
+    """Retorna o nome completo de uma expressão `a.b.c` (ou None se não for um nome simples)."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _module_matches(module, banned):
+    """Indica se `module` é um dos módulos de `banned` ou um submódulo deles."""
+    return any(module == name or module.startswith(name + ".") for name in banned)
+
+
+def find_forbidden(tree, modules=(), calls=()):
+    """
+    Procura importações e chamadas proibidas em uma árvore sintática.
+
+    Args:
+        tree (ast.AST): A árvore do código.
+        modules (iterable): Módulos proibidos.
+        calls (iterable): Nomes completos de funções proibidas.
+
+    Returns:
+        tuple | None: (descrição, linha) da primeira construção proibida, ou None.
+    """
+    modules, calls = tuple(modules), frozenset(calls)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if _module_matches(alias.name, modules):
+                    return f"a importação do módulo '{alias.name}'", node.lineno
+        elif isinstance(node, ast.ImportFrom):
+            if node.level == 0 and node.module and _module_matches(node.module, modules):
+                return f"a importação do módulo '{node.module}'", node.lineno
+        elif isinstance(node, ast.Call):
+            name = _dotted_name(node.func)
+            if name in calls:
+                return f"a chamada a '{name}()'", node.lineno
+    return None
+
+
+class PreflightChecker:
+    """
+    Compila e analisa o código antes da execução, guardando os vereditos.
+
+    Attributes:
+        rules (dict): As regras por nível (veja `DEFAULT_RULES`).
+        max_entries (int): Número máximo de vereditos mantidos.
+        hits (int): Verificações atendidas pelo cache.
+        misses (int): Verificações realizadas.
+        rejected (int): Verificações (incluindo as do cache) que recusaram o código.
+    """
+
+    def __init__(self, rules=None, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Inicializa o verificador.
+
+        Args:
+            rules (dict, optional): As regras por nível. Padrão: `DEFAULT_RULES`.
+            max_entries (int): Número máximo de vereditos mantidos.
+        """
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def rules_for(self, level=None):
+        """
+        Retorna as regras que valem para um nível de curso.
+
+        Args:
+            level (str, optional): O nível do curso (ex: "básico"); maiúsculas são ignoradas.
+
+        Returns:
+            tuple: (módulos proibidos, chamadas proibidas).
+        """
+        modules, calls = [], []
+        for key in ("default", level.lower() if level else None):
+            rule = self.rules.get(key) or {}
+            modules.extend(rule.get("modules", ()))
+            calls.extend(rule.get("calls", ()))
+        return tuple(modules), tuple(calls)
+
+    def check(self, source, level=None):
+        """
+        Verifica um código antes da execução.
+
+        Args:
+            source (str): O código-fonte submetido.
+            level (str, optional): O nível do curso, que seleciona as regras.
+
+        Returns:
+            dict | None: None se o código pode ser executado; caso contrário, o
+                resultado no formato de `code_executor.execute_code` (com
+                `error_type` "SyntaxError", "ValueError" ou "ForbiddenConstruct").
+        """
+        key = (source_hash(source), level.lower() if level else None)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                verdict = self._entries[key]
+                if verdict is not None:
+                    self.rejected += 1
+                    return dict(verdict)
+                return None
+            self.misses += 1
+
+        verdict = self._analyze(source, level)
+        with self._lock:
+            self._entries[key] = verdict
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if verdict is not None:
+                self.rejected += 1
+        return dict(verdict) if verdict is not None else None
+
+    def _analyze(self, source, level):
+        """Compila e analisa o código, retornando o veredito (veja `check`)."""
+        try:
+            # Mesmo nome de arquivo usado por `exec` em uma string, para que a
+            # mensagem seja idêntica à que o executor reportaria
+            tree = compile(source, "<string>", "exec", ast.PyCF_ONLY_AST)
+            # Alguns erros (ex: 'return' fora de função) só surgem na geração do bytecode
+            compile(tree, "<string>", "exec")
+        except (SyntaxError, ValueError) as e:
+            error_type = type(e).__name__
+            return {"returncode": 1, "stdout": "", "stderr": f"{error_type}: {str(e)}", "error_type": error_type}
+        forbidden = find_forbidden(tree, *self.rules_for(level))
+        if forbidden is None:
+            return None
+        description, line = forbidden
+        logger.debug("Preflight - Código recusado: %s (linha %s).", description, line)
+        return {
+            "returncode": 1,
+            "stdout": "",
+            "stderr": f"{FORBIDDEN_ERROR_TYPE}: {description} não é permitida neste curso (linha {line}).",
+            "error_type": FORBIDDEN_ERROR_TYPE,
+        }
+
+    def invalidate(self):
+        """Remove todos os vereditos (ex: após alterar as regras)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Retorna os contadores do verificador.
+
+        Returns:
+            dict: Número de vereditos, acertos, faltas e códigos recusados.
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "rejected": self.rejected}
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o cache de resultados de execução e de verificação de submissões.
+
+Em uma turma, muitos alunos enviam praticamente a mesma solução, e o mesmo
+aluno costuma clicar em "Executar" ou "Verificar" várias vezes sem alterar
+o código. Para exercícios cujo resultado depende apenas do código enviado
+(marcados com `"deterministic": true` no `exercises.json`), a classe
+`ResultCache` guarda o dicionário de resultado e o reutiliza, evitando uma
+nova execução.
+
+A chave combina o hash do código normalizado (veja `normalize_code`), o
+exercício e a versão do arquivo de exercícios (que muda quando o `test_code`
+é editado). As entradas expiram após um tempo de vida (TTL), e as menos
+usadas recentemente são descartadas quando o cache está cheio.
+"""
+from collections import OrderedDict
+import hashlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Número padrão de resultados mantidos.
+DEFAULT_MAX_ENTRIES = 1024
+
+# Tempo de vida padrão de cada resultado, em segundos.
+DEFAULT_TTL_SECONDS = 600.0
+
+# Erros que dependem da carga do servidor (ou de um cancelamento), e não do
+# código: resultados que os contenham em "details" não são armazenados.
+TRANSIENT_ERROR_MARKERS = ("TimeoutError:", "WorkerCrashed:", "Cancelled:")
+
+
+def normalize_code(code):
+    """
+    Normaliza um código-fonte para comparação.
+
+    Apenas unifica as quebras de linha ("\\r\\n" e "\\r" viram "\\n"), que o
+    compilador do Python já trata como equivalentes, inclusive dentro de
+    strings. Espaços no fim das linhas e linhas em branco não são removidos:
+    dentro de strings de várias linhas (ou após uma barra invertida) eles
+    alteram o comportamento do código, e linhas a mais ou a menos alteram os
+    números de linha das mensagens de erro.
+
+    Args:
+        code (str): O código-fonte.
+
+    Returns:
+        str: O código normalizado.
+    """
+    return code.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def code_hash(code):
+    """Retorna o hash SHA-256 (hexadecimal) do código normalizado."""
+    return hashlib.sha256(normalize_code(code).encode('utf-8')).hexdigest()
+
+
+def is_cacheable(result):
+    """
+    Indica se um resultado no formato das rotas de execução pode ser armazenado.
+
+    Args:
+        result (dict): O resultado, com a chave "details".
+
+    Returns:
+        bool: False se "details" indicar um erro transitório (tempo esgotado,
+              trabalhador encerrado ou execução cancelada), que poderia não se repetir.
+    """
+    details = result.get("details") or ""
+    return not any(marker in details for marker in TRANSIENT_ERROR_MARKERS)
+
+
+class ResultCache:
+    """
+    Cache LRU de resultados, com tempo de vida por entrada.
+
+    Attributes:
+        max_entries (int): Número máximo de resultados mantidos.
+        ttl (float | None): Tempo de vida de cada resultado, em segundos (None = sem expiração).
+        hits (int): Buscas atendidas pelo cache.
+        misses (int): Buscas sem resultado válido (inclui as expiradas).
+        expirations (int): Parte de `misses` causada por entradas expiradas.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL_SECONDS):
+        """
+        Inicializa um cache vazio.
+
+        Args:
+            max_entries (int): Número máximo de resultados mantidos.
+            ttl (float | None): Tempo de vida de cada resultado, em segundos.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """
+        Retorna o resultado armazenado para `key`.
+
+        Args:
+            key (hashable): A chave (ex: montada com `code_hash`).
+
+        Returns:
+            dict | None: Uma cópia do resultado, ou None se não houver resultado válido.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, key, result):
+        """
+        Armazena o resultado de `key`, descartando os menos usados se necessário.
+
+        Args:
+            key (hashable): A chave.
+            result (dict): O dicionário de resultado (uma cópia é armazenada).
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Remove todos os resultados do cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: Número de entradas, acertos, faltas, expirações e a taxa de acerto
+                  (`hit_ratio`, entre 0 e 1).
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -10,6 +10,9 @@ inicia o servidor de desenvolvimento Flask.
 
 Para executar a aplicação, execute este script diretamente:
     python projects/run.py
+
+Para produção, use o lançador WSGI (veja `projects/wsgi.py`):
+    python -m projects.wsgi
 """
 import sys
 from pathlib import Path
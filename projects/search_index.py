@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o índice invertido de busca textual sobre lições e exercícios.
+
+Sem um índice, cada busca precisaria percorrer todo o conteúdo dos arquivos
+de lições e exercícios de todos os cursos. A classe `SearchIndex` mantém um
+índice invertido (termo -> documentos que o contêm, com o peso do termo em
+cada documento), e a busca consulta apenas as listas dos termos pesquisados.
+
+Os textos passam por `analyze`: o HTML é removido, os acentos são
+eliminados (a busca por "funcao" encontra "função"), as palavras muito
+comuns são descartadas e as restantes são reduzidas a um radical
+(`stem`), de modo que "variável", "variáveis" e "variavel" se correspondem.
+O último termo da consulta também é buscado como prefixo, para que a busca
+funcione enquanto o usuário digita.
+
+O índice é dividido em segmentos, um por arquivo de dados (ex: as lições de
+um curso), cada um com a versão do arquivo usada na indexação. `sync`
+reconstrói apenas os segmentos cujos arquivos mudaram e remove os que
+deixaram de existir.
+"""
+import bisect
+import html
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# Peso de cada campo indexado na pontuação de um documento.
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "key_concepts": 2.5,
+    "description": 1.5,
+    "instructions": 1.0,
+    "content": 1.0,
+}
+
+# Intervalo mínimo, em segundos, entre duas verificações de alteração dos arquivos em `sync`.
+DEFAULT_CHECK_INTERVAL = 1.0
+
+# Número de resultados retornados por padrão, e o máximo que pode ser pedido.
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Palavras muito comuns em português (já sem acentos), ignoradas na indexação e nas consultas.
+STOPWORDS = frozenset("""
+a ao aos as com como da das de do dos e ela elas ele eles em entre era essa esse esta este eu foi
+ha isso isto ja la lhe mais mas me mesmo na nas nao no nos num numa o os ou para pela pelas pelo
+pelos por qual quando que se sem ser seu seus sua suas sao tambem te tem ter um uma umas uns voce
+""".split())
+
+# Sufixos removidos por `stem`, do mais longo para o mais curto em cada grupo.
+# Cada regra: (sufixo, substituição, tamanho mínimo do radical restante).
+_PLURAL_RULES = (("oes", "ao", 2), ("aes", "ao", 2), ("ais", "al", 2), ("eis", "el", 2),
+                 ("ois", "ol", 2), ("is", "il", 2), ("ns", "m", 1), ("res", "r", 3), ("s", "", 3))
+_SUFFIX_RULES = (("amente", "", 4), ("mente", "", 4), ("acoes", "", 3), ("acao", "", 3), ("icao", "", 3),
+                 ("idade", "", 4), ("avel", "", 3), ("ivel", "", 3), ("ismo", "", 3), ("ista", "", 3),
+                 ("ador", "", 3), ("ante", "", 3), ("ando", "", 3), ("endo", "", 3), ("indo", "", 3),
+                 ("ado", "", 3), ("ada", "", 3), ("ido", "", 3), ("ida", "", 3), ("ar", "", 3),
+                 ("er", "", 3), ("ir", "", 3), ("a", "", 3), ("e", "", 3), ("o", "", 3))
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\w+")
+
+
+def fold(text):
+    """Remove os acentos e converte para minúsculas (ex: "Função" -> "funcao")."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def stem(word):
+    """
+    Reduz uma palavra (já sem acentos) a um radical simplificado.
+
+    Remove uma terminação de plural e, em seguida, um sufixo comum (de
+    advérbios, substantivos, adjetivos e verbos). Não é um radicalizador
+    linguisticamente completo: basta que as variações de uma palavra levem
+    ao mesmo radical, já que documentos e consultas passam pela mesma função.
+    """
+    if word.isdigit():
+        return word
+    for rules in (_PLURAL_RULES, _SUFFIX_RULES):
+        for suffix, replacement, min_stem in rules:
+            if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+                word = word[:-len(suffix)] + replacement
+                break
+    return word
+
+
+def analyze(text):
+    """
+    Converte um texto na lista de termos indexados.
+
+    Args:
+        text (str): O texto (pode conter HTML).
+
+    Returns:
+        list: Os termos, na ordem do texto (com repetições).
+    """
+    text = html.unescape(_TAG_RE.sub(" ", text))
+    return [stem(word) for word in _WORD_RE.findall(fold(text)) if word not in STOPWORDS and len(word) > 1]
+
+
+def _field_text(value):
+    """Converte o valor de um campo (texto ou lista de textos) em texto."""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value) if value else ""
+
+
+def lesson_documents(course_id, lessons):
+    """
+    Monta os documentos de busca das lições de um curso.
+
+    Returns:
+        list: Dicionários com `kind`, `course_id`, `id`, `title`, `summary` e `fields`.
+    """
+    return [_document("lesson", course_id, lesson) for lesson in lessons if isinstance(lesson, dict)]
+
+
+def exercise_documents(course_id, exercises):
+    """Monta os documentos de busca dos exercícios de um curso (veja `lesson_documents`)."""
+    documents = []
+    for exercise in exercises:
+        document = _document("exercise", course_id, exercise)
+        document["lesson_id"] = exercise.get("lesson_id")
+        documents.append(document)
+    return documents
+
+
+def _document(kind, course_id, item):
+    """Monta um documento de busca a partir de uma lição ou exercício."""
+    return {
+        "kind": kind,
+        "course_id": course_id,
+        "id": str(item.get("id")),
+        "title": item.get("title", ""),
+        "summary": item.get("description", ""),
+        "fields": {field: _field_text(item.get(field)) for field in FIELD_WEIGHTS},
+    }
+
+
+class SearchIndex:
+    """
+    Índice invertido, dividido em segmentos atualizáveis individualmente.
+
+    Attributes:
+        check_interval (float): Intervalo mínimo entre verificações de alteração em `sync`.
+        rebuilds (int): Número de segmentos (re)construídos.
+        searches (int): Número de buscas realizadas.
+    """
+
+    def __init__(self, check_interval=DEFAULT_CHECK_INTERVAL):
+        """
+        Inicializa um índice vazio.
+
+        Args:
+            check_interval (float): Segundos entre verificações de alteração em `sync`.
+        """
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._segments = {} # chave do segmento -> (versão, chaves dos documentos)
+        self._documents = {} # chave do documento -> documento (sem os campos)
+        self._postings = {} # termo -> {chave do documento: peso}
+        self._vocabulary = [] # termos ordenados, para a busca por prefixo
+        self._vocabulary_dirty = False
+        self._last_check = None
+        self.rebuilds = 0
+        self.searches = 0
+
+    def segment_version(self, key):
+        """Retorna a versão com que o segmento `key` foi indexado, ou None se ele não existir."""
+        with self._lock:
+            segment = self._segments.get(key)
+            return segment[0] if segment else None
+
+    def update_segment(self, key, version, documents):
+        """
+        Substitui os documentos de um segmento.
+
+        Args:
+            key (hashable): Identifica o segmento (ex: ("lesson", "python-basico")).
+            version (hashable): A versão dos dados indexados (ex: a assinatura do arquivo).
+            documents (list): Os documentos (veja `lesson_documents`).
+        """
+        # A análise dos textos é feita fora do lock; apenas a troca das listas é protegida
+        analyzed = []
+        for document in documents:
+            weights = {}
+            for field, text in document["fields"].items():
+                for term in analyze(text):
+                    weights[term] = weights.get(term, 0.0) + FIELD_WEIGHTS.get(field, 1.0)
+            doc_key = (key, document["kind"], document["course_id"], document["id"])
+            analyzed.append((doc_key, {name: value for name, value in document.items() if name != "fields"}, weights))
+        with self._lock:
+            self._drop_segment(key)
+            for doc_key, stored, weights in analyzed:
+                self._documents[doc_key] = stored
+                for term, weight in weights.items():
+                    # Amortece termos repetidos: um documento longo não domina só pela repetição
+                    self._postings.setdefault(term, {})[doc_key] = 1.0 + math.log(weight)
+            self._segments[key] = (version, [doc_key for doc_key, _, _ in analyzed])
+            self._vocabulary_dirty = True
+            self.rebuilds += 1
+        logger.debug("Índice de busca: segmento %s indexado com %d documentos.", key, len(analyzed))
+
+    def remove_segment(self, key):
+        """Remove um segmento e seus documentos."""
+        with self._lock:
+            self._drop_segment(key)
+            self._vocabulary_dirty = True
+
+    def _drop_segment(self, key):
+        """Remove os documentos de um segmento. Deve ser chamado com o lock adquirido."""
+        segment = self._segments.pop(key, None)
+        if segment is None:
+            return
+        doc_keys = set(segment[1])
+        for doc_key in doc_keys:
+            self._documents.pop(doc_key, None)
+        for term in [term for term, postings in self._postings.items() if not doc_keys.isdisjoint(postings)]:
+            postings = self._postings[term]
+            for doc_key in doc_keys.intersection(postings):
+                del postings[doc_key]
+            if not postings:
+                del self._postings[term]
+
+    def sync(self, sources, force=False):
+        """
+        Atualiza os segmentos a partir das fontes de dados atuais.
+
+        Verifica no máximo uma vez a cada `check_interval` segundos (a menos
+        que `force` seja True): segmentos com versão diferente são reconstruídos,
+        e segmentos ausentes de `sources` são removidos.
+
+        Args:
+            sources (callable): Função sem argumentos que retorna tuplas
+                (chave, versão, função que retorna os documentos). A função dos
+                documentos só é chamada para segmentos novos ou alterados.
+            force (bool): Verifica mesmo antes de `check_interval`.
+
+        Returns:
+            int: Número de segmentos reconstruídos ou removidos.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._last_check is not None and now - self._last_check < self.check_interval:
+                return 0
+            self._last_check = now
+        changed = 0
+        seen = set()
+        for key, version, load_documents in sources():
+            seen.add(key)
+            with self._lock:
+                current = self._segments.get(key)
+            if current is None or current[0] != version:
+                self.update_segment(key, version, load_documents())
+                changed += 1
+        with self._lock:
+            for key in [key for key in self._segments if key not in seen]:
+                self._drop_segment(key)
+                self._vocabulary_dirty = True
+                changed += 1
+        return changed
+
+    def _expand(self, term):
+        """Retorna os termos do vocabulário que começam com `term`. Deve ser chamado com o lock adquirido."""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, term)
+        matches = []
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(term):
+                break
+            matches.append(candidate)
+        return matches
+
+    def search(self, query, limit=DEFAULT_LIMIT, course_id=None, kind=None):
+        """
+        Busca os documentos que correspondem à consulta.
+
+        A pontuação soma, para cada termo da consulta, o peso do termo no
+        documento multiplicado pela raridade do termo (IDF). Documentos que
+        contêm mais termos da consulta vêm primeiro.
+
+        Args:
+            query (str): A consulta, em texto livre.
+            limit (int): Número máximo de resultados.
+            course_id (str, optional): Restringe a busca a um curso.
+            kind (str, optional): Restringe a busca a "lesson" ou "exercise".
+
+        Returns:
+            list: Os documentos encontrados (`kind`, `course_id`, `id`, `title`,
+                  `summary` e, para exercícios, `lesson_id`), com a pontuação
+                  (`score`), em ordem decrescente de relevância.
+        """
+        terms = list(dict.fromkeys(analyze(query)))
+        if not terms:
+            return []
+        with self._lock:
+            self.searches += 1
+            total = len(self._documents) or 1
+            scores, matched = {}, {}
+            for position, term in enumerate(terms):
+                # O último termo também vale como prefixo (busca enquanto se digita)
+                candidates = self._expand(term) if position == len(terms) - 1 else [term]
+                term_scores = {}
+                for candidate in candidates:
+                    postings = self._postings.get(candidate)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + total / len(postings))
+                    for doc_key, weight in postings.items():
+                        score = weight * idf
+                        if score > term_scores.get(doc_key, 0.0):
+                            term_scores[doc_key] = score
+                for doc_key, score in term_scores.items():
+                    scores[doc_key] = scores.get(doc_key, 0.0) + score
+                    matched[doc_key] = matched.get(doc_key, 0) + 1
+            results = []
+            for doc_key, score in scores.items():
+                document = self._documents[doc_key]
+                if (course_id and document["course_id"] != course_id) or (kind and document["kind"] != kind):
+                    continue
+                results.append((matched[doc_key], score, doc_key, document))
+        results.sort(key=lambda item: (-item[0], -item[1], item[2][1:]))
+        return [dict(document, score=round(score, 4)) for _, score, _, document in results[:limit]]
+
+    def stats(self):
+        """
+        Retorna os contadores do índice.
+
+        Returns:
+            dict: Número de segmentos, documentos e termos, segmentos reconstruídos e buscas.
+        """
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "documents": len(self._documents),
+                "terms": len(self._postings),
+                "rebuilds": self.rebuilds,
+                "searches": self.searches,
+            }
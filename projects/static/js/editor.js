@@ -22,9 +22,35 @@ document.addEventListener('DOMContentLoaded', function() {
     const outputDiv = document.getElementById('output');
     const outputTab = document.getElementById('output-tab');
 
-    runButton.addEventListener('click', function() {
+    // Trabalho de execução em andamento (veja /api/jobs). Ao clicar em
+    // "Executar" novamente, o trabalho anterior é cancelado no servidor, para
+    // que execuções abandonadas não continuem ocupando o pool de execução.
+    let currentJobId = null;
+    let runCounter = 0;
+
+    function cancelJob(jobId) {
+        // keepalive permite que o pedido seja enviado mesmo ao sair da página
+        fetch('/api/jobs/' + jobId, { method: 'DELETE', keepalive: true }).catch(() => {});
+    }
+
+    function sleep(ms) {
+        return new Promise(resolve => setTimeout(resolve, ms));
+    }
+
+    window.addEventListener('pagehide', function() {
+        if (currentJobId) cancelJob(currentJobId);
+    });
+
+    runButton.addEventListener('click', async function() {
         // Obter o código do editor
         const code = codeEditor.getValue();
+        const run = ++runCounter;
+
+        // Cancela a execução anterior, se ainda estiver em andamento
+        if (currentJobId) {
+            cancelJob(currentJobId);
+            currentJobId = null;
+        }
         
         // Mostrar indicador de carregamento
         outputDiv.innerHTML = '<div class="text-center"><div class="spinner-border text-primary" role="status"><span class="visually-hidden">Executando...</span></div><p>Executando o código...</p></div>';
@@ -32,28 +58,63 @@ document.addEventListener('DOMContentLoaded', function() {
         // Mudar para a aba de saída
         outputTab.click();
         
-        // Enviar o código para o servidor para execução
-        fetch('/api/execute-code', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json; charset=utf-8'
-            },
-            body: JSON.stringify({ code: code })
-        })
-        .then(response => response.json())
-        .then(data => {
-            // Exibir a saída
-            if (data.returncode === 0) {
-                // Execução bem-sucedida
-                outputDiv.innerHTML = '<pre class="success">' + (data.stdout || 'Programa executado com sucesso (sem saída).') + '</pre>';
-            } else {
-                // Erro na execução
-                outputDiv.innerHTML = '<pre class="error">' + (data.stderr || 'Erro desconhecido.') + '</pre>';
+        // A saída é acrescentada ao <pre> à medida que o servidor a produz
+        const outputPre = document.createElement('pre');
+        let hasOutput = false;
+        try {
+            const response = await fetch('/api/jobs', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json; charset=utf-8'
+                },
+                body: JSON.stringify({ code: code })
+            });
+            const submitted = await response.json();
+            if (!response.ok) {
+                throw new Error(submitted.details || response.status);
+            }
+            const jobId = submitted.job_id;
+            if (run !== runCounter) {
+                cancelJob(jobId); // O usuário clicou novamente antes do registro
+                return;
+            }
+            currentJobId = jobId;
+            outputDiv.innerHTML = '';
+            outputDiv.appendChild(outputPre);
+
+            // Consulta o andamento, recebendo apenas a saída nova a cada vez
+            let offset = 0;
+            let delay = 100;
+            while (currentJobId === jobId) {
+                const poll = await fetch('/api/jobs/' + jobId + '?offset=' + offset);
+                const job = await poll.json();
+                if (!poll.ok) {
+                    throw new Error(job.error || poll.status);
+                }
+                if (currentJobId !== jobId) return; // Substituído por uma nova execução
+                job.chunks.forEach(chunk => {
+                    outputPre.appendChild(document.createTextNode(chunk[1]));
+                    hasOutput = true;
+                });
+                offset = job.offset;
+                if (job.result) {
+                    currentJobId = null;
+                    if (job.result.success) {
+                        outputPre.className = 'success';
+                        if (!hasOutput) outputPre.textContent = 'Programa executado com sucesso (sem saída).';
+                    } else {
+                        outputPre.className = 'error';
+                        outputPre.appendChild(document.createTextNode((hasOutput ? '\n' : '') + (job.result.details || 'Erro desconhecido.')));
+                    }
+                    return;
+                }
+                await sleep(delay);
+                delay = Math.min(delay * 1.5, 500);
             }
-        })
-        .catch(error => {
+        } catch (error) {
+            if (run !== runCounter) return; // Erro de uma execução já substituída
             outputDiv.innerHTML = '<pre class="error">Erro ao executar o código: ' + error.message + '</pre>';
-        });
+        }
     });
 
     // Botão para verificar o exercício (se estiver em um exercício)
@@ -133,6 +133,7 @@ def test_check_exercise_api(client, app_test_data):
     # Based on the test_code `assert 'Olá, Python!' in output\nprint('SUCCESS')`,
     # if the assertion fails, an AssertionError will be raised.
     assert 'AssertionError' in data.get('details', '') or 'AssertionError' in data.get('output', '') # Check for AssertionError
+    assert data['details'] == "AssertionError: " # O tipo do erro aparece uma única vez
 
     # Test with non-existent exercise ID
     payload_nonexistent_exercise = {
@@ -167,3 +168,455 @@ def test_check_exercise_api(client, app_test_data):
     assert data['success'] == False
     assert 'details' in data
     assert "Curso 'non-existent-course' não encontrado" in data['details']
+
+def test_check_exercises_batch_api(client, app_test_data):
+    """Testa a API de verificação em lote, nas duas formas de payload."""
+    payload = {
+        "course_id": "python-basico",
+        "exercise_id": "ex-introducao-5",
+        "codes": ["print('Olá, Python!')", "print('Olá, Mundo!')", "print('Olá, Python!')"]
+    }
+    response = client.post('/api/check-exercises/batch', json=payload)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    results = sorted((json.loads(line) for line in response.get_data(as_text=True).splitlines()),
+                     key=lambda item: item['index'])
+    assert [item['index'] for item in results] == [0, 1, 2]
+    assert [item['success'] for item in results] == [True, False, True]
+    assert all(item['status'] == 200 for item in results)
+    assert 'SUCCESS' in results[0]['output']
+
+    payload = {"submissions": [
+        {"course_id": "python-basico", "exercise_id": "ex-introducao-5", "code": "print('Olá, Python!')"},
+        {"course_id": "non-existent-course", "exercise_id": "ex-introducao-5", "code": "print('test')"},
+    ]}
+    response = client.post('/api/check-exercises/batch', json=payload)
+    results = {item['index']: item for item in map(json.loads, response.get_data(as_text=True).splitlines())}
+    assert results[0]['success'] is True
+    assert results[1]['status'] == 404
+    assert "Curso 'non-existent-course' não encontrado" in results[1]['details']
+
+    response = client.post('/api/check-exercises/batch', json={"submissions": [{"code": "print(1)"}]})
+    assert response.status_code == 400
+
+def test_execute_code_stream_api(client, app_test_data):
+    """Testa a API de execução com saída em streaming (Server-Sent Events)."""
+    response = client.post('/api/execute-code/stream', json={"code": "import sys\nprint('linha 1')\nprint('erro', file=sys.stderr)\n1 / 0"})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = []
+    for raw_event in response.get_data(as_text=True).strip().split('\n\n'):
+        name_line, data_line = raw_event.split('\n')
+        events.append((name_line[len('event: '):], json.loads(data_line[len('data: '):])))
+    assert ''.join(data['text'] for name, data in events if name == 'stdout') == 'linha 1\n'
+    assert ''.join(data['text'] for name, data in events if name == 'stderr') == 'erro\n'
+    assert events[-1][0] == 'result'
+    assert events[-1][1]['success'] is False
+    assert 'ZeroDivisionError' in events[-1][1]['details']
+
+    response = client.post('/api/execute-code/stream', json={})
+    assert response.status_code == 400
+
+def test_execute_code_stream_cancels_on_disconnect(client, monkeypatch):
+    """Testa que a execução em streaming é cancelada quando o cliente desconecta."""
+    import threading
+    from projects.app import get_executor
+    received = []
+    started = threading.Event()
+
+    def execute_code_stream(code, on_output, limits=None, stdin=None, cancel=None):
+        received.append(cancel)
+        on_output("stdout", "início\n")
+        started.set()
+        cancel.wait(5)
+        return {"returncode": 1, "stdout": "", "stderr": "Cancelled: execução cancelada.", "error_type": "Cancelled"}
+
+    monkeypatch.setattr(get_executor(), 'execute_code_stream', execute_code_stream)
+    response = client.post('/api/execute-code/stream', json={"code": "while True: pass"}, buffered=False)
+    assert next(response.response).startswith(b'event: stdout')
+    assert started.wait(5)
+    response.close()
+    assert received[0].wait(5)
+
+def test_lesson_page_etag_and_invalidation(client, app_test_data):
+    """Testa o ETag das páginas em cache, a resposta 304 e a invalidação ao editar os dados."""
+    url = '/courses/python-basico/lessons/introducao-python'
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+    lessons_file = app_test_data / 'basic' / 'lessons.json'
+    lessons = json.loads(lessons_file.read_text(encoding='utf-8'))
+    lessons[0]['title'] = 'Introdução Revisada'
+    lessons_file.write_text(json.dumps(lessons, ensure_ascii=False), encoding='utf-8')
+    stat_result = os.stat(lessons_file)
+    os.utime(lessons_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'Introdução Revisada' in response.get_data(as_text=True)
+    assert response.headers['ETag'] != etag
+
+def test_execute_code_api_with_stdin(client, app_test_data):
+    """Testa o envio de entrada padrão para a API de execução de código."""
+    response = client.post('/api/execute-code', json={"code": "chute = int(input('Chute: '))\nprint(chute * 2)", "stdin": ["21"]})
+    data = response.get_json()
+    assert data['success'] is True
+    assert data['output'] == "Chute: 42\n"
+
+def test_check_exercise_with_test_cases(client, app_test_data):
+    """Testa a correção por casos de teste estruturados, com parada antecipada ou execução completa."""
+    exercises_file = app_test_data / 'basic' / 'exercises.json'
+    exercises = json.loads(exercises_file.read_text(encoding='utf-8'))
+    exercises.append({
+        "id": "ex-casos", "lesson_id": "introducao-python", "title": "Dobro", "level": "básico",
+        "test_cases": [
+            {"name": "dois", "stdin": ["2"], "expected_output": "4"},
+            {"name": "três", "stdin": ["3"], "expected_output": "6"},
+            {"name": "negativo", "stdin": ["-1"], "check": "assert int(output) < 0"},
+        ],
+    })
+    exercises_file.write_text(json.dumps(exercises, ensure_ascii=False), encoding='utf-8')
+
+    payload = {"course_id": "python-basico", "exercise_id": "ex-casos", "code": "print(int(input()) * 2)"}
+    data = client.post('/api/check-exercise', json=payload).get_json()
+    assert data['success'] is True
+    assert [case['status'] for case in data['cases']] == ['passed', 'passed', 'passed']
+
+    payload["code"] = "n = int(input())\nprint(4 if n == 2 else 0)"
+    data = client.post('/api/check-exercise', json=payload).get_json()
+    assert data['success'] is False
+    assert [case['status'] for case in data['cases']] == ['passed', 'failed', 'skipped']
+    assert "Caso 'três' falhou" in data['details']
+
+    data = client.post('/api/check-exercise', json={**payload, "run_all_cases": True}).get_json()
+    assert [case['status'] for case in data['cases']] == ['passed', 'failed', 'failed']
+    assert "1 de 3 casos passaram" in data['details']
+
+
+def test_check_exercise_test_code_sees_user_namespace(client, app_test_data):
+    """Testa que o test_code pode inspecionar funções definidas pelo código do usuário."""
+    exercises_file = app_test_data / 'basic' / 'exercises.json'
+    exercises = json.loads(exercises_file.read_text(encoding='utf-8'))
+    exercises.append({
+        "id": "ex-funcao", "lesson_id": "introducao-python", "title": "Função dobro", "level": "básico",
+        "test_code": "assert dobro(4) == 8, 'dobro(4) deveria ser 8'\nprint('SUCCESS')",
+    })
+    exercises_file.write_text(json.dumps(exercises, ensure_ascii=False), encoding='utf-8')
+
+    payload = {"course_id": "python-basico", "exercise_id": "ex-funcao", "code": "def dobro(x):\n    return x * 2"}
+    data = client.post('/api/check-exercise', json=payload).get_json()
+    assert data['success'] is True
+    assert data['output'] == "SUCCESS\n"
+
+    payload["code"] = "def dobro(x):\n    return x + 2"
+    data = client.post('/api/check-exercise', json=payload).get_json()
+    assert data['success'] is False
+    assert "dobro(4) deveria ser 8" in data['details']
+
+
+def test_result_cache_for_deterministic_exercises(client, app_test_data):
+    """Testa que submissões repetidas a exercícios determinísticos reutilizam o resultado."""
+    from projects.app import result_cache
+    result_cache.invalidate()
+    exercises_file = app_test_data / 'basic' / 'exercises.json'
+    exercises = json.loads(exercises_file.read_text(encoding='utf-8'))
+    exercises.append({
+        "id": "ex-deterministico", "lesson_id": "introducao-python", "title": "Olá", "level": "básico",
+        "deterministic": True, "test_code": "assert output.strip() == 'Olá'",
+    })
+    exercises_file.write_text(json.dumps(exercises, ensure_ascii=False), encoding='utf-8')
+
+    payload = {"course_id": "python-basico", "exercise_id": "ex-deterministico", "code": "print('Olá')\n"}
+    first = client.post('/api/check-exercise', json=payload).get_json()
+    hits_before = result_cache.stats()["hits"]
+    # Quebras de linha no estilo do Windows não alteram a chave do cache
+    second = client.post('/api/check-exercise', json={**payload, "code": "print('Olá')\r\n"}).get_json()
+    assert first == second and first['success'] is True
+    assert result_cache.stats()["hits"] == hits_before + 1
+
+    client.post('/api/execute-code', json=payload)
+    executed = client.post('/api/execute-code', json=payload).get_json()
+    assert executed['output'] == "Olá\n"
+    assert result_cache.stats()["hits"] == hits_before + 2
+
+    # Exercícios sem a marcação não usam o cache
+    client.post('/api/check-exercise', json={**payload, "exercise_id": "ex-introducao-5"})
+    assert result_cache.stats()["hits"] == hits_before + 2
+
+
+def test_instrumentation_server_timing_and_report(client, app):
+    """Testa o cabeçalho Server-Timing, os histogramas por rota e o perfilamento."""
+    from projects.app import instrumentation
+    instrumentation.reset()
+    response = client.get('/courses/python-basico')
+    server_timing = response.headers['Server-Timing']
+    for name in ('data-load', 'execute', 'render', 'other', 'total'):
+        assert f"{name};dur=" in server_timing
+
+    app.config['PROFILE_SAMPLE_RATE'] = 1.0
+    try:
+        client.post('/api/execute-code', json={"code": "print(1)"})
+    finally:
+        app.config['PROFILE_SAMPLE_RATE'] = 0.0
+
+    report = client.get('/api/instrumentation/report').get_json()
+    assert report['routes']['course_detail_page']['render']['count'] == 1
+    assert report['routes']['api_execute_code']['execute']['sum_ms'] > 0
+    assert report['profiles'][-1]['endpoint'] == 'api_execute_code'
+    text = client.get('/api/instrumentation/report?format=text').get_data(as_text=True)
+    assert 'course_detail_page' in text and '--- Perfil: POST /api/execute-code' in text
+
+
+def test_metrics_endpoint(client):
+    """Testa a rota /metrics no formato de texto do Prometheus."""
+    from projects.bytecode_cache import compiled_code_cache
+    client.post('/api/execute-code', json={"code": "1 / 0"})
+    client.get('/courses/python-basico/lessons/introducao-python')
+    for _ in range(2): # A segunda busca reutiliza o código compilado
+        compiled_code_cache.get("python-basico", "ex-metricas", "assert 1 + 1 == 2")
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    text = response.get_data(as_text=True)
+    assert 'curso_executions_total{backend="process",function="execute_code",error_type="ZeroDivisionError"}' in text
+    assert 'curso_executor_queue_depth{backend="process"} 0' in text
+    assert 'curso_content_cache_lookups_total{file="lessons.json",result="miss"}' in text
+    assert 'curso_request_phase_duration_seconds_count{route="lesson_detail_page",phase="total"}' in text
+    assert '# TYPE curso_compiled_code_compile_seconds_saved_total counter' in text
+    saved = [line for line in text.splitlines() if line.startswith('curso_compiled_code_compile_seconds_saved_total ')]
+    assert float(saved[0].split()[1]) > 0
+
+
+def test_create_app_uses_isolated_data_dir(tmp_path):
+    """Testa que uma aplicação criada com `create_app` lê os dados do seu próprio diretório."""
+    from projects.app import create_app
+    data_dir = tmp_path / 'isolado'
+    (data_dir / 'basic').mkdir(parents=True)
+    course = {"id": "curso-isolado", "name": "Curso Isolado", "level": "Básico",
+              "lessons_file": "basic/lessons.json", "exercises_file": "basic/exercises.json"}
+    (data_dir / 'courses.json').write_text(json.dumps([course]), encoding='utf-8')
+    (data_dir / 'basic' / 'lessons.json').write_text(json.dumps([{"id": "licao-1", "title": "Lição 1", "order": 1}]), encoding='utf-8')
+    (data_dir / 'basic' / 'exercises.json').write_text("[]", encoding='utf-8')
+
+    isolated_app = create_app({"TESTING": True, "DATA_DIR": str(data_dir), "EXECUTOR_BACKEND": "inline"})
+    state = isolated_app.extensions['curso']
+    assert state._managers == {"course": None, "lesson": None, "exercise": None} # Nada criado ainda
+    client = isolated_app.test_client()
+    response = client.get('/api/courses/curso-isolado/lessons')
+    assert response.status_code == 200
+    assert [lesson["id"] for lesson in response.get_json()] == ["licao-1"]
+    assert client.get('/api/courses/python-basico/lessons').status_code == 404
+    assert client.post('/api/execute-code', json={"code": "print(2)"}).get_json()["output"] == "2\n"
+
+
+def test_create_app_accepts_injected_managers():
+    """Testa que managers fornecidos a `create_app` são usados pelas rotas."""
+    from projects.app import create_app
+
+    class FakeCourseManager:
+        revision = 0
+
+        def get_courses(self):
+            return [{"id": "falso", "name": "Curso Falso", "short_description": "", "level": "Básico"}]
+
+        def get_course_by_id(self, course_id):
+            return self.get_courses()[0] if course_id == "falso" else None
+
+    isolated_app = create_app({"TESTING": True}, course_manager=FakeCourseManager())
+    response = isolated_app.test_client().get('/courses')
+    assert response.status_code == 200
+    assert "Curso Falso" in response.get_data(as_text=True)
+
+
+def test_import_time_budget():
+    """Testa que importar a aplicação é rápido e não carrega nenhum arquivo de dados."""
+    import subprocess
+    from pathlib import Path
+    script = (
+        "import time\n"
+        "started = time.perf_counter()\n"
+        "import projects.app as module\n"
+        "elapsed = time.perf_counter() - started\n"
+        "print(elapsed, module.app.extensions['curso']._managers['course'] is None)\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60,
+                               cwd=Path(__file__).resolve().parent.parent.parent)
+    assert completed.returncode == 0, completed.stderr
+    elapsed, no_manager = completed.stdout.split()
+    assert no_manager == "True"
+    assert float(elapsed) < 3.0 # Orçamento generoso; a importação leva tipicamente menos de 0,5 s
+
+
+def test_execute_code_returns_429_when_executor_busy(client, monkeypatch):
+    """Testa que uma execução recusada pelo pool responde 429 com Retry-After."""
+    from projects.app import get_executor
+    from projects.execution_backend import ExecutorBusy
+
+    def refuse(*args, **kwargs):
+        raise ExecutorBusy("Fila de execução cheia.", retry_after=3)
+
+    monkeypatch.setattr(get_executor(), 'execute_code', refuse)
+    response = client.post('/api/execute-code', json={"code": "print(1)"})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '3'
+    assert response.get_json()["success"] is False
+
+
+def test_job_api_submit_poll_and_cancel(client):
+    """Testa os trabalhos assíncronos: registro, consulta do resultado e cancelamento."""
+    import time
+    response = client.post('/api/jobs', json={"code": "print('a')\nprint('b')"})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    assert response.headers['Location'].endswith(f"/api/jobs/{job_id}")
+    for _ in range(200):
+        data = client.get(f'/api/jobs/{job_id}').get_json()
+        if "result" in data:
+            break
+        time.sleep(0.02)
+    assert data["status"] == "done"
+    # A saída chega apenas pelos trechos; o resultado não a repete
+    assert data["result"] == {"success": True, "output": "", "details": ""}
+    assert "".join(text for name, text in data["chunks"]) == "a\nb\n"
+    assert client.get(f'/api/jobs/{job_id}?offset={data["offset"]}').get_json()["chunks"] == []
+
+    job_id = client.post('/api/jobs', json={"code": "while True: pass"}).get_json()["job_id"]
+    time.sleep(0.2)
+    assert client.delete(f'/api/jobs/{job_id}').status_code == 200
+    for _ in range(200):
+        data = client.get(f'/api/jobs/{job_id}').get_json()
+        if "result" in data:
+            break
+        time.sleep(0.02)
+    assert data["status"] == "cancelled"
+    assert client.get('/api/jobs/inexistente').status_code == 404
+    assert client.post('/api/jobs', json={}).status_code == 400
+
+
+def test_preflight_rejects_without_executing(client, monkeypatch):
+    """Testa que erros de sintaxe e importações proibidas são recusados sem chamar o executor."""
+    from projects.app import get_executor
+
+    def fail(*args, **kwargs):
+        raise AssertionError("O executor não deveria ser chamado.")
+
+    executor = get_executor()
+    monkeypatch.setattr(executor, 'execute_code', fail)
+    monkeypatch.setattr(executor, 'execute_submission', fail)
+
+    data = client.post('/api/execute-code', json={"code": "print('oi'"}).get_json()
+    assert data["success"] is False
+    assert data["details"].startswith("SyntaxError: '(' was never closed")
+
+    payload = {"course_id": "python-basico", "exercise_id": "ex-introducao-1", "code": "import os\nprint('Olá, Mundo!')"}
+    data = client.post('/api/check-exercise', json=payload).get_json()
+    assert data["success"] is False
+    assert "ForbiddenConstruct: a importação do módulo 'os'" in data["details"]
+
+    # As regras do nível do curso valem também no streaming e na rota legada
+    monkeypatch.setattr(executor, 'execute_code_stream', fail)
+    response = client.post('/api/execute-code/stream', json={"code": "import os", "course_id": "python-basico"})
+    result_event = response.get_data(as_text=True).strip().split('\n\n')[-1]
+    assert result_event.startswith('event: result')
+    assert "ForbiddenConstruct: a importação do módulo 'os'" in result_event
+    data = client.post('/submit_exercise/python-basico/ex-introducao-1', json={"code": "import os"}).get_json()
+    assert data["success"] is False
+    assert "ForbiddenConstruct: a importação do módulo 'os'" in data["details"]
+
+
+def test_search_api_reindexes_changed_files(tmp_path):
+    """Testa a busca em /api/search e a atualização do índice após editar um arquivo de dados."""
+    from projects.app import create_app
+    data_dir = tmp_path / 'busca'
+    (data_dir / 'basic').mkdir(parents=True)
+    course = {"id": "curso-busca", "name": "Curso de Busca", "level": "Básico",
+              "lessons_file": "basic/lessons.json", "exercises_file": "basic/exercises.json"}
+    lessons_file = data_dir / 'basic' / 'lessons.json'
+    (data_dir / 'courses.json').write_text(json.dumps([course]), encoding='utf-8')
+    lessons_file.write_text(json.dumps([{"id": "licao-1", "title": "Funções", "order": 1}]), encoding='utf-8')
+    (data_dir / 'basic' / 'exercises.json').write_text(json.dumps(
+        [{"id": "ex-1", "lesson_id": "licao-1", "title": "Dicionários", "level": "básico"}]), encoding='utf-8')
+
+    client = create_app({"TESTING": True, "DATA_DIR": str(data_dir), "SEARCH_CHECK_INTERVAL_SECONDS": 0}).test_client()
+    results = client.get('/api/search?q=funcao').get_json()["results"]
+    assert [(result["kind"], result["id"]) for result in results] == [("lesson", "licao-1")]
+    assert results[0]["url"] == '/courses/curso-busca/lessons/licao-1'
+    results = client.get('/api/search?q=dicionario&kind=exercise').get_json()["results"]
+    assert results[0]["url"] == '/courses/curso-busca/exercise/ex-1/editor'
+    assert client.get('/api/search?q=x&kind=outro').status_code == 400
+
+    lessons_file.write_text(json.dumps([{"id": "licao-1", "title": "Recursão", "order": 1}]), encoding='utf-8')
+    stat_result = os.stat(lessons_file)
+    os.utime(lessons_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+    assert client.get('/api/search?q=funcao').get_json()["results"] == []
+    assert client.get('/api/search?q=recursao').get_json()["results"][0]["id"] == "licao-1"
+
+
+def test_concept_graph_api(tmp_path):
+    """Testa as rotas de pré-requisitos e de caminho entre conceitos, e a remontagem do grafo."""
+    from projects.app import create_app
+    data_dir = tmp_path / 'conceitos'
+    data_dir.mkdir()
+    concept_map = data_dir / 'concept_map.json'
+    concepts = {"introducao": {"basic": {"next_concepts": ["variaveis"]}},
+                "funcoes": {"basic": {"prerequisites": ["variaveis"]}}}
+    concept_map.write_text(json.dumps({"concepts": concepts}), encoding='utf-8')
+    courses = [
+        {"id": "basico", "name": "Básico", "learning_path": {"stage1": {"name": "Fundamentos", "modules": [
+            {"id": "variaveis", "revisited_in": ["avancado.metaclasses"]}, {"id": "funcoes"}]}}},
+        {"id": "intermediario", "name": "Intermediário", "learning_path": {"stage1": {"name": "POO", "modules": [
+            {"id": "poo", "builds_on": ["basico.variaveis"], "revisited_in": ["avancado.design-patterns"]}]}}},
+    ]
+    (data_dir / 'courses.json').write_text(json.dumps(courses), encoding='utf-8')
+    client = create_app({"TESTING": True, "DATA_DIR": str(data_dir)}).test_client()
+
+    order = client.get('/api/concepts').get_json()["order"]
+    assert order.index("introducao") < order.index("variaveis") < order.index("funcoes")
+    data = client.get('/api/concepts/funcoes/prerequisites').get_json()
+    assert data["all"] == ["introducao", "variaveis"]
+    assert client.get('/api/concepts/inexistente/prerequisites').status_code == 404
+
+    data = client.get('/api/concepts/path?from=basico.variaveis&to=avancado.design-patterns').get_json()
+    assert [step["relation"] for step in data["path"]] == ["prerequisite", "revisited"]
+    assert client.get('/api/concepts/path?from=funcoes&to=introducao').get_json()["path"] is None
+    assert client.get('/api/concepts/path?from=funcoes&to=x').status_code == 404
+
+    concepts["introducao"]["basic"]["prerequisites"] = ["funcoes"] # Ciclo
+    concept_map.write_text(json.dumps({"concepts": concepts}), encoding='utf-8')
+    stat_result = os.stat(concept_map)
+    os.utime(concept_map, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+    response = client.get('/api/concepts')
+    assert response.status_code == 500
+    assert "ciclo" in response.get_json()["error"]
+
+
+def test_exercise_limits_only_on_check_routes_and_clamped(client, app_test_data, monkeypatch):
+    """Testa que os limites de um exercício valem só na verificação, e nunca acima de `EXECUTOR_MAX_LIMITS`."""
+    from projects.app import get_executor
+    exercises_file = app_test_data / 'basic' / 'exercises.json'
+    exercises = json.loads(exercises_file.read_text(encoding='utf-8'))
+    exercises.append({"id": "ex-pesado", "lesson_id": "introducao-python", "title": "Pesado", "level": "básico",
+                      "test_code": "assert True", "limits": {"wall_time_seconds": 20, "memory_mb": 4096}})
+    exercises_file.write_text(json.dumps(exercises, ensure_ascii=False), encoding='utf-8')
+
+    seen = []
+    executor = get_executor()
+    for name in ('execute_code', 'execute_submission'):
+        def record(*args, _original=getattr(executor, name), limits=None, **kwargs):
+            seen.append(limits)
+            return _original(*args, limits=limits, **kwargs)
+        monkeypatch.setattr(executor, name, record)
+
+    # Na execução livre, o exercício citado pelo cliente não amplia os limites
+    payload = {"course_id": "python-basico", "exercise_id": "ex-pesado", "code": "print(1)"}
+    assert client.post('/api/execute-code', json=payload).get_json()["output"] == "1\n"
+    assert (seen[-1].wall_time, seen[-1].memory_bytes) == (5.0, 256 * 1024 * 1024)
+
+    # Na verificação, valem os limites do exercício, limitados pelos tetos (1024 MB)
+    assert client.post('/api/check-exercise', json=payload).get_json()["success"] is True
+    assert (seen[-1].wall_time, seen[-1].memory_bytes) == (20, 1024 * 1024 * 1024)
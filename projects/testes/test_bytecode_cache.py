@@ -0,0 +1,46 @@
+from projects.bytecode_cache import CompiledCodeCache
+from projects.code_executor import execute_code
+from projects.execution_backend import ProcessPoolBackend
+
+
+def test_compiles_once_per_source():
+    """Testa que a mesma fonte é compilada uma única vez e que o tempo economizado é contabilizado."""
+    cache = CompiledCodeCache()
+    first = cache.get("curso", "ex-1", "assert output == 'ok'")
+    second = cache.get("curso", "ex-1", "assert output == 'ok'")
+    assert first is second
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["compile_time_saved_seconds"] > 0
+
+    assert cache.get("curso", "ex-1", "assert output == 'outro'") is not first
+
+
+def test_version_change_drops_course_entries():
+    """Testa que uma nova versão do arquivo de exercícios descarta as entradas do curso."""
+    cache = CompiledCodeCache()
+    first = cache.get("curso", "ex-1", "x = 1", version=(1, 10))
+    cache.get("outro-curso", "ex-1", "x = 1", version=(1, 10))
+    assert cache.get("curso", "ex-1", "x = 1", version=(1, 10)) is first
+    assert cache.get("curso", "ex-1", "x = 1", version=(2, 11)) is not first
+    assert cache.stats()["entries"] == 2
+
+
+def test_syntax_error_returns_source():
+    """Testa que uma fonte inválida é devolvida como texto para o executor reportar o erro."""
+    cache = CompiledCodeCache()
+    assert cache.get("curso", "ex-1", "assert (") == "assert ("
+    assert execute_code(cache.get("curso", "ex-1", "assert ("))["error_type"] == "SyntaxError"
+
+
+def test_compiled_code_runs_inline_and_in_pool():
+    """Testa que objetos de código são aceitos pelo executor e pelo pool de processos."""
+    code = CompiledCodeCache().get("curso", "ex-1", "assert 'Python' in output\nprint('SUCCESS')")
+    assert execute_code(code, {"output": "Olá, Python!"})["stdout"] == "SUCCESS\n"
+
+    pool = ProcessPoolBackend(size=1)
+    try:
+        result = pool.execute_code(code, execution_globals={"output": "Olá, Python!"})
+    finally:
+        pool.shutdown()
+    assert result["stdout"] == "SUCCESS\n"
@@ -0,0 +1,99 @@
+import threading
+
+from projects.code_executor import execute_code, execute_submission, execute_test
+
+
+def test_execute_code_captures_stdout_and_stderr():
+    """Testa a captura de stdout e stderr, inclusive via `sys`."""
+    result = execute_code("import sys\nprint('saída')\nsys.stdout.write('direto\\n')\nprint('erro', file=sys.stderr)")
+    assert result["returncode"] == 0
+    assert result["stdout"] == "saída\ndireto\n"
+    assert result["stderr"] == "erro\n"
+
+
+def test_execute_code_captures_prints_from_user_threads():
+    """Testa que prints de threads criadas pelo código do usuário são capturados."""
+    code = (
+        "import threading\n"
+        "def tarefa():\n"
+        "    print('na thread')\n"
+        "t = threading.Thread(target=tarefa)\n"
+        "t.start()\n"
+        "t.join()\n"
+    )
+    result = execute_code(code)
+    assert result["stdout"] == "na thread\n"
+
+
+def test_concurrent_executions_do_not_interleave_output():
+    """Testa que execuções simultâneas em threads diferentes não misturam suas saídas."""
+    results = {}
+
+    def run(marker):
+        code = f"import time\nfor _ in range(50):\n    print('{marker}')\n    time.sleep(0.001)"
+        results[marker] = execute_code(code)
+
+    threads = [threading.Thread(target=run, args=(f"execucao-{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for marker, result in results.items():
+        assert result["stdout"] == f"{marker}\n" * 50
+
+
+def test_execute_test_reports_assertion_failure():
+    """Testa que uma asserção falha no código de teste é reportada como falha."""
+    result = execute_test("assert output == 'esperado', 'saída incorreta'", {"output": "outra"})
+    assert result["returncode"] == 1
+    assert result["stderr"] == "Teste falhou: saída incorreta"
+
+
+def test_execute_code_reads_scripted_stdin():
+    """Testa que input() e sys.stdin leem a entrada fornecida, com o prompt na saída."""
+    code = "import sys\nnome = input('Nome: ')\nresto = sys.stdin.read()\nprint(nome, resto.split())"
+    result = execute_code(code, stdin=["Ana", "1", "2"])
+    assert result["returncode"] == 0
+    assert result["stdout"] == "Nome: Ana ['1', '2']\n"
+
+
+def test_execute_code_without_stdin_raises_eof():
+    """Testa que, sem entrada, input() levanta EOFError em vez de bloquear."""
+    result = execute_code("input('Chute: ')")
+    assert result["error_type"] == "EOFError"
+
+
+def test_concurrent_executions_read_their_own_stdin():
+    """Testa que execuções simultâneas leem cada uma a sua própria entrada."""
+    results = {}
+
+    def run(value):
+        code = "import time\nfor _ in range(20):\n    print(input())\n    time.sleep(0.001)"
+        results[value] = execute_code(code, stdin=[value] * 20)
+
+    threads = [threading.Thread(target=run, args=(f"valor-{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for value, result in results.items():
+        assert result["stdout"] == f"{value}\n" * 20
+
+
+def test_execute_submission_shares_namespace():
+    """Testa que o código de teste enxerga o escopo do usuário e tem sua própria saída."""
+    result = execute_submission("def dobro(x):\n    return x * 2\nprint('pronto')",
+                                "assert dobro(3) == 6\nassert output == 'pronto\\n'\nprint('SUCCESS')")
+    assert result["returncode"] == 0
+    assert result["stdout"] == "pronto\n"
+    assert result["test"]["returncode"] == 0
+    assert result["test"]["stdout"] == "SUCCESS\n"
+
+
+def test_execute_submission_skips_test_after_user_error():
+    """Testa que o código de teste não é executado se o código do usuário falhar."""
+    result = execute_submission("1 / 0", "print('não deveria executar')")
+    assert result["error_type"] == "ZeroDivisionError"
+    assert result["test"] is None
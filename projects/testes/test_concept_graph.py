@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from projects.concept_graph import ConceptGraph, ConceptGraphError, load_concept_map
+
+
+CONCEPTS = {
+    "introducao": {"basic": {"course": "curso-a", "module": "inicio", "next_concepts": ["variaveis"]}},
+    "variaveis": {"basic": {"course": "curso-a", "module": "variaveis", "prerequisites": ["introducao"]}},
+    "funcoes": {"basic": {"prerequisites": ["variaveis"]}, "intermediate": {"prerequisites": ["introducao"]}},
+}
+COURSES = [
+    {"id": "curso-a", "learning_path": {
+        "stage1": {"name": "Etapa 1", "modules": [{"id": "inicio", "title": "Início"},
+                                                  {"id": "variaveis", "revisited_in": ["curso-b.classes"]}]},
+        "stage2": {"name": "Etapa 2", "modules": [{"id": "funcoes"}]},
+    }},
+    {"id": "curso-b", "learning_path": {
+        "stage1": {"name": "POO", "modules": [{"id": "classes", "builds_on": ["curso-a.variaveis"]},
+                                              {"id": "heranca"}]},
+    }},
+]
+
+
+@pytest.fixture
+def graph():
+    """Fornece um grafo com conceitos e os caminhos de aprendizagem de dois cursos."""
+    return ConceptGraph(CONCEPTS, COURSES)
+
+
+def test_topological_order(graph):
+    """Testa que cada nó aparece depois de todos os seus pré-requisitos."""
+    position = {node_id: index for index, node_id in enumerate(graph.order)}
+    assert sorted(graph.order) == sorted(graph.nodes)
+    for node_id in graph.order:
+        assert all(position[before] < position[node_id] for before in graph.prerequisites(node_id)["all"])
+    assert graph.nodes["curso-a.inicio"] == {"id": "curso-a.inicio", "kind": "module", "course": "curso-a",
+                                             "title": "Início", "stage": "Etapa 1"}
+    assert graph.nodes["variaveis"]["modules"] == ["curso-a.variaveis"]
+
+
+def test_prerequisite_closure(graph):
+    """Testa os pré-requisitos diretos e transitivos, mesclados entre níveis e cursos."""
+    assert graph.prerequisites("funcoes") == {"id": "funcoes", "direct": ["introducao", "variaveis"],
+                                              "all": ["introducao", "variaveis"], "revisited_in": []}
+    assert graph.prerequisites("curso-b.heranca")["all"] == ["curso-a.inicio", "curso-a.variaveis", "curso-b.classes"]
+    assert graph.prerequisites("curso-a.variaveis")["revisited_in"] == ["curso-b.classes"]
+    assert graph.prerequisites("inexistente") is None
+
+
+def test_shortest_path(graph):
+    """Testa o caminho mínimo pelas arestas de pré-requisito e pelas ligações `revisited_in`."""
+    assert [step["to"] for step in graph.shortest_path("introducao", "funcoes")] == ["funcoes"]
+    steps = graph.shortest_path("curso-a.inicio", "curso-b.heranca")
+    assert [(step["from"], step["to"]) for step in steps] == [
+        ("curso-a.inicio", "curso-a.variaveis"), ("curso-a.variaveis", "curso-b.classes"),
+        ("curso-b.classes", "curso-b.heranca")]
+    assert graph.shortest_path("funcoes", "introducao") is None
+    assert graph.shortest_path("funcoes", "funcoes") == []
+
+
+def test_cycle_is_rejected():
+    """Testa que pré-requisitos circulares são recusados."""
+    concepts = {"a": {"basic": {"prerequisites": ["b"]}}, "b": {"basic": {"prerequisites": ["a"]}}}
+    with pytest.raises(ConceptGraphError, match="a, b"):
+        ConceptGraph(concepts)
+
+
+def test_load_concept_map(tmp_path):
+    """Testa a leitura do mapa de conceitos e o tratamento de arquivos ausentes ou inválidos."""
+    path = tmp_path / 'concept_map.json'
+    assert load_concept_map(path) == {}
+    path.write_text(json.dumps({"concepts": CONCEPTS}), encoding='utf-8')
+    assert load_concept_map(path) == CONCEPTS
+    path.write_text("[1, 2]", encoding='utf-8')
+    assert load_concept_map(path) == {}
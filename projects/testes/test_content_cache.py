@@ -0,0 +1,105 @@
+import json
+import os
+
+from projects.content_cache import ContentCache
+from projects.exercise_manager import ExerciseIndex, ExerciseManager
+from projects.lesson_manager import LessonIndex
+
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def test_cache_reuses_content_while_file_is_unchanged(tmp_path):
+    """Testa que o arquivo só é carregado novamente quando sua assinatura muda."""
+    data_file = tmp_path / 'dados.json'
+    _write_json(data_file, [1, 2, 3])
+    cache = ContentCache()
+    loads = []
+
+    def loader(path):
+        loads.append(path)
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    assert cache.get(data_file, loader) == [1, 2, 3]
+    assert cache.get(data_file, loader) == [1, 2, 3]
+    assert len(loads) == 1
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1, "reloads": 0}
+
+    _write_json(data_file, [1, 2, 3, 4])
+    stat_result = os.stat(data_file)
+    os.utime(data_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+    assert cache.get(data_file, loader) == [1, 2, 3, 4]
+    assert len(loads) == 2
+    assert cache.stats()["reloads"] == 1
+
+
+def test_cache_invalidate(tmp_path):
+    """Testa a remoção explícita de entradas do cache."""
+    data_file = tmp_path / 'dados.json'
+    _write_json(data_file, [])
+    cache = ContentCache()
+    cache.get(data_file, lambda path: [])
+    cache.invalidate(data_file)
+    assert cache.stats()["entries"] == 0
+
+
+def test_exercise_manager_uses_cache(app_test_data):
+    """Testa que o ExerciseManager reutiliza o conteúdo já carregado."""
+    cache = ContentCache()
+    mgr = ExerciseManager(cache=cache)
+    first = mgr.load_exercises_from_file('basic/exercises.json')
+    second = mgr.load_exercises_from_file('basic/exercises.json')
+    assert first is second
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_exercise_index_lookups_and_level_filter():
+    """Testa os índices por ID, posição e lição, com filtro de nível."""
+    exercises = [
+        {"id": "a", "lesson_id": "l1", "level": "Básico"},
+        {"id": "b", "lesson_id": "l1", "level": "Intermediário"},
+        {"id": "c", "lesson_id": "l2", "level": "básico"},
+        {"id": "a", "lesson_id": "l2", "level": "básico"},
+    ]
+    index = ExerciseIndex(exercises, "básico")
+    assert index.get("a") is exercises[0]
+    assert index.get("b") is None
+    assert index.position["c"] == 1
+    assert [ex["id"] for ex in index.for_lesson("l1")] == ["a"]
+    assert [ex["id"] for ex in index.for_lesson("l2")] == ["c", "a"]
+    assert index.for_lesson("inexistente") == []
+    assert ExerciseIndex(exercises).get("b") is exercises[1]
+
+
+def test_lesson_index_next_lesson():
+    """Testa a busca por ID e o cálculo da próxima lição."""
+    index = LessonIndex([{"id": "l1"}, {"id": "l2"}])
+    assert index.get("l1")["id"] == "l1"
+    assert index.next_lesson("l1")["id"] == "l2"
+    assert index.next_lesson("l2") is None
+    assert index.next_lesson("inexistente") is None
+
+
+def test_derived_index_is_rebuilt_when_file_changes(tmp_path):
+    """Testa que as estruturas derivadas são reconstruídas apenas quando o arquivo muda."""
+    data_file = tmp_path / 'dados.json'
+    _write_json(data_file, [{"id": "l1"}])
+    cache = ContentCache()
+
+    def loader(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    first = cache.get_derived(data_file, "index", loader, LessonIndex)
+    assert cache.get_derived(data_file, "index", loader, LessonIndex) is first
+
+    _write_json(data_file, [{"id": "l1"}, {"id": "l2"}])
+    stat_result = os.stat(data_file)
+    os.utime(data_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+    second = cache.get_derived(data_file, "index", loader, LessonIndex)
+    assert second is not first
+    assert second.get("l2") is not None
@@ -0,0 +1,72 @@
+import json
+import os
+import stat
+
+from projects.course_manager import CourseManager
+
+
+def _read_courses_file(mgr):
+    with open(mgr.courses_file, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_index_follows_mutations(tmp_path):
+    """Testa que o índice por ID acompanha inclusões, alterações e remoções."""
+    mgr = CourseManager(tmp_path / 'cursos')
+    mgr.add_course({"id": "curso-a", "name": "Curso A"})
+    mgr.add_course({"id": "curso-b", "name": "Curso B"})
+    assert mgr.add_course({"id": "curso-a", "name": "Duplicado"}) is None
+
+    original = mgr.get_course_by_id("curso-a")
+    updated = mgr.update_course("curso-a", {"name": "Curso A2", "id": "outro"})
+    assert updated["name"] == "Curso A2"
+    assert updated["lessons_file"] == "curso-a/lessons.json"
+    assert mgr.get_course_by_id("curso-a") is updated
+    assert original["name"] == "Curso A"  # cópia na escrita
+    assert mgr.get_course_by_id("outro") is None
+
+    assert mgr.delete_course("curso-b") is True
+    assert mgr.get_course_by_id("curso-b") is None
+    assert [c["id"] for c in _read_courses_file(mgr)] == ["curso-a"]
+
+
+def test_assigning_courses_rebuilds_index(tmp_path):
+    """Testa que atribuir uma nova lista a `courses` reconstrói o índice."""
+    mgr = CourseManager(tmp_path / 'cursos')
+    mgr.courses = [{"id": "x", "name": "X"}]
+    assert mgr.get_course_by_id("x")["name"] == "X"
+
+
+def test_batch_defers_writes_until_exit(tmp_path, monkeypatch):
+    """Testa que um bloco `batch()` grava o arquivo uma única vez, ao final."""
+    mgr = CourseManager(tmp_path / 'cursos')
+    writes = []
+    original_write = mgr._write_courses_file
+    monkeypatch.setattr(mgr, '_write_courses_file', lambda: (writes.append(1), original_write()))
+
+    with mgr.batch():
+        mgr.add_course({"id": "c1", "name": "C1"})
+        mgr.add_course({"id": "c2", "name": "C2"})
+        mgr.update_course("c1", {"name": "C1 editado"})
+        assert _read_courses_file(mgr) == []
+        assert mgr.get_course_by_id("c1")["name"] == "C1 editado"
+
+    assert len(writes) == 1
+    assert [c["name"] for c in _read_courses_file(mgr)] == ["C1 editado", "C2"]
+    assert not list(mgr.data_dir.glob('*.tmp'))
+
+
+def test_save_preserves_file_mode(tmp_path):
+    """Testa que a gravação atômica mantém as permissões do `courses.json` original."""
+    mgr = CourseManager(tmp_path / 'cursos')
+    os.chmod(mgr.courses_file, 0o644)
+    mgr.add_course({"id": "c1", "name": "C1"})
+    assert stat.S_IMODE(os.stat(mgr.courses_file).st_mode) == 0o644
+
+
+def test_first_save_uses_default_file_mode(tmp_path):
+    """Testa que um `courses.json` criado pela gravação recebe as permissões padrão."""
+    mgr = CourseManager(tmp_path / 'cursos')
+    os.remove(mgr.courses_file)
+    mgr.add_course({"id": "c1", "name": "C1"})
+    assert stat.S_IMODE(os.stat(mgr.courses_file).st_mode) == 0o644
@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+
+import pytest
+
+from projects.code_executor import ExecutionLimits
+from projects.execution_backend import ExecutorBusy, InlineBackend, ProcessPoolBackend, create_backend, resource
+
+
+@pytest.fixture
+def pool():
+    """Fornece um pool de um único trabalhador, encerrado ao fim do teste."""
+    backend = ProcessPoolBackend(size=1, max_jobs_per_worker=2, preload_modules=("json",))
+    yield backend
+    backend.shutdown()
+
+
+def test_pool_executes_code(pool):
+    """Testa que o pool executa o código e captura a saída."""
+    result = pool.execute_code("print('Olá do trabalhador!')")
+    assert result["returncode"] == 0
+    assert result["stdout"] == "Olá do trabalhador!\n"
+    assert result["error_type"] is None
+
+
+def test_pool_runs_each_execution_in_its_own_directory(pool):
+    """Testa que arquivos relativos gravados pelo código ficam em um diretório temporário, removido ao final."""
+    code = "import os\nopen('saida-do-exercicio.txt', 'w').write('pão')\nprint(os.getcwd())"
+    first = pool.execute_code(code)["stdout"].strip()
+    second = pool.execute_code("import os\nprint(os.path.exists('saida-do-exercicio.txt'))")
+    assert second["stdout"] == "False\n"
+    assert first != os.getcwd() and not os.path.exists(first)
+    assert not os.path.exists('saida-do-exercicio.txt')
+
+
+def test_pool_reports_exceptions(pool):
+    """Testa que exceções do código do usuário são reportadas no dicionário de resultado."""
+    result = pool.execute_code("1 / 0")
+    assert result["returncode"] == 1
+    assert result["error_type"] == "ZeroDivisionError"
+
+
+def test_pool_passes_execution_globals(pool):
+    """Testa que o escopo global fornecido chega ao trabalhador."""
+    result = pool.execute_code("assert 'Python' in output\nprint('SUCCESS')", execution_globals={"output": "Olá, Python!"})
+    assert result["returncode"] == 0
+    assert "SUCCESS" in result["stdout"]
+
+
+def test_pool_recycles_worker_after_max_jobs(pool):
+    """Testa que o trabalhador é substituído após `max_jobs_per_worker` execuções."""
+    code = "import os\nprint(os.getpid())"
+    first = pool.execute_code(code)["stdout"]
+    second = pool.execute_code(code)["stdout"]
+    third = pool.execute_code(code)["stdout"]
+    assert first == second
+    assert third != first
+    assert pool.stats()["workers_recycled"] == 1
+
+
+def test_pool_survives_worker_crash(pool):
+    """Testa que a morte de um trabalhador é reportada e o pool continua funcional."""
+    result = pool.execute_code("import os\nos._exit(3)")
+    assert result["returncode"] == 1
+    assert result["error_type"] == "WorkerCrashed"
+
+    result = pool.execute_code("print('ainda funcionando')")
+    assert result["stdout"] == "ainda funcionando\n"
+    assert pool.stats()["workers_crashed"] == 1
+
+
+def test_create_backend():
+    """Testa a criação de backends pelo nome."""
+    assert isinstance(create_backend("inline"), InlineBackend)
+    assert isinstance(create_backend("process", size=2), ProcessPoolBackend)
+    with pytest.raises(ValueError):
+        create_backend("desconhecido")
+
+
+def test_pool_enforces_wall_time(pool):
+    """Testa que uma execução além do tempo de relógio é interrompida e o pool se recupera."""
+    result = pool.execute_code("import time\ntime.sleep(10)", limits=ExecutionLimits(wall_time=0.5))
+    assert result["returncode"] == 1
+    assert result["error_type"] == "TimeoutError"
+    assert pool.stats()["timeouts"] == 1
+
+    result = pool.execute_code("print('ok')")
+    assert result["stdout"] == "ok\n"
+
+
+@pytest.mark.skipif(resource is None, reason="Limites via resource indisponíveis nesta plataforma.")
+def test_pool_enforces_cpu_time(pool):
+    """Testa que um laço infinito é interrompido pelo limite de CPU antes do tempo de relógio."""
+    result = pool.execute_code("while True:\n    pass", limits=ExecutionLimits(wall_time=30, cpu_time=1))
+    assert result["error_type"] == "TimeoutError"
+    assert "CPU" in result["stderr"]
+
+
+@pytest.mark.skipif(resource is None, reason="Limites via resource indisponíveis nesta plataforma.")
+def test_pool_enforces_memory_limit(pool):
+    """Testa que uma alocação acima do limite de memória é reportada como MemoryLimitExceeded."""
+    limits = ExecutionLimits(memory_bytes=64 * 1024 * 1024)
+    result = pool.execute_code("dados = bytearray(512 * 1024 * 1024)", limits=limits)
+    assert result["returncode"] == 1
+    assert result["error_type"] == "MemoryLimitExceeded"
+
+
+def test_output_limit_inline():
+    """Testa que a saída além do limite interrompe a execução mantendo a saída parcial."""
+    backend = InlineBackend()
+    result = backend.execute_code("print('a' * 10)\nwhile True:\n    print('x' * 100)",
+                                  limits=ExecutionLimits(max_output_bytes=1000))
+    assert result["error_type"] == "OutputLimitExceeded"
+    assert result["stdout"].startswith("aaaaaaaaaa\n")
+    assert len(result["stdout"]) <= 1000
+
+
+def test_execution_limits_merged():
+    """Testa a sobrescrita de limites a partir do formato JSON dos exercícios."""
+    limits = ExecutionLimits().merged({"wall_time_seconds": 20, "memory_mb": 512})
+    assert limits.wall_time == 20
+    assert limits.memory_bytes == 512 * 1024 * 1024
+    assert limits.cpu_time == ExecutionLimits().cpu_time
+
+
+def test_pool_streams_output(pool):
+    """Testa que a saída é repassada em trechos, na ordem, antes do resultado."""
+    chunks = []
+    result = pool.execute_code_stream("for i in range(3):\n    print(i)", lambda name, text: chunks.append((name, text)))
+    assert result["returncode"] == 0
+    assert result["stdout"] == ""
+    assert "".join(text for name, text in chunks if name == "stdout") == "0\n1\n2\n"
+
+
+def test_pool_executes_submission_in_one_job(pool):
+    """Testa que código do usuário e teste são executados em um único trabalhador, no mesmo escopo."""
+    result = pool.execute_submission("valor = int(input())\nprint(valor)", "assert valor == 5 and output == '5\\n'", stdin=["5"])
+    assert result["returncode"] == 0
+    assert result["test"]["returncode"] == 0
+    assert pool.stats()["jobs_completed"] == 1
+
+
+def test_pool_rejects_when_queue_full():
+    """Testa que, com o trabalhador ocupado e a fila cheia, novas chamadas são recusadas imediatamente."""
+    backend = ProcessPoolBackend(size=1, preload_modules=(), max_queue=1, max_wait=5)
+    try:
+        backend.start()
+        busy = threading.Thread(target=backend.execute_code, args=("import time; time.sleep(0.8)",))
+        busy.start()
+        time.sleep(0.2)
+        queued = threading.Thread(target=backend.execute_code, args=("pass",))
+        queued.start()
+        time.sleep(0.1)
+        started = time.monotonic()
+        with pytest.raises(ExecutorBusy) as excinfo:
+            backend.execute_code("pass")
+        assert time.monotonic() - started < 0.2 # Recusada sem aguardar
+        assert excinfo.value.retry_after >= 1
+        busy.join()
+        queued.join()
+        stats = backend.stats()
+        assert stats["jobs_rejected"] == 1
+        assert stats["queue_wait"]["count"] == 2
+        assert stats["queue_wait"]["max_ms"] > 100 # A chamada enfileirada aguardou o trabalhador
+    finally:
+        backend.shutdown()
+
+
+def test_pool_rejects_after_max_wait():
+    """Testa que uma chamada que aguarda mais de `max_wait` segundos é recusada."""
+    backend = ProcessPoolBackend(size=1, preload_modules=(), max_queue=4, max_wait=0.2)
+    try:
+        backend.start()
+        busy = threading.Thread(target=backend.execute_code, args=("import time; time.sleep(0.8)",))
+        busy.start()
+        time.sleep(0.2)
+        with pytest.raises(ExecutorBusy):
+            backend.execute_code("pass")
+        busy.join()
+        assert backend.stats()["waiting_jobs"] == 0
+        assert backend.execute_code("print(1)")["stdout"] == "1\n"
+    finally:
+        backend.shutdown()
+
+
+def test_pool_cancels_running_execution(pool):
+    """Testa que sinalizar `cancel` mata o trabalhador e retorna o resultado de cancelamento."""
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    started = time.monotonic()
+    result = pool.execute_code_stream("while True: pass", lambda name, text: None, cancel=cancel)
+    assert time.monotonic() - started < 3
+    assert result["error_type"] == "Cancelled"
+    assert pool.stats()["jobs_cancelled"] == 1
+    assert pool.execute_code("print('ok')")["stdout"] == "ok\n" # O trabalhador foi substituído
+
+
+def test_inline_cancels_on_next_output():
+    """Testa que, em processo, a execução cancelada é interrompida na próxima escrita."""
+    cancel = threading.Event()
+    chunks = []
+
+    def on_output(name, text):
+        chunks.append(text)
+        cancel.set()
+
+    result = InlineBackend().execute_code_stream("for i in range(100): print(i)", on_output, cancel=cancel)
+    assert result["error_type"] == "Cancelled"
+    assert chunks == ["0"] # print escreve o texto e a quebra de linha separadamente
+
+
+def test_execution_limits_clamped():
+    """Testa que `clamped` reduz os limites acima dos tetos e substitui limites desativados."""
+    maximum = ExecutionLimits(wall_time=30.0, cpu_time=30, memory_bytes=1024, max_output_bytes=None)
+    limits = ExecutionLimits(wall_time=60.0, cpu_time=None, memory_bytes=512, max_output_bytes=10).clamped(maximum)
+    assert (limits.wall_time, limits.cpu_time, limits.memory_bytes, limits.max_output_bytes) == (30.0, 30, 512, 10)
@@ -0,0 +1,49 @@
+import pytest
+
+from projects.execution_backend import InlineBackend
+from projects.grading import output_matches, run_test_cases
+
+CASES = [
+    {"name": "um", "stdin": ["1"], "expected_output": "2"},
+    {"name": "dois", "stdin": ["2"], "expected_output": "4"},
+    {"stdin": ["3"], "check": "assert output.strip() == '6'"},
+]
+
+
+def test_output_matches_modes():
+    """Testa os modos de comparação da saída."""
+    assert output_matches("4  \n\n", "4")
+    assert not output_matches("4  \n", "4", match="exact")
+    assert output_matches("Resultado: 4\n", "4", match="contains")
+    with pytest.raises(ValueError):
+        output_matches("4", "4", match="regex")
+
+
+def test_all_cases_pass():
+    """Testa que todos os casos passam com um código correto."""
+    result = run_test_cases(InlineBackend(), "print(int(input()) * 2)", CASES)
+    assert result["success"] is True
+    assert (result["passed"], result["total"]) == (3, 3)
+    assert [case["name"] for case in result["cases"]] == ["um", "dois", "caso 3"]
+
+
+def test_stops_on_first_failure():
+    """Testa que os casos após a primeira falha não são executados."""
+    result = run_test_cases(InlineBackend(), "print(2)", CASES)
+    assert result["success"] is False
+    assert [case["status"] for case in result["cases"]] == ["passed", "failed", "skipped"]
+    assert "Saída esperada" in result["cases"][1]["details"]
+
+
+def test_run_all_cases():
+    """Testa a execução de todos os casos mesmo após uma falha."""
+    result = run_test_cases(InlineBackend(), "print(2)", CASES, stop_on_failure=False)
+    assert [case["status"] for case in result["cases"]] == ["passed", "failed", "failed"]
+    assert "AssertionError" in result["cases"][2]["details"]
+
+
+def test_check_failure_details():
+    """Testa que o detalhe de uma verificação "check" que falha traz o tipo do erro uma única vez."""
+    cases = [{"check": "assert output.strip() == '6', 'esperado 6'"}]
+    result = run_test_cases(InlineBackend(), "print(5)", cases)
+    assert result["cases"][0]["details"] == "AssertionError: esperado 6"
@@ -0,0 +1,33 @@
+from projects.instrumentation import Histogram, RequestTimings, _current, phase
+
+
+def test_histogram_snapshot_and_percentiles():
+    """Testa as contagens acumuladas e a estimativa de percentis."""
+    histogram = Histogram(buckets=(10, 100))
+    for value in (1, 2, 3, 50, 500):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["buckets"] == {"10": 3, "100": 4, "+Inf": 5}
+    assert snapshot["p50_ms"] == 10
+    assert snapshot["p99_ms"] == 500
+
+
+def test_phase_without_active_request_is_noop():
+    """Testa que `phase` não mede nada fora de uma requisição instrumentada."""
+    _current.timings = None
+    with phase("execute"):
+        pass
+
+
+def test_nested_phases_count_once():
+    """Testa que fases aninhadas são atribuídas apenas à mais externa."""
+    _current.timings = timings = RequestTimings()
+    try:
+        with phase("render"):
+            with phase("data-load"):
+                pass
+    finally:
+        _current.timings = None
+    assert timings.phases["data-load"] == 0.0
+    assert timings.phases["render"] > 0.0
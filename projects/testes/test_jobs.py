@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from projects.jobs import CANCELLED, DONE, FAILED, JobManager, TooManyJobs
+
+
+def wait_finished(job, timeout=5):
+    """Aguarda a conclusão de um trabalho."""
+    deadline = time.monotonic() + timeout
+    while job.result is None and job.status != CANCELLED and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+@pytest.fixture
+def manager():
+    """Fornece um gerenciador de trabalhos, encerrado ao fim do teste."""
+    job_manager = JobManager(max_threads=2, max_pending=2, ttl=60)
+    yield job_manager
+    job_manager.shutdown()
+
+
+def test_job_runs_and_streams_output(manager):
+    """Testa que o trabalho é executado e que a saída é consultada a partir de um deslocamento."""
+    def run(job):
+        job.append_output("stdout", "a")
+        job.append_output("stdout", "b")
+        return {"success": True, "output": "ab", "details": ""}
+
+    job = wait_finished(manager.submit(run))
+    assert job.status == DONE
+    data = job.to_dict(offset=1)
+    assert data["chunks"] == [["stdout", "b"]]
+    assert data["offset"] == 2
+    assert data["result"]["output"] == "ab"
+    assert manager.get(job.id) is job
+
+
+def test_job_failure_is_reported(manager):
+    """Testa que uma exceção no trabalho o marca como "failed"."""
+    def run(job):
+        raise ValueError("falhou")
+
+    job = wait_finished(manager.submit(run))
+    assert job.status == FAILED
+    assert "falhou" in job.result["details"]
+
+
+def test_cancel_running_job(manager):
+    """Testa que o cancelamento sinaliza o evento do trabalho em execução."""
+    started = threading.Event()
+
+    def run(job):
+        started.set()
+        job.cancel_event.wait(5)
+        return {"success": False, "output": "", "details": "Cancelled: A execução foi cancelada."}
+
+    job = manager.submit(run)
+    assert started.wait(5)
+    manager.cancel(job.id)
+    wait_finished(job)
+    assert job.status == CANCELLED
+    assert manager.stats()["cancelled"] == 1
+
+
+def test_max_pending_and_ttl():
+    """Testa o limite de trabalhos em andamento e o descarte dos concluídos após o TTL."""
+    release = threading.Event()
+    job_manager = JobManager(max_threads=1, max_pending=1, ttl=0)
+    try:
+        job = job_manager.submit(lambda job: release.wait(5) and {"success": True, "output": "", "details": ""})
+        with pytest.raises(TooManyJobs):
+            job_manager.submit(lambda job: None)
+        release.set()
+        wait_finished(job)
+        time.sleep(0.01)
+        assert job_manager.get(job.id) is None # Descartado após o TTL
+    finally:
+        job_manager.shutdown()
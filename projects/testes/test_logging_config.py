@@ -0,0 +1,63 @@
+import io
+import json
+import logging
+
+import pytest
+
+from projects.logging_config import JsonFormatter, SamplingFilter, configure_logging, stop_logging
+
+
+@pytest.fixture
+def root_logger():
+    """Preserva os handlers e o nível do logger raiz durante o teste."""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_json_formatter_includes_extra_fields():
+    """Testa que cada evento vira uma linha JSON com a mensagem e os campos extras."""
+    record = logging.LogRecord("projects.app", logging.INFO, __file__, 1, "Execução: success=%s", (True,), None)
+    record.course_id = "python-basico"
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Execução: success=True"
+    assert entry["level"] == "INFO"
+    assert entry["course_id"] == "python-basico"
+
+
+def test_sampling_filter_only_drops_debug_events():
+    """Testa que a amostragem descarta eventos de DEBUG, mas nunca os de nível superior."""
+    sampling = SamplingFilter(rate=0.0)
+    debug = logging.LogRecord("x", logging.DEBUG, __file__, 1, "debug", (), None)
+    warning = logging.LogRecord("x", logging.WARNING, __file__, 1, "aviso", (), None)
+    assert not sampling.filter(debug)
+    assert sampling.filter(warning)
+
+
+def test_async_json_logging(root_logger):
+    """Testa a escrita assíncrona em JSON e a formatação preguiçosa dos argumentos."""
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", log_format="json", async_handler=True, debug_sample_rate=0.0,
+                      stream=stream, force=True)
+    values = ["original"]
+    logger = logging.getLogger("projects.teste")
+    logger.info("Valores: %s", values)
+    values.append("alterado depois do evento")
+    logger.debug("descartado pela amostragem")
+    stop_logging() # Escreve os eventos pendentes na fila
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [entry["message"] for entry in lines] == ["Valores: ['original']"]
+
+
+def test_existing_handlers_are_kept_without_force(root_logger):
+    """Testa que, como `basicConfig`, a configuração não substitui handlers existentes."""
+    root_logger.addHandler(logging.NullHandler())
+    assert configure_logging(log_format="json") is None
+    with pytest.raises(ValueError):
+        configure_logging(log_format="xml")
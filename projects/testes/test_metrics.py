@@ -0,0 +1,37 @@
+import pytest
+
+from projects.metrics import MetricFamily, MetricsRegistry
+
+
+def test_counter_renders_labels_in_text_format():
+    """Testa a exposição de um contador com rótulos, incluindo o escape de valores."""
+    registry = MetricsRegistry()
+    counter = registry.counter("teste_total", "Um contador.", ("tipo",))
+    counter.inc(tipo="a")
+    counter.inc(2, tipo='com "aspas"')
+    text = registry.render()
+    assert "# HELP teste_total Um contador.\n# TYPE teste_total counter\n" in text
+    assert 'teste_total{tipo="a"} 1\n' in text
+    assert 'teste_total{tipo="com \\"aspas\\""} 2\n' in text
+    assert counter.value(tipo="a") == 1
+
+
+def test_counter_rejects_invalid_use():
+    """Testa que contadores não podem ser decrementados nem receber rótulos desconhecidos."""
+    counter = MetricsRegistry().counter("teste_total", "Um contador.", ("tipo",))
+    with pytest.raises(ValueError):
+        counter.inc(-1, tipo="a")
+    with pytest.raises(ValueError):
+        counter.inc(outro="a")
+
+
+def test_failing_collector_does_not_break_render():
+    """Testa que um coletor com erro é ignorado e os demais são expostos."""
+    registry = MetricsRegistry()
+
+    @registry.register_collector
+    def failing():
+        raise RuntimeError("falha")
+
+    registry.register_collector(lambda: [MetricFamily("teste_gauge", "gauge", "Um gauge.").add(1.5)])
+    assert "teste_gauge 1.5\n" in registry.render()
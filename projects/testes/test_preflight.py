@@ -0,0 +1,55 @@
+import pytest
+
+from projects.code_executor import execute_code
+from projects.preflight import PreflightChecker
+
+
+@pytest.fixture
+def checker():
+    """Fornece um verificador com as regras padrão."""
+    return PreflightChecker()
+
+
+@pytest.mark.parametrize("source", ["print('oi'", "return 1", "if True\n    pass", "x = 1 +"])
+def test_syntax_errors_match_executor(checker, source):
+    """Testa que erros de sintaxe são reportados como o executor os reportaria."""
+    assert checker.check(source) == execute_code(source)
+
+
+def test_valid_code_is_accepted(checker):
+    """Testa que código válido e sem construções proibidas é aceito."""
+    assert checker.check("import math\nprint(math.sqrt(4))", "Básico") is None
+
+
+@pytest.mark.parametrize("source, level, fragment", [
+    ("import subprocess", None, "'subprocess'"),
+    ("from socket import socket", "Avançado", "'socket'"),
+    ("import os.path", "Básico", "'os.path'"),
+    ("eval('1 + 1')", None, "'eval()'"),
+    ("import os\nos.system('ls')", "Intermediário", "'os.system()'"),
+])
+def test_forbidden_constructs(checker, source, level, fragment):
+    """Testa que importações e chamadas proibidas são recusadas, com a linha da ocorrência."""
+    result = checker.check(source, level)
+    assert result["returncode"] == 1
+    assert result["error_type"] == "ForbiddenConstruct"
+    assert fragment in result["stderr"]
+
+
+def test_rules_depend_on_level(checker):
+    """Testa que as regras do nível são somadas às regras padrão."""
+    assert checker.check("import os", "Básico") is not None
+    assert checker.check("import os", "Intermediário") is None
+    custom = PreflightChecker({"default": {"modules": ["math"]}})
+    assert custom.check("import math") is not None
+    assert custom.check("eval('1')") is None
+
+
+def test_verdicts_are_cached(checker):
+    """Testa que o veredito de um código é reutilizado, por código e nível."""
+    checker.check("print(", "Básico")
+    checker.check("print(", "básico")
+    checker.check("print(1)", "Básico")
+    checker.check("print(1)", "Básico")
+    stats = checker.stats()
+    assert stats == {"entries": 2, "hits": 2, "misses": 2, "rejected": 2}
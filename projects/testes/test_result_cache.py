@@ -0,0 +1,44 @@
+from projects.result_cache import ResultCache, code_hash, is_cacheable, normalize_code
+
+
+def test_normalize_code_only_unifies_line_endings():
+    """Testa que só as quebras de linha são unificadas; espaços que alteram o código mudam o hash."""
+    assert normalize_code("print(1)\r\nprint(2)\rprint(3)\n") == "print(1)\nprint(2)\nprint(3)\n"
+    assert code_hash("x = 1\r\n") == code_hash("x = 1\n")
+    assert code_hash("x = 1") != code_hash("x = 2")
+    # Espaços dentro de uma string de várias linhas fazem parte do valor
+    assert code_hash('s = """x   \ny"""\nprint(len(s))') != code_hash('s = """x\ny"""\nprint(len(s))')
+    # Uma linha a mais muda o número de linha das mensagens de erro
+    assert code_hash("\n1 / 0") != code_hash("1 / 0")
+
+
+def test_lru_eviction_and_hit_ratio():
+    """Testa o descarte do resultado menos usado e a taxa de acerto."""
+    cache = ResultCache(max_entries=2, ttl=None)
+    cache.put("a", {"success": True})
+    cache.put("b", {"success": False})
+    assert cache.get("a") == {"success": True}
+    cache.put("c", {"success": True})
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    """Testa que resultados mais antigos que o TTL não são reutilizados."""
+    now = [100.0]
+    monkeypatch.setattr("projects.result_cache.time.monotonic", lambda: now[0])
+    cache = ResultCache(ttl=10)
+    cache.put("chave", {"success": True})
+    now[0] += 5
+    assert cache.get("chave") is not None
+    now[0] += 20
+    assert cache.get("chave") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_transient_errors_are_not_cacheable():
+    """Testa que erros que dependem da carga do servidor não são armazenados."""
+    assert is_cacheable({"success": False, "details": "NameError: name 'x' is not defined"})
+    assert not is_cacheable({"success": False, "details": "TimeoutError: Tempo limite de execução excedido (5 s)."})
@@ -0,0 +1,67 @@
+import pytest
+
+from projects.search_index import SearchIndex, analyze, exercise_documents, fold, lesson_documents, stem
+
+
+LESSONS = [
+    {"id": "variaveis", "title": "Variáveis e Tipos", "description": "Como guardar valores.",
+     "key_concepts": ["atribuição", "tipos numéricos"], "content": "<p>Uma <b>variável</b> guarda um valor.</p>"},
+    {"id": "funcoes", "title": "Funções", "description": "Definição e chamada de funções.",
+     "key_concepts": ["def", "return"], "content": "<p>Funções recebem argumentos &amp; retornam valores.</p>"},
+]
+EXERCISES = [
+    {"id": "ex-1", "lesson_id": "funcoes", "title": "Soma", "description": "Escreva uma função de soma.",
+     "instructions": "Use a palavra-chave def."},
+]
+
+
+@pytest.fixture
+def index():
+    """Fornece um índice com as lições e os exercícios de exemplo."""
+    search_index = SearchIndex(check_interval=0)
+    search_index.update_segment(("lesson", "curso"), 1, lesson_documents("curso", LESSONS))
+    search_index.update_segment(("exercise", "curso"), 1, exercise_documents("curso", EXERCISES))
+    return search_index
+
+
+def test_fold_and_stem_normalize_variants():
+    """Testa que acentos, maiúsculas e plurais levam ao mesmo termo."""
+    assert fold("Função ÇÃO") == "funcao cao"
+    assert stem("variaveis") == stem("variavel")
+    assert stem("funcoes") == stem("funcao")
+    assert analyze("<p>As Variáveis &amp; a função</p>") == [stem("variaveis"), stem("funcao")]
+
+
+def test_search_ranks_title_matches_first(index):
+    """Testa que a busca ignora acentos e prioriza os documentos com o termo no título."""
+    results = index.search("funcao")
+    assert [(result["kind"], result["id"]) for result in results] == [("lesson", "funcoes"), ("exercise", "ex-1")]
+    assert results[1]["lesson_id"] == "funcoes"
+    assert index.search("VARIÁVEL")[0]["id"] == "variaveis"
+
+
+def test_search_prefix_and_filters(index):
+    """Testa a busca por prefixo do último termo e os filtros por tipo e curso."""
+    assert [result["id"] for result in index.search("argum")] == ["funcoes"]
+    assert [result["id"] for result in index.search("funcao", kind="exercise")] == ["ex-1"]
+    assert index.search("funcao", course_id="outro") == []
+    assert index.search("de a o") == [] # Apenas palavras ignoradas
+
+
+def test_sync_rebuilds_only_changed_segments(index):
+    """Testa que `sync` reconstrói apenas os segmentos com nova versão e remove os ausentes."""
+    loads = []
+
+    def sources():
+        def load():
+            loads.append("lesson")
+            return lesson_documents("curso", [dict(LESSONS[0], title="Recursão")])
+        return [(("lesson", "curso"), 2, load)]
+
+    assert index.sync(sources) == 2 # Lições reconstruídas, exercícios removidos
+    assert loads == ["lesson"]
+    assert index.search("recursao")[0]["id"] == "variaveis"
+    assert index.search("soma") == []
+    assert index.sync(sources) == 0
+    assert loads == ["lesson"]
+    assert index.stats()["documents"] == 1
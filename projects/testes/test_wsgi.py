@@ -0,0 +1,26 @@
+from projects.app import app
+from projects.content_cache import content_cache
+from projects.wsgi import _parse_bind, create_wsgi_app, warm_up
+
+
+def test_warm_up_loads_course_data():
+    """Testa que o aquecimento carrega os arquivos de lições e exercícios de todos os cursos."""
+    content_cache.invalidate()
+    result = warm_up(start_executor=False)
+    assert result["courses"] == 3
+    misses = content_cache.stats()["misses"]
+    warm_up(start_executor=False)
+    assert content_cache.stats()["misses"] == misses # Tudo já estava em cache
+
+
+def test_create_wsgi_app_returns_application():
+    """Testa que a fábrica retorna a aplicação Flask, pronta para um servidor WSGI."""
+    wsgi_app = create_wsgi_app(start_executor=False)
+    assert wsgi_app is app
+    assert wsgi_app.test_client().get('/').status_code == 200
+
+
+def test_parse_bind():
+    """Testa a leitura do endereço host:porta."""
+    assert _parse_bind("127.0.0.1:8080") == ("127.0.0.1", 8080)
+    assert _parse_bind(":9000") == ("0.0.0.0", 9000)
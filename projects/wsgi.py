@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Ponto de entrada de produção da aplicação (WSGI).
+
+`app.py` e `run.py` iniciam apenas o servidor de desenvolvimento do Flask.
+Este módulo expõe a aplicação para servidores WSGI e inclui um lançador:
+
+    python -m projects.wsgi [--bind 0.0.0.0:8000] [--workers N] [--threads N]
+
+*   Com o `gunicorn` instalado, a aplicação é servida por `workers` processos,
+    cada um com `threads` threads. A aplicação é carregada e os caches de
+    dados são aquecidos no processo mestre, antes da criação dos processos
+    (que herdam os dados já carregados); o pool de execução de código é
+    iniciado em cada processo, logo após sua criação.
+*   Sem o `gunicorn`, é usado o servidor do Werkzeug em um único processo,
+    com um pool fixo de `threads` threads.
+
+Os valores padrão vêm das variáveis de ambiente `CURSO_BIND`,
+`CURSO_WORKERS`, `CURSO_THREADS` e `CURSO_GRACEFUL_TIMEOUT`. Em ambos os
+casos, SIGTERM e SIGINT encerram o servidor de forma ordenada: as
+requisições em andamento são concluídas e, em seguida, o pool de execução
+é encerrado e os dados e logs pendentes são gravados (`shutdown`).
+
+Outros servidores WSGI podem usar a fábrica `create_wsgi_app`, ex:
+`gunicorn "projects.wsgi:create_wsgi_app()"`. Como o módulo faz parte do
+pacote `projects`, ele deve ser executado a partir da raiz do repositório
+(com `-m`), sem ajustes em `sys.path`.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import signal
+import threading
+import time
+
+from .app import (app, course_mgr, create_app, exercise_mgr, get_concept_graph, get_executor, lesson_mgr, search_index,
+                  search_sources)
+from .logging_config import stop_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BIND = "0.0.0.0:8000"
+DEFAULT_THREADS = 4
+DEFAULT_GRACEFUL_TIMEOUT = 30
+
+
+def warm_up(start_executor=True, flask_app=None):
+    """
+    Carrega antecipadamente os dados dos cursos e, opcionalmente, inicia o pool de execução.
+
+    Os índices de lições e exercícios de todos os cursos são construídos e
+    ficam no cache de conteúdo, de modo que a primeira requisição a cada curso
+    não paga o custo de leitura dos arquivos JSON. O índice de busca e o grafo
+    de conceitos também são construídos.
+
+    Args:
+        start_executor (bool): Se True, cria e inicia o backend de execução.
+            Deve ser False antes de um `fork` (ex: no processo mestre do
+            gunicorn), pois os processos do pool não podem ser compartilhados.
+        flask_app (Flask, optional): A aplicação a aquecer. Padrão: a aplicação padrão `app`.
+
+    Returns:
+        dict: Número de cursos aquecidos e duração, em segundos.
+    """
+    started = time.perf_counter()
+    with (flask_app or app).app_context():
+        courses = course_mgr.get_courses()
+        for course in courses:
+            if course.get("lessons_file"):
+                lesson_mgr.get_lesson_index(course["lessons_file"])
+            if course.get("exercises_file"):
+                level = course.get("level")
+                exercise_mgr.get_exercise_index(course["exercises_file"], level.lower() if level else None)
+        search_index.sync(search_sources, force=True)
+        get_concept_graph()
+        if start_executor:
+            get_executor().start()
+    elapsed = time.perf_counter() - started
+    logger.info("Aquecimento concluído: %d cursos em %.3f s.", len(courses), elapsed)
+    return {"courses": len(courses), "seconds": elapsed}
+
+
+def create_wsgi_app(config=None, warm=True, start_executor=True):
+    """
+    Fábrica da aplicação WSGI para servidores de produção.
+
+    Args:
+        config (dict, optional): Configuração de uma nova instância (veja `create_app`).
+            Padrão: usa a aplicação padrão `app`.
+        warm (bool): Se True, aquece os caches de dados (veja `warm_up`).
+        start_executor (bool): Se True (e `warm`), inicia também o pool de execução.
+
+    Returns:
+        Flask: A aplicação.
+    """
+    flask_app = app if config is None else create_app(config)
+    if warm:
+        warm_up(start_executor=start_executor, flask_app=flask_app)
+    return flask_app
+
+
+def shutdown(flask_app=None):
+    """Libera os recursos da aplicação: cancela os trabalhos, encerra o pool de execução e grava dados e logs pendentes."""
+    flask_app = flask_app or app
+    flask_app.extensions["curso"].job_manager.shutdown()
+    backend = flask_app.extensions.get("code_executor")
+    if backend is not None:
+        backend.shutdown()
+    with flask_app.app_context():
+        course_mgr.flush()
+    logger.info("Aplicação encerrada.")
+    stop_logging()
+
+
+def _parse_bind(bind):
+    """Separa um endereço "host:porta" em (host, porta)."""
+    host, _, port = bind.rpartition(":")
+    return host or "0.0.0.0", int(port)
+
+
+def _serve_gunicorn(bind, workers, threads, graceful_timeout):
+    """Serve a aplicação com o gunicorn (processo mestre com `workers` processos)."""
+    from gunicorn.app.base import BaseApplication
+
+    class _Application(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": bind,
+                "workers": workers,
+                "threads": threads,
+                "worker_class": "gthread" if threads > 1 else "sync",
+                "preload_app": True,
+                "graceful_timeout": graceful_timeout,
+                # O pool de execução é criado em cada processo, após o fork
+                "post_fork": lambda server, worker: get_executor().start(),
+                "worker_exit": lambda server, worker: shutdown(),
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return create_wsgi_app(start_executor=False)
+
+    _Application().run()
+
+
+def _serve_werkzeug(bind, threads, graceful_timeout):
+    """Serve a aplicação com o servidor do Werkzeug, com um pool fixo de `threads` threads."""
+    from werkzeug.serving import BaseWSGIServer
+
+    class _PooledWSGIServer(BaseWSGIServer):
+        """Servidor do Werkzeug que atende as requisições em um pool de threads limitado."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._process_request_thread, request, client_address)
+
+        def _process_request_thread(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    host, port = _parse_bind(bind)
+    server = _PooledWSGIServer(host, port, create_wsgi_app())
+
+    def stop(signum, frame):
+        logger.info("Sinal %s recebido; encerrando o servidor.", signum)
+        # `shutdown` aguarda o fim do laço de atendimento; não pode rodar na mesma thread
+        threading.Thread(target=server.shutdown, name="wsgi-shutdown").start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info("Servindo em http://%s:%d com %d threads (Werkzeug).", host, port, threads)
+    try:
+        server.serve_forever()
+    finally:
+        # Conclui as requisições em andamento (até `graceful_timeout` segundos) antes de liberar os recursos
+        waiter = threading.Thread(target=server.pool.shutdown, name="wsgi-drain")
+        waiter.start()
+        waiter.join(graceful_timeout)
+        if waiter.is_alive():
+            logger.warning("Requisições ainda em andamento após %d s; encerrando assim mesmo.", graceful_timeout)
+        server.server_close()
+        shutdown()
+
+
+def main(argv=None):
+    """
+    Inicia o servidor de produção.
+
+    Args:
+        argv (list, optional): Argumentos da linha de comando. Padrão: `sys.argv[1:]`.
+    """
+    parser = argparse.ArgumentParser(description="Servidor de produção do Curso Interativo Python.")
+    parser.add_argument("--bind", default=os.environ.get("CURSO_BIND", DEFAULT_BIND),
+                        help="Endereço host:porta (padrão: %(default)s).")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("CURSO_WORKERS", "0")) or os.cpu_count() or 1,
+                        help="Número de processos (apenas com gunicorn; padrão: número de CPUs).")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("CURSO_THREADS", str(DEFAULT_THREADS))),
+                        help="Threads por processo (padrão: %(default)s).")
+    parser.add_argument("--graceful-timeout", type=int,
+                        default=int(os.environ.get("CURSO_GRACEFUL_TIMEOUT", str(DEFAULT_GRACEFUL_TIMEOUT))),
+                        help="Segundos para concluir as requisições em andamento ao encerrar (padrão: %(default)s).")
+    parser.add_argument("--server", choices=("auto", "gunicorn", "werkzeug"), default="auto",
+                        help="Servidor WSGI (padrão: gunicorn, se instalado).")
+    args = parser.parse_args(argv)
+
+    server = args.server
+    if server == "auto":
+        try:
+            import gunicorn # noqa: F401
+            server = "gunicorn"
+        except ImportError:
+            server = "werkzeug"
+    if server == "gunicorn":
+        _serve_gunicorn(args.bind, args.workers, args.threads, args.graceful_timeout)
+    else:
+        if args.workers > 1:
+            logger.warning("O servidor do Werkzeug usa um único processo; instale o gunicorn para usar %d processos.",
+                           args.workers)
+        _serve_werkzeug(args.bind, args.threads, args.graceful_timeout)
+
+
+if __name__ == "__main__":
+    main()